@@ -1,101 +1,172 @@
 # analyze_sentiment.py
 
 import os
+import numpy as np
 import pandas as pd
-import logging
-from transformers import pipeline
+
+from scripts.SentimentThematicAnalysis.sentiment_backends import DEFAULT_BACKEND
+from scripts.SentimentThematicAnalysis.sentiment_cache import get_sentiment_cache
+from scripts.SentimentThematicAnalysis.sentiment_engine import (
+    DEFAULT_MODEL, DEFAULT_REVISION, model_version, score_texts)
+from scripts.SentimentThematicAnalysis.sharded_sentiment import (
+    DEFAULT_MEMORY_PER_WORKER_GB, analyze_sentiment_sharded)
+from scripts.common.instrumentation import instrumented
+from scripts.common.logging_config import get_logger
+from scripts.common.text_cache import normalize_text
+from scripts.common.storage import read_table, table_exists, write_table
 
 # Set up logging
-logging.basicConfig(
-    filename="./../logs/analyze_sentiment.log",
-    level=logging.INFO,
-    format="%(asctime)s - %(levelname)s - %(message)s"
-)
+logger = get_logger(__name__, "analyze_sentiment.log")
+
+
+# Only these columns are needed from the processed tables
+INPUT_COLUMNS = ['review_id', 'review_text', 'rating', 'date']
+
+BANKS = ['commercial bank of ethiopia reviews', 'Bank of Abyssinia reviews', 'Dashen bank reviews']
+
+
+def input_stem(input_dir, bank):
+    return os.path.join(input_dir, f"{bank.lower().replace(' ', '_')}_clean")
+
+
+def output_stem(output_dir, bank):
+    return os.path.join(output_dir, f"sentiment_{bank.lower().replace(' ', '_')}")
 
 
 def load_reviews(input_dir):
     """Load preprocessed review data for all banks."""
     reviews = []
-    for bank in ['commercial bank of ethiopia reviews', 'Bank of Abyssinia reviews', 'Dashen bank reviews']:
-        file_path = os.path.join(
-            input_dir, f"{bank.lower().replace(' ', '_')}_clean.csv")
-        if os.path.exists(file_path):
-            df = pd.read_csv(file_path)
+    for bank in BANKS:
+        file_path = input_stem(input_dir, bank)
+        if table_exists(file_path):
+            df = read_table(file_path, columns=INPUT_COLUMNS)
             df['bank'] = bank
             reviews.append(df)
         else:
-            logging.warning(f"File not found for {bank}: {file_path}")
-    return pd.concat(reviews, ignore_index=True) if reviews else pd.DataFrame()
-
-
-def analyze_sentiment(reviews_df):
-    """Analyze sentiment using a pre-trained transformer model."""
-    # Initialize sentiment analysis pipeline
-    sentiment_analyzer = pipeline(
-        "sentiment-analysis",
-        model="distilbert-base-uncased-finetuned-sst-2-english",
-        top_k=None
-    )
-
-    # Process reviews in batches to manage memory
-    batch_size = 32
-    sentiments = []
-    for i in range(0, len(reviews_df), batch_size):
-        batch = reviews_df['review_text'].iloc[i:i +
-                                               batch_size].fillna('').astype(str).tolist()
-        results = sentiment_analyzer(batch)
-        for j, result in enumerate(results):
-            review_row = reviews_df.iloc[i + j]
-            sentiments.append({
-                'review_id': review_row.get('review_id', i + j),
-                'review_text': batch[j],
-                'sentiment_label': result[0]['label'],
-                'sentiment_score': result[0]['score'],
-                'bank': review_row.get('bank', 'Unknown'),
-                'rating': review_row.get('rating'),
-                'date': review_row.get('date') 
-            })
-
-        logging.info(f"Processed batch {i//batch_size + 1} of reviews")
-
-    return pd.DataFrame(sentiments)
+            logger.warning(f"File not found for {bank}: {file_path}")
+    if not reviews:
+        return pd.DataFrame()
+    df = pd.concat(reviews, ignore_index=True)
+    df['bank'] = df['bank'].astype('category')
+    return df
+
+
+def analyze_sentiment(reviews_df, model_name=DEFAULT_MODEL, num_threads=None, token_budget=8192, max_batch_size=64,
+                      revision=DEFAULT_REVISION, cache=None, use_cache=True, backend=DEFAULT_BACKEND):
+    """
+    Analyze sentiment using a pre-trained transformer model.
+
+    Identical texts (after whitespace normalization) are scored once, and
+    results are looked up in a persistent cache keyed by model version and
+    text hash so only unseen texts reach the model. Misses are scored in
+    length-sorted batches bounded by `token_budget` padded tokens, on a model
+    instance that is loaded once and reused. `num_threads` caps the torch CPU
+    threads. `backend` selects 'torch', 'torch-int8' or 'onnx' inference; all
+    return the same labels and score scale. Throughput in reviews/sec is
+    logged and kept in `result.attrs['throughput']`.
+    """
+    texts = reviews_df['review_text'].fillna('').astype(str)
+    codes, unique_texts = pd.factorize(texts.map(normalize_text))
+    unique_texts = unique_texts.tolist()
+
+    version = model_version(model_name, revision, backend)
+    if use_cache and cache is None:
+        cache = get_sentiment_cache()
+    cached = cache.get_results(version, unique_texts) if cache is not None else {}
+    misses = [text for text in unique_texts if text not in cached]
+    logger.info(
+        f"Sentiment for {len(texts)} reviews: {len(unique_texts)} unique texts, "
+        f"{len(unique_texts) - len(misses)} cache hits, {len(misses)} misses")
+
+    miss_labels, miss_scores, throughput = score_texts(
+        misses, model_name=model_name, num_threads=num_threads,
+        token_budget=token_budget, max_batch_size=max_batch_size, revision=revision, backend=backend)
+    fresh = dict(zip(misses, zip(miss_labels, miss_scores)))
+    if cache is not None and fresh:
+        cache.put_results(version, fresh)
+        logger.info(f"Sentiment cache totals: hits={cache.hits}, misses={cache.misses}")
+    cached.update(fresh)
+
+    unique_labels = np.array([cached[text][0] for text in unique_texts], dtype=object)
+    unique_scores = np.array([cached[text][1] for text in unique_texts], dtype=np.float64)
+    labels, scores = unique_labels[codes], unique_scores[codes]
+
+    def column(name, default):
+        if name in reviews_df.columns:
+            return reviews_df[name].to_numpy()
+        return default
+
+    sentiment_df = pd.DataFrame({
+        'review_id': column('review_id', range(len(reviews_df))),
+        'review_text': texts.to_numpy(),
+        'sentiment_label': labels,
+        'sentiment_score': scores,
+        'bank': column('bank', 'Unknown'),
+        'rating': column('rating', None),
+        'date': column('date', None)
+    })
+    sentiment_df.attrs['throughput'] = throughput
+    return sentiment_df
 
 
 def aggregate_sentiment(sentiment_df):
     """Aggregate sentiment by bank and rating."""
     aggregated = sentiment_df.groupby(['bank', 'rating'])['sentiment_score'].agg([
         'mean', 'count']).reset_index()
-    logging.info("Aggregated sentiment by bank and rating")
+    logger.info("Aggregated sentiment by bank and rating")
     return aggregated
 
 
-def save_results(sentiment_df, output_dir):
+def save_results(sentiment_df, output_dir, fmt=None):
     """Save sentiment analysis results for each bank separately."""
-    # Group by bank and save individual files
-    for bank in sentiment_df['bank'].unique():
-        bank_df = sentiment_df[sentiment_df['bank'] == bank]
-        file_name = f"sentiment_{bank.lower().replace(' ', '_')}.csv"
-        bank_df.to_csv(os.path.join(output_dir, file_name), index=False)
-        logging.info(f"Saved sentiment results for {bank} to {file_name}")
-
-
-def sentiment():
+    # Group by bank and save individual tables
+    for bank, bank_df in sentiment_df.groupby('bank', observed=True):
+        file_path = output_stem(output_dir, bank)
+        write_table(bank_df, file_path, fmt=fmt)
+        logger.info(f"Saved sentiment results for {bank} to {file_path}")
+
+
+@instrumented('sentiment')
+def sentiment(num_threads=None, workers=1, memory_per_worker_gb=DEFAULT_MEMORY_PER_WORKER_GB, backend=DEFAULT_BACKEND,
+              stream=False, chunk_size=10_000):
+    """
+    Score all processed reviews and save per-bank results.
+
+    With `workers` > 1 (or None for all cores), reviews are sharded across
+    worker processes, each with its own model copy; see
+    `analyze_sentiment_sharded`. With `stream=True`, reviews are read, scored
+    and appended in chunks of `chunk_size` rows with a resumable checkpoint;
+    see `stream_sentiment`.
+    """
     # Define directories
     input_dir = "./../data/processed"
     output_dir = "./../data/analyzed"
     os.makedirs(output_dir, exist_ok=True)
 
+    if stream:
+        from scripts.SentimentThematicAnalysis.streaming_sentiment import stream_sentiment
+
+        stream_sentiment(input_dir, output_dir, chunk_size=chunk_size,
+                         num_threads=num_threads, backend=backend)
+        logger.info("Sentiment analysis completed successfully")
+        return
+
     # Load preprocessed reviews
-    logging.info("Loading preprocessed reviews")
+    logger.info("Loading preprocessed reviews")
     reviews_df = load_reviews(input_dir)
     if reviews_df.empty:
-        logging.error("No reviews loaded. Check input directory.")
+        logger.error("No reviews loaded. Check input directory.")
         return
 
     # Analyze sentiment
-    logging.info("Starting sentiment analysis")
-    sentiment_df = analyze_sentiment(reviews_df)
+    logger.info("Starting sentiment analysis")
+    if workers == 1:
+        sentiment_df = analyze_sentiment(
+            reviews_df, num_threads=num_threads, backend=backend)
+    else:
+        sentiment_df = analyze_sentiment_sharded(
+            reviews_df, workers=workers, memory_per_worker_gb=memory_per_worker_gb, backend=backend)
 
     # Save results for each bank separately
     save_results(sentiment_df, output_dir)
-    logging.info("Sentiment analysis completed successfully")
+    logger.info("Sentiment analysis completed successfully")
@@ -0,0 +1,189 @@
+from typing import TYPE_CHECKING, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+# scipy and scikit-learn take most of a second to import, so they are
+# imported where they are used rather than when the module loads
+if TYPE_CHECKING:
+    from scipy import sparse
+
+from scripts.common.instrumentation import inc, span
+from scripts.common.logging_config import get_logger
+
+# Set up logging
+logger = get_logger(__name__, "keyword_extraction.log")
+
+
+def _identity(terms: List[str]) -> List[str]:
+    return terms
+
+
+def top_k(indices: np.ndarray, scores: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Select the `k` highest scores without sorting all of them.
+
+    Ties are broken by feature index, so the result matches a full stable sort.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: Feature indices and scores, best first.
+    """
+    if len(scores) > k > 0:
+        threshold = np.partition(scores, len(scores) - k)[len(scores) - k]
+        candidates = np.flatnonzero(scores >= threshold)
+        indices, scores = indices[candidates], scores[candidates]
+    order = np.lexsort((indices, -scores))[:k]
+    return indices[order], scores[order]
+
+
+class KeywordEngine:
+    """
+    TF-IDF keyword scoring that never densifies the document-term matrix.
+
+    By default a `TfidfVectorizer` vocabulary is fitted in memory. With
+    `hashing=True`, terms are hashed into `n_features` columns and document
+    frequencies are accumulated chunk by chunk with `partial_fit`, so fitting
+    and ranking need memory bounded by the chunk size and `n_features`, not
+    the corpus. Hashed columns are mapped back to the first term seen in them.
+    """
+
+    def __init__(self, max_features: int = 1000, ngram_range: Tuple[int, int] = (1, 2),
+                 stop_words: Optional[str] = 'english', hashing: bool = False, n_features: int = 2 ** 20):
+        from sklearn.feature_extraction.text import CountVectorizer, HashingVectorizer, TfidfVectorizer
+
+        self.hashing = hashing
+        if hashing:
+            self._analyzer = CountVectorizer(
+                ngram_range=ngram_range, stop_words=stop_words).build_analyzer()
+            self._hasher = HashingVectorizer(
+                analyzer=_identity, n_features=n_features, alternate_sign=False, norm=None)
+            self.n_features = n_features
+            self._doc_freq = np.zeros(n_features, dtype=np.int64)
+            self._n_docs = 0
+            self._terms: Dict[int, str] = {}
+            self._idf: Optional[np.ndarray] = None
+        else:
+            self.vectorizer = TfidfVectorizer(
+                max_features=max_features, ngram_range=ngram_range, stop_words=stop_words)
+            self.n_features = None
+
+    def _hash(self, texts: Iterable[str]) -> Tuple['sparse.csr_matrix', List[List[str]]]:
+        analyzed = [self._analyzer(text) for text in texts]
+        return self._hasher.transform(analyzed), analyzed
+
+    def partial_fit(self, texts: Iterable[str]) -> 'KeywordEngine':
+        """Accumulate document frequencies from one chunk of texts (hashing mode only)."""
+        if not self.hashing:
+            raise ValueError("partial_fit requires KeywordEngine(hashing=True)")
+        with span('tfidf.partial_fit'):
+            counts, analyzed = self._hash(texts)
+            self._doc_freq += np.bincount(counts.indices, minlength=self.n_features)
+            self._n_docs += counts.shape[0]
+            new_terms = sorted({term for terms in analyzed for term in terms})
+            if new_terms:
+                buckets = self._hasher.transform([[term] for term in new_terms]).indices
+                for bucket, term in zip(buckets, new_terms):
+                    self._terms.setdefault(int(bucket), term)
+        inc('rows', counts.shape[0], stage='tfidf_fit')
+        self._idf = None
+        return self
+
+    def fit(self, texts: pd.Series, chunk_size: int = 100_000) -> 'KeywordEngine':
+        texts = texts.fillna('').astype(str)
+        if not self.hashing:
+            with span('tfidf.fit'):
+                self.vectorizer.fit(texts)
+            inc('rows', len(texts), stage='tfidf_fit')
+            self.n_features = len(self.vectorizer.vocabulary_)
+            return self
+        for start in range(0, len(texts), chunk_size):
+            self.partial_fit(texts.iloc[start:start + chunk_size])
+        return self
+
+    def transform(self, texts: Iterable[str]) -> 'sparse.csr_matrix':
+        """TF-IDF weights with L2-normalized rows, as a sparse matrix."""
+        from sklearn.preprocessing import normalize
+
+        with span('tfidf.transform', mode='hashing' if self.hashing else 'vocabulary'):
+            if not self.hashing:
+                weights = self.vectorizer.transform(texts)
+            else:
+                if self._idf is None:
+                    # Same smoothed idf as TfidfVectorizer
+                    self._idf = np.log((1 + self._n_docs) / (1 + self._doc_freq)) + 1.0
+                counts, _ = self._hash(texts)
+                weights = normalize(counts.multiply(self._idf).tocsr(), norm='l2', copy=False)
+        inc('rows', weights.shape[0], stage='tfidf_transform')
+        return weights
+
+    def feature_names(self, indices: np.ndarray) -> List[str]:
+        if not self.hashing:
+            names = self.vectorizer.get_feature_names_out()
+            return names[indices].tolist()
+        return [self._terms.get(int(i), f'<hash:{i}>') for i in indices]
+
+    def top_keywords(self, texts: pd.Series, top_n: int = 10, chunk_size: int = 100_000) -> List[Tuple[str, float]]:
+        """Top `top_n` terms by TF-IDF weight summed over all texts."""
+        texts = texts.fillna('').astype(str)
+        totals = np.zeros(self.n_features, dtype=np.float64)
+        for start in range(0, len(texts), chunk_size):
+            totals += np.asarray(self.transform(texts.iloc[start:start + chunk_size]).sum(axis=0)).ravel()
+        indices, scores = top_k(np.arange(len(totals)), totals, top_n)
+        return list(zip(self.feature_names(indices), scores))
+
+    def rank_keywords(self, chunks: Iterable[Tuple[pd.Series, pd.DataFrame]], top_n: int = 10) -> pd.DataFrame:
+        """
+        Rank keywords within each group of reviews using this fitted model.
+
+        Args:
+            chunks: `(texts, keys)` pairs, where `keys` holds the group columns
+                (e.g. bank and time window) aligned with `texts`. Rows with a
+                missing key are ignored. Per-group totals stay sparse, so the
+                input can be streamed in chunks.
+            top_n (int): Keywords kept per group.
+
+        Returns:
+            pd.DataFrame: Group columns plus `rank`, `keyword` and `score`.
+        """
+        from scipy import sparse
+
+        group_index: Dict[tuple, int] = {}
+        key_columns: List[str] = []
+        totals = None
+        for texts, keys in chunks:
+            key_columns = list(keys.columns)
+            valid = keys.notna().all(axis=1).to_numpy()
+            texts, keys = texts[valid].fillna('').astype(str), keys[valid]
+            if texts.empty:
+                continue
+            local_codes, local_keys = pd.MultiIndex.from_frame(keys).factorize()
+            mapping = np.array([group_index.setdefault(key, len(group_index)) for key in local_keys])
+            codes = mapping[local_codes]
+
+            weights = self.transform(texts)
+            if totals is None:
+                totals = sparse.csr_matrix((0, weights.shape[1]))
+            if len(group_index) > totals.shape[0]:
+                totals = sparse.vstack(
+                    [totals, sparse.csr_matrix((len(group_index) - totals.shape[0], weights.shape[1]))]).tocsr()
+            membership = sparse.csr_matrix(
+                (np.ones(len(codes)), (codes, np.arange(len(codes)))), shape=(len(group_index), len(codes)))
+            totals = totals + membership @ weights
+
+        records = []
+        for key in sorted(group_index):
+            row = totals.getrow(group_index[key])
+            indices, scores = top_k(row.indices, row.data, top_n)
+            for rank, (keyword, score) in enumerate(zip(self.feature_names(indices), scores), start=1):
+                records.append((*key, rank, keyword, score))
+        return pd.DataFrame(records, columns=key_columns + ['rank', 'keyword', 'score'])
+
+
+def window_keys(df: pd.DataFrame, group_cols: List[str], window: Optional[str] = None,
+                date_col: str = 'date') -> pd.DataFrame:
+    """Group columns for `rank_keywords`, plus a `window` period column (e.g. 'M', 'W') if requested."""
+    keys = df[group_cols].astype(object).copy()
+    if window:
+        dates = pd.to_datetime(df[date_col], errors='coerce', format='mixed')
+        keys['window'] = dates.dt.to_period(window).astype(str).where(dates.notna())
+    return keys
@@ -1,140 +1,173 @@
 import os
 import pandas as pd
-import numpy as np
-from sklearn.feature_extraction.text import TfidfVectorizer
-import spacy
-from collections import defaultdict
-import logging
-import sys
 
-# Ensure the logs directory exists
-log_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), '../../logs')
-os.makedirs(log_dir, exist_ok=True)
+from scripts.SentimentThematicAnalysis.keyword_engine import KeywordEngine, window_keys
+from scripts.SentimentThematicAnalysis.lemmatizer import SpacyLemmatizer, lemmatize_series
+from scripts.SentimentThematicAnalysis.theme_discovery import DEFAULT_MODEL_PATH, ThemeDiscovery
+from scripts.SentimentThematicAnalysis.theme_matcher import ThemeMatcher, load_theme_config
+from scripts.common.instrumentation import instrumented
+from scripts.common.logging_config import get_logger
+from scripts.common.storage import iter_table, read_table, table_exists, write_table
 
 # Set up logging
-logging.basicConfig(
-    filename=os.path.join(log_dir, "keyword_extraction.log"),
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s'
-)
-
-# Check and download spaCy model if not present
-try:
-    nlp = spacy.load("en_core_web_sm")
-    logging.info("spaCy model 'en_core_web_sm' loaded successfully")
-except OSError:
-    logging.warning("spaCy model 'en_core_web_sm' not found. Downloading...")
-    os.system(f"{sys.executable} -m spacy download en_core_web_sm")
-    nlp = spacy.load("en_core_web_sm")
-    logging.info("spaCy model 'en_core_web_sm' downloaded and loaded")
+logger = get_logger(__name__, "keyword_extraction.log")
+
+_lemmatizer = None
+
+
+def get_lemmatizer() -> SpacyLemmatizer:
+    """Return the shared lemmatizer; spaCy is only loaded when texts need lemmatizing."""
+    global _lemmatizer
+    if _lemmatizer is None:
+        _lemmatizer = SpacyLemmatizer()
+    return _lemmatizer
 
 
 def preprocess_text(text: str) -> str:
     """Preprocess text with spaCy: tokenize, lemmatize, remove stop words."""
     if not isinstance(text, str) or not text.strip():
         return ""
-    doc = nlp(text)
-    return " ".join(token.lemma_ for token in doc if not token.is_stop and token.is_alpha)
+    return get_lemmatizer().lemmatize(text)
 
 
 def extract_keywords(reviews: pd.Series, top_n: int = 10) -> list:
     """Extract top keywords and n-grams using TF-IDF."""
-    tfidf = TfidfVectorizer(
-        max_features=1000, ngram_range=(1, 2), stop_words='english')
-    tfidf_matrix = tfidf.fit_transform(reviews)
-    feature_names = tfidf.get_feature_names_out()
-    tfidf_scores = tfidf_matrix.toarray().sum(axis=0)
-    keyword_scores = dict(zip(feature_names, tfidf_scores))
-    return sorted(keyword_scores.items(), key=lambda x: x[1], reverse=True)[:top_n]
+    engine = KeywordEngine(max_features=1000, ngram_range=(1, 2)).fit(reviews)
+    return engine.top_keywords(reviews, top_n)
 
 
 def assign_themes(keywords: list, bank_name: str) -> dict:
-    """Manually cluster keywords into 3-5 themes based on bank-specific logic."""
-    themes = defaultdict(list)
-
-    if "commercial bank of ethiopia" in bank_name.lower():
-        themes['Account Access Issues'].extend(
-            [k for k, _ in keywords if any(x in k for x in ['login', 'access', 'error'])])
-        themes['Transaction Performance'].extend(
-            [k for k, _ in keywords if any(x in k for x in ['transfer', 'slow', 'crash'])])
-        themes['User Interface & Experience'].extend(
-            [k for k, _ in keywords if any(x in k for x in ['ui', 'interface', 'easy'])])
-        themes['Customer Support'].extend([k for k, _ in keywords if any(
-            x in k for x in ['support', 'help', 'service'])])
-        themes['Feature Requests'].extend(
-            [k for k, _ in keywords if any(x in k for x in ['feature', 'update', 'add'])])
-
-    elif "bank of abyssinia" in bank_name.lower():
-        themes['Transaction Performance'].extend(
-            [k for k, _ in keywords if any(x in k for x in ['transfer', 'delay', 'fail'])])
-        themes['Account Access Issues'].extend(
-            [k for k, _ in keywords if any(x in k for x in ['login', 'password', 'issue'])])
-        themes['User Interface & Experience'].extend([k for k, _ in keywords if any(
-            x in k for x in ['design', 'navigation', 'simple'])])
-        themes['Customer Support'].extend([k for k, _ in keywords if any(
-            x in k for x in ['contact', 'assistance', 'team'])])
-
-    elif "dashen bank" in bank_name.lower():
-        themes['User Interface & Experience'].extend(
-            [k for k, _ in keywords if any(x in k for x in ['layout', 'smooth', 'app'])])
-        themes['Transaction Performance'].extend(
-            [k for k, _ in keywords if any(x in k for x in ['payment', 'slow', 'process'])])
-        themes['Account Access Issues'].extend(
-            [k for k, _ in keywords if any(x in k for x in ['sign', 'lock', 'problem'])])
-        themes['Feature Requests'].extend(
-            [k for k, _ in keywords if any(x in k for x in ['new', 'option', 'improve'])])
-
-    # Remove duplicates and empty themes
-    for theme in list(themes.keys()):
-        themes[theme] = list(dict.fromkeys(themes[theme]))
-        if not themes[theme]:
-            del themes[theme]
-
-    logging.info(f"Assigned themes for {bank_name}: {list(themes.keys())}")
+    """Group the top keywords under the bank's configured themes (a keyword may fall under several)."""
+    matcher = ThemeMatcher(load_theme_config(bank_name))
+    terms = pd.Series([k for k, _ in keywords], dtype=object)
+    matches = matcher.match(terms)
+    themes = {theme: terms[matches[theme]].drop_duplicates().tolist() for theme in matcher.themes}
+    themes = {theme: theme_keywords for theme, theme_keywords in themes.items() if theme_keywords}
+
+    logger.info(f"Assigned themes for {bank_name}: {list(themes.keys())}")
     return themes
 
 
-def process_bank_reviews(input_dir: str, output_dir: str, bank_name: str):
-    """Process reviews for a single bank, extract keywords, assign themes, and save."""
+def process_bank_reviews(input_dir: str, output_dir: str, bank_name: str, batch_size: int = 1000,
+                         n_process: int = 1):
+    """
+    Process reviews for a single bank, extract keywords, assign themes, and save.
+
+    Review texts are lemmatized in batches of `batch_size` through
+    `nlp.pipe`, on `n_process` processes.
+    """
     safe_bank_name = bank_name.replace(' ', '_').lower()
-    input_path = os.path.join(input_dir, f"{safe_bank_name}_clean.csv")
+    input_path = os.path.join(input_dir, f"{safe_bank_name}_clean")
 
-    if not os.path.exists(input_path):
-        logging.error(f"Input file not found for {bank_name}: {input_path}")
+    if not table_exists(input_path):
+        logger.error(f"Input file not found for {bank_name}: {input_path}")
         return
 
     # Load data
-    df = pd.read_csv(input_path)
-    logging.info(f"Loaded {len(df)} cleaned reviews for {bank_name}")
+    df = read_table(input_path)
+    logger.info(f"Loaded {len(df)} cleaned reviews for {bank_name}")
 
     # Preprocess text
-    df['processed_text'] = df['review_text'].apply(preprocess_text)
+    lemmatizer = get_lemmatizer()
+    lemmatizer.batch_size, lemmatizer.n_process = batch_size, n_process
+    df['processed_text'] = lemmatize_series(df['review_text'], lemmatizer)
 
     # Extract keywords
     keywords = extract_keywords(df['processed_text'].dropna())
-    logging.info(f"Extracted top keywords for {bank_name}: {keywords}")
+    logger.info(f"Extracted top keywords for {bank_name}: {keywords}")
 
     # Assign themes
     themes = assign_themes(keywords, bank_name)
+    logger.info(f"Top keywords by theme for {bank_name}: {themes}")
 
-    # Map themes to reviews (simplified rule-based assignment)
-    def assign_review_theme(row):
-        text = row['processed_text'].lower()
-        for theme, theme_keywords in themes.items():
-            if any(keyword in text for keyword in theme_keywords):
-                return theme
-        return 'Other'
-
-    df['identified_theme'] = df.apply(assign_review_theme, axis=1)
+    # Label every review with each theme whose top keywords it contains, in one pass
+    labels = ThemeMatcher(themes).label(df['processed_text'])
+    df['identified_theme'] = labels['identified_theme']
+    df['identified_themes'] = labels['identified_themes']
 
     # Save results
     output_path = os.path.join(
-        output_dir, f"{safe_bank_name}_thematic_analysis.csv")
-    df.to_csv(output_path, index=False, encoding='utf-8')
-    logging.info(f"Saved thematic analysis for {bank_name} to {output_path}")
-
+        output_dir, f"{safe_bank_name}_thematic_analysis")
+    write_table(df, output_path)
+    logger.info(f"Saved thematic analysis for {bank_name} to {output_path}")
+
+
+def rank_thematic_keywords(thematic_dir: str, banks: list, window: str = 'M', top_n: int = 10,
+                           hashing: bool = False, chunk_size: int = 100_000):
+    """
+    Rank keywords per bank and per bank and time window from one fitted model.
+
+    The model is fitted once over every bank's processed text, then the
+    thematic tables are streamed again in chunks to accumulate per-group
+    TF-IDF totals. With `hashing=True` fitting is chunked too, so memory stays
+    bounded for very large corpora. Rankings are saved to `keyword_rankings`
+    and `keyword_rankings_by_window` in `thematic_dir`.
+    """
+    stems = {}
+    for bank in banks:
+        stem = os.path.join(thematic_dir, f"{bank.replace(' ', '_').lower()}_thematic_analysis")
+        if table_exists(stem):
+            stems[bank] = stem
+    if not stems:
+        logger.error("No thematic tables found to rank keywords")
+        return
 
-def thematic():
+    def chunks(columns):
+        for bank, stem in stems.items():
+            for chunk in iter_table(stem, columns=columns, chunk_size=chunk_size):
+                chunk['bank'] = bank
+                yield chunk
+
+    engine = KeywordEngine(hashing=hashing)
+    if hashing:
+        for chunk in chunks(['processed_text']):
+            engine.partial_fit(chunk['processed_text'].fillna('').astype(str))
+    else:
+        texts = pd.concat([chunk['processed_text'] for chunk in chunks(['processed_text'])], ignore_index=True)
+        engine.fit(texts)
+
+    by_bank = engine.rank_keywords(
+        ((chunk['processed_text'], window_keys(chunk, ['bank'])) for chunk in chunks(['processed_text'])), top_n)
+    by_window = engine.rank_keywords(
+        ((chunk['processed_text'], window_keys(chunk, ['bank'], window))
+         for chunk in chunks(['processed_text', 'date'])), top_n)
+    write_table(by_bank, os.path.join(thematic_dir, "keyword_rankings"))
+    write_table(by_window, os.path.join(thematic_dir, "keyword_rankings_by_window"))
+    logger.info(
+        f"Saved keyword rankings for {len(stems)} banks ({len(by_bank)} bank rows, {len(by_window)} window rows)")
+
+
+def discover_themes(thematic_dir: str, banks: list, n_clusters: int = 8, model_path: str = DEFAULT_MODEL_PATH):
+    """
+    Cluster all banks' processed reviews into themes and label the thematic tables.
+
+    The fitted clusters are saved to `model_path`, so reviews scored later
+    can be assigned with `assign_discovered_themes` without refitting.
+    Adds `discovered_theme_id` and `discovered_theme` to each thematic table.
+    """
+    tables = {}
+    for bank in banks:
+        stem = os.path.join(thematic_dir, f"{bank.replace(' ', '_').lower()}_thematic_analysis")
+        if table_exists(stem):
+            tables[stem] = read_table(stem)
+    if not tables:
+        logger.error("No thematic tables found to discover themes")
+        return None
+
+    texts = pd.concat([df['processed_text'] for df in tables.values()], ignore_index=True)
+    model = ThemeDiscovery(n_clusters=n_clusters).fit(texts)
+    model.save(model_path)
+    for stem, df in tables.items():
+        labels = model.label(df['processed_text'])
+        df['discovered_theme_id'] = labels['discovered_theme_id']
+        df['discovered_theme'] = labels['discovered_theme']
+        write_table(df, stem)
+        logger.info(f"Saved discovered themes to {stem}")
+    return model
+
+
+@instrumented('thematic')
+def thematic(n_process: int = 1, batch_size: int = 1000, discover: bool = False, n_clusters: int = 8):
     input_dir = "./../data/processed"
     output_dir = "./../data/thematically_analyzed"
     os.makedirs(output_dir, exist_ok=True)
@@ -143,6 +176,11 @@ def thematic():
              'bank of abyssinia reviews', 'dashen bank reviews']
 
     for bank in banks:
-        process_bank_reviews(input_dir, output_dir, bank)
+        process_bank_reviews(input_dir, output_dir, bank, batch_size=batch_size, n_process=n_process)
+
+    rank_thematic_keywords(output_dir, banks)
+
+    if discover:
+        discover_themes(output_dir, banks, n_clusters=n_clusters)
 
 
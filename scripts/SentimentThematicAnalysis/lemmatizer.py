@@ -0,0 +1,122 @@
+import os
+import time
+from importlib import metadata
+from typing import Dict, List, Optional, Tuple
+
+import pandas as pd
+
+from scripts.common.logging_config import ROOT, get_logger
+from scripts.common.text_cache import TextCache, normalize_text
+
+# Set up logging
+logger = get_logger(__name__, "keyword_extraction.log")
+
+SPACY_MODEL = "en_core_web_sm"
+# Only lemmas and stopword flags are used; the lemmatizer still needs tok2vec,
+# tagger and attribute_ruler for part-of-speech tags
+DISABLED_COMPONENTS = ('parser', 'ner')
+DEFAULT_CACHE_PATH = os.path.join(ROOT, 'data', 'cache', 'lemmas.sqlite')
+
+_nlp: Dict[Tuple[str, Tuple[str, ...]], object] = {}
+
+
+def download_spacy_model(model_name: str = SPACY_MODEL) -> None:
+    """One-time provisioning step; loading never downloads anything."""
+    from spacy.cli import download
+
+    download(model_name)
+    logger.info(f"Downloaded spaCy model '{model_name}'")
+
+
+def load_nlp(model_name: str = SPACY_MODEL, disable: Tuple[str, ...] = DISABLED_COMPONENTS):
+    """Load a spaCy pipeline once per (model, disabled components)."""
+    key = (model_name, tuple(disable))
+    if key not in _nlp:
+        import spacy
+
+        try:
+            _nlp[key] = spacy.load(model_name, disable=list(disable))
+        except OSError as e:
+            raise OSError(
+                f"spaCy model '{model_name}' is not installed; run download_spacy_model() first") from e
+        logger.info(f"spaCy model '{model_name}' loaded with pipes {_nlp[key].pipe_names}")
+    return _nlp[key]
+
+
+def model_version(model_name: str = SPACY_MODEL) -> str:
+    """Identifier of the installed model package, used to key cached lemmas."""
+    try:
+        return f"{model_name}@{metadata.version(model_name)}"
+    except metadata.PackageNotFoundError:
+        return model_name
+
+
+class LemmaCache(TextCache):
+    """Lemmatized text keyed by (spaCy model version, normalized text)."""
+
+    def __init__(self, path: str = DEFAULT_CACHE_PATH, max_entries: int = 2_000_000):
+        super().__init__(path, table='lemmas', max_entries=max_entries)
+
+    def get_lemmas(self, version: str, texts: List[str]) -> Dict[str, str]:
+        hits = self.get_many((version, text) for text in texts)
+        return {text: value for (_, text), value in hits.items()}
+
+    def put_lemmas(self, version: str, lemmas: Dict[str, str]) -> None:
+        self.put_many({(version, text): value for text, value in lemmas.items()})
+
+
+def _lemmas(doc) -> str:
+    return " ".join(token.lemma_ for token in doc if not token.is_stop and token.is_alpha)
+
+
+class SpacyLemmatizer:
+    """
+    Batch lemmatization with spaCy.
+
+    Identical texts are lemmatized once, cached results are reused across
+    runs, and the remaining texts are streamed through `nlp.pipe` in batches
+    of `batch_size`, across `n_process` worker processes when more than one.
+    The model is loaded on first use, with the parser and NER disabled.
+    """
+
+    def __init__(self, model_name: str = SPACY_MODEL, batch_size: int = 1000, n_process: int = 1,
+                 cache: Optional[LemmaCache] = None, use_cache: bool = True):
+        self.model_name = model_name
+        self.batch_size = batch_size
+        self.n_process = n_process
+        self.version = model_version(model_name)
+        self.cache = cache if cache is not None or not use_cache else LemmaCache()
+
+    def lemmatize_many(self, texts: List[str]) -> List[str]:
+        """Return space-joined lemmas of the non-stopword alphabetic tokens, in input order."""
+        cleaned = pd.Series(texts, dtype=object).map(
+            lambda text: normalize_text(text) if isinstance(text, str) else '')
+        codes, unique_texts = pd.factorize(cleaned)
+        unique_texts = unique_texts.tolist()
+
+        lemmas = self.cache.get_lemmas(self.version, unique_texts) if self.cache is not None else {}
+        lemmas[''] = ''
+        misses = [text for text in unique_texts if text not in lemmas]
+        if misses:
+            started = time.perf_counter()
+            nlp = load_nlp(self.model_name)
+            fresh = dict(zip(misses, (
+                _lemmas(doc) for doc in nlp.pipe(misses, batch_size=self.batch_size, n_process=self.n_process))))
+            if self.cache is not None:
+                self.cache.put_lemmas(self.version, fresh)
+            lemmas.update(fresh)
+            elapsed = time.perf_counter() - started
+            logger.info(
+                f"Lemmatized {len(misses)} texts in {elapsed:.2f}s on {self.n_process} processes "
+                f"({len(unique_texts) - len(misses)} unique texts from cache)")
+
+        unique_lemmas = [lemmas[text] for text in unique_texts]
+        return [unique_lemmas[code] for code in codes]
+
+    def lemmatize(self, text: str) -> str:
+        return self.lemmatize_many([text])[0]
+
+
+def lemmatize_series(texts: pd.Series, lemmatizer: Optional[SpacyLemmatizer] = None) -> pd.Series:
+    lemmatizer = lemmatizer or SpacyLemmatizer()
+    return pd.Series(lemmatizer.lemmatize_many(texts.tolist()), index=texts.index)
@@ -0,0 +1,107 @@
+import os
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from scripts.common.logging_config import ROOT, get_logger
+
+# Set up logging
+logger = get_logger(__name__, "analyze_sentiment.log")
+
+# Inference backends for the sentiment stage:
+#   torch       - full-precision PyTorch model (reference)
+#   torch-int8  - PyTorch with Linear layers dynamically quantized to int8
+#   onnx        - ONNX Runtime on a model exported by export_onnx()
+BACKENDS = ('torch', 'torch-int8', 'onnx')
+DEFAULT_BACKEND = os.getenv('SENTIMENT_BACKEND', 'torch')
+
+DEFAULT_ONNX_DIR = os.path.join(ROOT, 'models', 'onnx')
+
+
+def onnx_model_dir(model_name: str, onnx_dir: str = DEFAULT_ONNX_DIR) -> str:
+    return os.path.join(onnx_dir, model_name.replace('/', '__'))
+
+
+def export_onnx(model_name: str, revision: str = 'main', onnx_dir: str = DEFAULT_ONNX_DIR) -> str:
+    """
+    Offline step: export the model to ONNX for the 'onnx' backend.
+
+    Requires `optimum[onnxruntime]`. Returns the directory the model and its
+    tokenizer were saved to.
+    """
+    try:
+        from optimum.onnxruntime import ORTModelForSequenceClassification
+    except ImportError as e:
+        raise ImportError(
+            "The 'onnx' sentiment backend needs optimum[onnxruntime]; install it to export the model") from e
+    from transformers import AutoTokenizer
+
+    output_dir = onnx_model_dir(model_name, onnx_dir)
+    model = ORTModelForSequenceClassification.from_pretrained(
+        model_name, revision=revision, export=True)
+    model.save_pretrained(output_dir)
+    AutoTokenizer.from_pretrained(model_name, revision=revision).save_pretrained(output_dir)
+    logger.info(f"Exported {model_name}@{revision} to ONNX at {output_dir}")
+    return output_dir
+
+
+def load_model(model_name: str, revision: str = 'main', backend: str = DEFAULT_BACKEND,
+               onnx_dir: str = DEFAULT_ONNX_DIR) -> Tuple[object, object]:
+    """Load (model, tokenizer) for a backend, ready to pass to `transformers.pipeline`."""
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown sentiment backend '{backend}'; expected one of {BACKENDS}")
+    from transformers import AutoModelForSequenceClassification, AutoTokenizer
+
+    if backend == 'onnx':
+        try:
+            from optimum.onnxruntime import ORTModelForSequenceClassification
+        except ImportError as e:
+            raise ImportError(
+                "The 'onnx' sentiment backend needs optimum[onnxruntime]") from e
+        model_dir = onnx_model_dir(model_name, onnx_dir)
+        if not os.path.isdir(model_dir):
+            raise FileNotFoundError(
+                f"No ONNX export at {model_dir}; run export_onnx('{model_name}') first")
+        return ORTModelForSequenceClassification.from_pretrained(model_dir), AutoTokenizer.from_pretrained(model_dir)
+
+    model = AutoModelForSequenceClassification.from_pretrained(model_name, revision=revision)
+    model.eval()
+    if backend == 'torch-int8':
+        import torch
+        model = torch.quantization.quantize_dynamic(
+            model, {torch.nn.Linear}, dtype=torch.qint8)
+    return model, AutoTokenizer.from_pretrained(model_name, revision=revision)
+
+
+def check_parity(texts: List[str], backend: str, reference: str = 'torch', model_name: Optional[str] = None,
+                 max_score_diff: float = 0.05, min_label_agreement: float = 0.98) -> Dict:
+    """
+    Compare a backend with the reference backend on a sample of texts.
+
+    Returns:
+        Dict: Label agreement rate, max/mean absolute score difference, per-backend
+            throughput and whether both thresholds were met.
+    """
+    from scripts.SentimentThematicAnalysis.sentiment_engine import DEFAULT_MODEL, score_texts
+
+    model_name = model_name or DEFAULT_MODEL
+    ref_labels, ref_scores, ref_throughput = score_texts(texts, model_name=model_name, backend=reference)
+    labels, scores, throughput = score_texts(texts, model_name=model_name, backend=backend)
+
+    agreement = float(np.mean(ref_labels == labels)) if len(texts) else 1.0
+    # Binary model: compare the probability of the reference label so flipped labels count fully
+    aligned = np.where(labels == ref_labels, scores, 1.0 - scores)
+    diffs = np.abs(aligned - ref_scores)
+    report = {
+        'backend': backend,
+        'reference': reference,
+        'samples': len(texts),
+        'label_agreement': agreement,
+        'max_score_diff': float(diffs.max()) if len(texts) else 0.0,
+        'mean_score_diff': float(diffs.mean()) if len(texts) else 0.0,
+        'reference_reviews_per_sec': ref_throughput,
+        'backend_reviews_per_sec': throughput,
+    }
+    report['passed'] = report['label_agreement'] >= min_label_agreement and report['max_score_diff'] <= max_score_diff
+    logger.info(f"Sentiment backend parity: {report}")
+    return report
@@ -0,0 +1,43 @@
+import json
+import os
+from typing import Dict, List, Optional, Tuple
+
+from scripts.common.logging_config import ROOT, get_logger
+from scripts.common.text_cache import TextCache
+
+# Set up logging
+logger = get_logger(__name__, "analyze_sentiment.log")
+
+DEFAULT_CACHE_PATH = os.path.join(ROOT, 'data', 'cache', 'sentiment.sqlite')
+
+
+class SentimentCache(TextCache):
+    """
+    Sentiment results keyed by (model version, normalized text), with LRU eviction.
+
+    Keying on the model version means upgrading the model never serves stale
+    labels from an older one.
+    """
+
+    def __init__(self, path: str = DEFAULT_CACHE_PATH, max_entries: int = 2_000_000):
+        super().__init__(path, table='sentiment', max_entries=max_entries)
+
+    def get_results(self, version: str, texts: List[str]) -> Dict[str, Tuple[str, float]]:
+        """Return cached (label, score) for the given texts, keyed by text."""
+        hits = self.get_many((version, text) for text in texts)
+        return {text: tuple(json.loads(value)) for (_, text), value in hits.items()}
+
+    def put_results(self, version: str, results: Dict[str, Tuple[str, float]]) -> None:
+        self.put_many({(version, text): json.dumps([label, float(score)])
+                       for text, (label, score) in results.items()})
+
+
+_cache: Optional[SentimentCache] = None
+
+
+def get_sentiment_cache() -> SentimentCache:
+    """Return the shared on-disk sentiment cache, opening it on first use."""
+    global _cache
+    if _cache is None:
+        _cache = SentimentCache()
+    return _cache
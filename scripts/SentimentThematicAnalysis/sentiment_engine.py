@@ -0,0 +1,130 @@
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from scripts.SentimentThematicAnalysis.sentiment_backends import DEFAULT_BACKEND, load_model
+from scripts.common.instrumentation import inc, span
+from scripts.common.logging_config import get_logger
+
+# Set up logging
+logger = get_logger(__name__, "analyze_sentiment.log")
+
+DEFAULT_MODEL = "distilbert-base-uncased-finetuned-sst-2-english"
+# Hub revision the model is loaded from; part of the sentiment cache key
+DEFAULT_REVISION = "main"
+# Longest input the model accepts, in tokens
+MAX_SEQUENCE_LENGTH = 512
+
+_pipelines: Dict[Tuple[str, str, Optional[int], str], object] = {}
+_pipelines_lock = threading.Lock()
+
+
+def model_version(model_name: str = DEFAULT_MODEL, revision: str = DEFAULT_REVISION,
+                  backend: str = DEFAULT_BACKEND) -> str:
+    """Identifier of the exact model weights and backend, used to key cached results."""
+    version = f"{model_name}@{revision}"
+    return version if backend == 'torch' else f"{version}+{backend}"
+
+
+def get_sentiment_pipeline(model_name: str = DEFAULT_MODEL, num_threads: Optional[int] = None,
+                           revision: str = DEFAULT_REVISION, backend: str = DEFAULT_BACKEND):
+    """
+    Return a cached transformers sentiment pipeline.
+
+    The model is loaded once per (model, revision, thread count, backend) and
+    reused by every later call. `num_threads` caps torch intra-op CPU threads.
+    """
+    key = (model_name, revision, num_threads, backend)
+    with _pipelines_lock:
+        if key not in _pipelines:
+            import torch
+            from transformers import pipeline
+
+            if num_threads:
+                torch.set_num_threads(num_threads)
+            model, tokenizer = load_model(model_name, revision, backend)
+            _pipelines[key] = pipeline(
+                "sentiment-analysis",
+                model=model,
+                tokenizer=tokenizer,
+                top_k=None
+            )
+            logger.info(
+                f"Loaded sentiment model {model_version(model_name, revision, backend)} (torch threads={torch.get_num_threads()})")
+        return _pipelines[key]
+
+
+def set_sentiment_pipeline(analyzer, model_name: str = DEFAULT_MODEL, num_threads: Optional[int] = None,
+                           revision: str = DEFAULT_REVISION, backend: str = DEFAULT_BACKEND) -> None:
+    """Register a ready-made pipeline under a key, e.g. an offline stand-in for benchmarks."""
+    with _pipelines_lock:
+        _pipelines[(model_name, revision, num_threads, backend)] = analyzer
+
+
+def plan_batches(lengths: np.ndarray, token_budget: int = 8192, max_batch_size: int = 64) -> List[np.ndarray]:
+    """
+    Group row positions into length-sorted batches.
+
+    Rows are sorted by token length so each batch pads to a similar length,
+    and a batch is closed once `batch_rows * longest_row` would exceed
+    `token_budget` or it reaches `max_batch_size` rows.
+
+    Returns:
+        List[np.ndarray]: Original row positions for each batch.
+    """
+    order = np.argsort(lengths, kind='stable')
+    batches, start = [], 0
+    for end in range(1, len(order) + 1):
+        # Sorted ascending, so the last row in the window is the longest
+        size = end - start
+        if size > max_batch_size or size * lengths[order[end - 1]] > token_budget:
+            if size > 1:
+                batches.append(order[start:end - 1])
+                start = end - 1
+    if start < len(order):
+        batches.append(order[start:])
+    return batches
+
+
+def score_texts(texts: List[str], model_name: str = DEFAULT_MODEL, num_threads: Optional[int] = None,
+                token_budget: int = 8192, max_batch_size: int = 64,
+                revision: str = DEFAULT_REVISION, backend: str = DEFAULT_BACKEND) -> Tuple[np.ndarray, np.ndarray, float]:
+    """
+    Score texts with length-bucketed dynamic batching.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray, float]: Top label and score per text in
+            input order, and throughput in texts/sec.
+    """
+    labels = np.empty(len(texts), dtype=object)
+    scores = np.zeros(len(texts), dtype=np.float64)
+    if not texts:
+        return labels, scores, 0.0
+
+    analyzer = get_sentiment_pipeline(model_name, num_threads, revision, backend)
+    started = time.perf_counter()
+    lengths = np.fromiter(
+        (len(ids) for ids in analyzer.tokenizer(
+            texts, truncation=True, max_length=MAX_SEQUENCE_LENGTH)['input_ids']),
+        dtype=np.int64, count=len(texts)
+    )
+    batches = plan_batches(lengths, token_budget, max_batch_size)
+    for batch_num, positions in enumerate(batches, start=1):
+        batch = [texts[i] for i in positions]
+        with span('sentiment.batch', backend=backend):
+            results = analyzer(batch, batch_size=len(batch),
+                               truncation=True, max_length=MAX_SEQUENCE_LENGTH)
+        inc('rows', len(batch), stage='sentiment')
+        inc('tokens', int(lengths[positions].max()) * len(batch), stage='sentiment')
+        labels[positions] = [result[0]['label'] for result in results]
+        scores[positions] = [result[0]['score'] for result in results]
+        logger.info(
+            f"Processed batch {batch_num}/{len(batches)} ({len(batch)} reviews, {int(lengths[positions].max())} tokens)")
+
+    elapsed = time.perf_counter() - started
+    throughput = len(texts) / elapsed if elapsed > 0 else float('inf')
+    logger.info(
+        f"Scored {len(texts)} reviews in {elapsed:.2f}s ({throughput:.1f} reviews/sec)")
+    return labels, scores, throughput
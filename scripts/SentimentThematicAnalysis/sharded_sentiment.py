@@ -0,0 +1,112 @@
+import multiprocessing
+import os
+import shutil
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from scripts.SentimentThematicAnalysis.sentiment_backends import DEFAULT_BACKEND
+from scripts.SentimentThematicAnalysis.sentiment_engine import DEFAULT_MODEL, DEFAULT_REVISION
+from scripts.common.logging_config import get_logger
+from scripts.common.storage import read_table, write_table
+
+# Set up logging
+logger = get_logger(__name__, "analyze_sentiment.log")
+
+# Rough resident memory of one worker holding the default model, in GB
+DEFAULT_MEMORY_PER_WORKER_GB = 1.5
+
+
+def plan_workers(requested: Optional[int] = None, memory_per_worker_gb: float = DEFAULT_MEMORY_PER_WORKER_GB) -> int:
+    """
+    Cap the worker count by CPU cores and by available memory.
+
+    Each worker loads its own model copy, so no more workers are started than
+    fit in currently available memory at `memory_per_worker_gb` each.
+    """
+    import psutil
+
+    cores = os.cpu_count() or 1
+    requested = requested or cores
+    available_gb = psutil.virtual_memory().available / 1024 ** 3
+    fits = max(1, int(available_gb // memory_per_worker_gb))
+    workers = max(1, min(requested, cores, fits))
+    if workers < requested:
+        logger.warning(
+            f"Reducing sentiment workers from {requested} to {workers} "
+            f"({cores} cores, {available_gb:.1f} GB available, {memory_per_worker_gb} GB per worker)")
+    return workers
+
+
+def _score_shard(input_path: str, output_path: str, num_threads: int, model_name: str, revision: str,
+                 use_cache: bool, backend: str) -> Tuple[int, float]:
+    """Worker entry point: score one on-disk shard and write its results to disk."""
+    from scripts.SentimentThematicAnalysis.analyze_sentiment import analyze_sentiment
+
+    shard = read_table(input_path)
+    result = analyze_sentiment(shard, model_name=model_name, num_threads=num_threads,
+                               revision=revision, use_cache=use_cache, backend=backend)
+    write_table(result, output_path)
+    return len(result), result.attrs.get('throughput', 0.0)
+
+
+def analyze_sentiment_sharded(reviews_df: pd.DataFrame, workers: Optional[int] = None,
+                              memory_per_worker_gb: float = DEFAULT_MEMORY_PER_WORKER_GB,
+                              model_name: str = DEFAULT_MODEL, revision: str = DEFAULT_REVISION,
+                              use_cache: bool = True, work_dir: Optional[str] = None,
+                              backend: str = DEFAULT_BACKEND) -> pd.DataFrame:
+    """
+    Score reviews across several worker processes, one model copy per worker.
+
+    The frame is split into contiguous shards written to a scratch directory.
+    Each worker reads its shard, scores it with torch intra-op threads capped
+    at `cores // workers`, and writes its results back to disk; the
+    coordinator reads the result tables in shard order, so no DataFrames are
+    pickled between processes.
+
+    Returns:
+        pd.DataFrame: Same columns and row order as `analyze_sentiment`.
+    """
+    workers = plan_workers(workers, memory_per_worker_gb)
+    threads_per_worker = max(1, (os.cpu_count() or 1) // workers)
+    scratch = tempfile.mkdtemp(prefix='sentiment_shards_', dir=work_dir)
+    started = time.perf_counter()
+    try:
+        jobs = []
+        for shard_num, positions in enumerate(np.array_split(np.arange(len(reviews_df)), workers)):
+            if len(positions) == 0:
+                continue
+            input_path = os.path.join(scratch, f"input_{shard_num}")
+            output_path = os.path.join(scratch, f"output_{shard_num}")
+            write_table(reviews_df.iloc[positions], input_path)
+            jobs.append((input_path, output_path))
+
+        logger.info(
+            f"Scoring {len(reviews_df)} reviews on {len(jobs)} workers x {threads_per_worker} threads")
+        # Spawn rather than fork: torch thread pools do not survive fork safely
+        context = multiprocessing.get_context('spawn')
+        with ProcessPoolExecutor(max_workers=len(jobs), mp_context=context) as executor:
+            futures = [
+                executor.submit(_score_shard, input_path, output_path,
+                                threads_per_worker, model_name, revision, use_cache, backend)
+                for input_path, output_path in jobs
+            ]
+            for shard_num, future in enumerate(futures):
+                rows, throughput = future.result()
+                logger.info(
+                    f"Shard {shard_num}: {rows} reviews at {throughput:.1f} reviews/sec")
+
+        sentiment_df = pd.concat([read_table(output_path) for _, output_path in jobs], ignore_index=True)
+    finally:
+        shutil.rmtree(scratch, ignore_errors=True)
+
+    elapsed = time.perf_counter() - started
+    throughput = len(sentiment_df) / elapsed if elapsed > 0 else float('inf')
+    sentiment_df.attrs['throughput'] = throughput
+    logger.info(
+        f"Sharded sentiment scored {len(sentiment_df)} reviews in {elapsed:.2f}s ({throughput:.1f} reviews/sec)")
+    return sentiment_df
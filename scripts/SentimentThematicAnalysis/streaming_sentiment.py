@@ -0,0 +1,161 @@
+import json
+import os
+import re
+import time
+from typing import Dict, Optional
+
+import pandas as pd
+
+from scripts.SentimentThematicAnalysis.analyze_sentiment import (
+    BANKS, INPUT_COLUMNS, analyze_sentiment, input_stem, output_stem)
+from scripts.SentimentThematicAnalysis.sentiment_backends import DEFAULT_BACKEND
+from scripts.SentimentThematicAnalysis.sentiment_engine import DEFAULT_MODEL, DEFAULT_REVISION, model_version
+from scripts.common.logging_config import get_logger
+from scripts.common.storage import STORAGE_FORMAT, iter_table, table_exists, write_table
+
+# Set up logging
+logger = get_logger(__name__, "analyze_sentiment.log")
+
+CHECKPOINT_FILE_NAME = '.sentiment_checkpoint.json'
+
+# Parquet parts written by the streaming mode are named after their first input row
+_PART_PATTERN = re.compile(r'^part-(\d{12})-\d+\.parquet$')
+
+
+def empty_result() -> pd.DataFrame:
+    """A scored table with no rows, typed like `analyze_sentiment` output."""
+    return pd.DataFrame({
+        'review_id': pd.Series(dtype=object),
+        'review_text': pd.Series(dtype=object),
+        'sentiment_label': pd.Series(dtype=object),
+        'sentiment_score': pd.Series(dtype='float64'),
+        'bank': pd.Series(dtype=object),
+        'rating': pd.Series(dtype='float64'),
+        'date': pd.Series(dtype='datetime64[ns]'),
+    })
+
+
+def load_checkpoint(checkpoint_path: str) -> Dict:
+    """Load streaming progress; returns an empty checkpoint when none has been saved."""
+    if not os.path.exists(checkpoint_path):
+        return {}
+    try:
+        with open(checkpoint_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except Exception as e:
+        logger.error(f"Error reading sentiment checkpoint {checkpoint_path}: {str(e)}")
+        return {}
+
+
+def save_checkpoint(state: Dict, checkpoint_path: str) -> None:
+    """Atomically write streaming progress."""
+    tmp_path = checkpoint_path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(state, f, indent=2)
+    os.replace(tmp_path, checkpoint_path)
+
+
+def _discard_uncommitted(stem: str, fmt: str, progress: Dict) -> None:
+    """Drop output written after the last checkpoint so resumed chunks are not duplicated."""
+    if fmt == 'csv':
+        path = stem + '.csv'
+        if os.path.exists(path) and os.path.getsize(path) > progress['output_bytes']:
+            with open(path, 'r+b') as f:
+                f.truncate(progress['output_bytes'])
+            logger.info(f"Truncated {path} to its last checkpoint")
+        return
+    if not os.path.isdir(stem):
+        return
+    for name in os.listdir(stem):
+        match = _PART_PATTERN.match(name)
+        if match and int(match.group(1)) >= progress['rows_done']:
+            os.remove(os.path.join(stem, name))
+            logger.info(f"Removed uncommitted part {name} from {stem}")
+
+
+def stream_sentiment(input_dir: str, output_dir: str, chunk_size: int = 10_000,
+                     checkpoint_path: Optional[str] = None, resume: bool = True, fmt: Optional[str] = None,
+                     model_name: str = DEFAULT_MODEL, revision: str = DEFAULT_REVISION,
+                     num_threads: Optional[int] = None, backend: str = DEFAULT_BACKEND) -> Dict:
+    """
+    Score every bank's processed reviews in bounded chunks.
+
+    Each chunk of at most `chunk_size` rows is read, scored with
+    `analyze_sentiment` and appended to the bank's output table before the
+    next one is read, so memory use does not grow with the corpus. After
+    every chunk the number of input rows done per bank is checkpointed; a
+    later run with `resume=True` skips those rows and discards any output
+    written after the last checkpoint. The checkpoint is removed once all
+    banks are done. It is ignored if the model version or output format
+    changed since it was written.
+
+    Returns:
+        Dict: Final progress per bank.
+    """
+    fmt = fmt or STORAGE_FORMAT
+    version = model_version(model_name, revision, backend)
+    checkpoint_path = checkpoint_path or os.path.join(output_dir, CHECKPOINT_FILE_NAME)
+    os.makedirs(output_dir, exist_ok=True)
+
+    state = load_checkpoint(checkpoint_path) if resume else {}
+    if state and (state.get('model_version') != version or state.get('format') != fmt):
+        logger.warning(
+            f"Ignoring sentiment checkpoint for {state.get('model_version')} ({state.get('format')}); "
+            f"starting over with {version} ({fmt})")
+        state = {}
+    state = state or {'model_version': version, 'format': fmt, 'banks': {}}
+
+    for bank in BANKS:
+        source = input_stem(input_dir, bank)
+        if not table_exists(source):
+            logger.warning(f"File not found for {bank}: {source}")
+            continue
+        progress = state['banks'].setdefault(
+            bank, {'rows_done': 0, 'output_bytes': 0, 'completed': False})
+        if progress['completed']:
+            logger.info(f"Skipping {bank}: already scored in the checkpointed run")
+            continue
+        target = output_stem(output_dir, bank)
+        if progress['rows_done']:
+            logger.info(f"Resuming {bank} after {progress['rows_done']} rows")
+            _discard_uncommitted(target, fmt, progress)
+        else:
+            # Replace the previous run's output, including parts past the end of a shorter input;
+            # the first chunk's part takes over this empty one's name
+            write_table(empty_result(), target, fmt=fmt, part_name=f"{0:012d}")
+
+        started = time.perf_counter()
+        scored = 0
+        offset = 0
+        for chunk in iter_table(source, columns=INPUT_COLUMNS, chunk_size=chunk_size):
+            start, offset = offset, offset + len(chunk)
+            if offset <= progress['rows_done']:
+                continue
+            if start < progress['rows_done']:
+                chunk = chunk.iloc[progress['rows_done'] - start:].copy()
+                start = progress['rows_done']
+            chunk['bank'] = bank
+
+            result = analyze_sentiment(chunk, model_name=model_name, num_threads=num_threads,
+                                       revision=revision, backend=backend)
+            path = write_table(result, target, fmt=fmt, append=True, part_name=f"{start:012d}")
+
+            progress['rows_done'] = offset
+            if fmt == 'csv':
+                progress['output_bytes'] = os.path.getsize(path)
+            save_checkpoint(state, checkpoint_path)
+            scored += len(result)
+            logger.info(
+                f"{bank}: scored rows {start}-{offset} ({result.attrs['throughput']:.1f} reviews/sec)")
+
+        progress['completed'] = True
+        save_checkpoint(state, checkpoint_path)
+        elapsed = time.perf_counter() - started
+        logger.info(
+            f"Streamed {scored} {bank} reviews to {target} in {elapsed:.2f}s "
+            f"({scored / elapsed if elapsed > 0 else 0.0:.1f} reviews/sec)")
+
+    if os.path.exists(checkpoint_path):
+        os.remove(checkpoint_path)
+    logger.info("Streaming sentiment run complete; checkpoint removed")
+    return state['banks']
@@ -0,0 +1,149 @@
+import os
+import time
+from typing import TYPE_CHECKING, Dict, List
+
+import numpy as np
+import pandas as pd
+
+if TYPE_CHECKING:
+    from scipy import sparse
+
+from scripts.SentimentThematicAnalysis.keyword_engine import top_k
+from scripts.common.logging_config import ROOT, get_logger
+
+# Set up logging
+logger = get_logger(__name__, "keyword_extraction.log")
+
+DEFAULT_MODEL_PATH = os.path.join(ROOT, 'models', 'theme_clusters.joblib')
+
+# Cluster id of texts with no known terms (empty, or only stop words)
+NO_CLUSTER = -1
+
+
+class ThemeDiscovery:
+    """
+    Discover themes by clustering reviews instead of matching hand-written keywords.
+
+    Texts are embedded with TF-IDF followed by truncated SVD and L2
+    normalization, clustered with MiniBatchKMeans, and each cluster is named
+    after its top TF-IDF terms. Fresh reviews are embedded the same way and
+    assigned with `kmeans.predict`, so they get the cluster `fit` would have
+    given them. Texts without any known term embed to zero and get
+    `NO_CLUSTER` instead of an arbitrary cluster.
+    """
+
+    def __init__(self, n_clusters: int = 8, n_components: int = 100, max_features: int = 5000,
+                 batch_size: int = 4096, top_terms: int = 5, random_state: int = 42):
+        self.n_clusters = n_clusters
+        self.n_components = n_components
+        self.max_features = max_features
+        self.batch_size = batch_size
+        self.top_terms = top_terms
+        self.random_state = random_state
+        self.vectorizer = None
+        self.svd = None
+        self.kmeans = None
+        self.cluster_terms: List[List[str]] = []
+
+    @property
+    def cluster_names(self) -> List[str]:
+        return [', '.join(terms[:3]) or f'cluster {i}' for i, terms in enumerate(self.cluster_terms)]
+
+    def _embed(self, tfidf: 'sparse.csr_matrix') -> np.ndarray:
+        from sklearn.preprocessing import normalize
+
+        return normalize(self.svd.transform(tfidf), norm='l2')
+
+    def fit(self, texts: pd.Series) -> 'ThemeDiscovery':
+        from scipy import sparse
+        from sklearn.cluster import MiniBatchKMeans
+        from sklearn.decomposition import TruncatedSVD
+        from sklearn.feature_extraction.text import TfidfVectorizer
+
+        started = time.perf_counter()
+        texts = texts.fillna('').astype(str)
+        self.vectorizer = TfidfVectorizer(
+            max_features=self.max_features, ngram_range=(1, 2), stop_words='english')
+        tfidf = self.vectorizer.fit_transform(texts)
+        # SVD needs fewer components than features
+        n_components = max(1, min(self.n_components, tfidf.shape[1] - 1))
+        self.svd = TruncatedSVD(n_components=n_components, random_state=self.random_state)
+        self.svd.fit(tfidf)
+        embeddings = self._embed(tfidf)
+        # Texts without known terms would all pile into one cluster; leave them out
+        members = np.flatnonzero(embeddings.any(axis=1))
+        if not len(members):
+            raise ValueError("ThemeDiscovery needs at least one text with known terms")
+
+        n_clusters = max(1, min(self.n_clusters, len(members)))
+        self.kmeans = MiniBatchKMeans(n_clusters=n_clusters, batch_size=self.batch_size, n_init=3,
+                                      random_state=self.random_state)
+        labels = self.kmeans.fit_predict(embeddings[members])
+
+        # Name each cluster after the terms with the highest summed TF-IDF among its members
+        membership = sparse.csr_matrix(
+            (np.ones(len(labels)), (labels, members)), shape=(n_clusters, len(texts)))
+        totals = (membership @ tfidf).tocsr()
+        names = self.vectorizer.get_feature_names_out()
+        self.cluster_terms = []
+        for cluster in range(n_clusters):
+            row = totals.getrow(cluster)
+            indices, _ = top_k(row.indices, row.data, self.top_terms)
+            self.cluster_terms.append(names[indices].tolist())
+
+        logger.info(
+            f"Discovered {n_clusters} themes from {len(texts)} reviews in {time.perf_counter() - started:.2f}s: "
+            f"{self.cluster_names}")
+        return self
+
+    def predict(self, texts) -> np.ndarray:
+        """KMeans cluster id per text, or `NO_CLUSTER` for texts without known terms."""
+        if getattr(self, 'kmeans', None) is None:
+            raise ValueError("ThemeDiscovery must be fitted or loaded before predict")
+        texts = [text if isinstance(text, str) else '' for text in texts]
+        ids = np.full(len(texts), NO_CLUSTER, dtype=np.int64)
+        if not texts:
+            return ids
+        embeddings = self._embed(self.vectorizer.transform(texts))
+        members = embeddings.any(axis=1)
+        if members.any():
+            ids[members] = self.kmeans.predict(embeddings[members])
+        return ids
+
+    def label(self, texts: pd.Series) -> pd.DataFrame:
+        """`discovered_theme_id` and `discovered_theme` (cluster name, or None) per text."""
+        ids = self.predict(texts)
+        names = np.array(self.cluster_names + [None], dtype=object)
+        # NO_CLUSTER (-1) picks the trailing None
+        return pd.DataFrame({'discovered_theme_id': ids, 'discovered_theme': names[ids]},
+                            index=getattr(texts, 'index', None))
+
+    def save(self, path: str = DEFAULT_MODEL_PATH) -> str:
+        import joblib
+
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        joblib.dump(self, path)
+        logger.info(f"Saved theme clusters to {path}")
+        return path
+
+    @staticmethod
+    def load(path: str = DEFAULT_MODEL_PATH) -> 'ThemeDiscovery':
+        import joblib
+
+        return joblib.load(path)
+
+
+_models: Dict[str, ThemeDiscovery] = {}
+
+
+def get_theme_model(path: str = DEFAULT_MODEL_PATH) -> ThemeDiscovery:
+    """Return the persisted theme model, loading it once per process."""
+    if path not in _models:
+        _models[path] = ThemeDiscovery.load(path)
+    return _models[path]
+
+
+def assign_discovered_themes(texts: pd.Series, path: str = DEFAULT_MODEL_PATH) -> pd.DataFrame:
+    """Assign fresh processed texts to the persisted clusters without refitting."""
+    return get_theme_model(path).label(texts)
@@ -0,0 +1,97 @@
+import glob
+import json
+import os
+import re
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from scripts.common.logging_config import get_logger
+
+# Set up logging
+logger = get_logger(__name__, "keyword_extraction.log")
+
+# One JSON file per bank: {"bank": <name fragment>, "themes": {theme: [keywords]}}
+THEME_CONFIG_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'themes')
+OTHER_THEME = 'Other'
+THEME_SEPARATOR = '; '
+
+
+def load_theme_config(bank_name: str, config_dir: str = THEME_CONFIG_DIR) -> Dict[str, List[str]]:
+    """
+    Load the theme definitions for a bank.
+
+    The first config whose `bank` value appears in `bank_name` (case
+    insensitive) is used; theme order in the file is the priority order.
+    """
+    for path in sorted(glob.glob(os.path.join(config_dir, '*.json'))):
+        with open(path, 'r', encoding='utf-8') as f:
+            config = json.load(f)
+        if config['bank'].lower() in bank_name.lower():
+            return config['themes']
+    logger.warning(f"No theme config for {bank_name} in {config_dir}")
+    return {}
+
+
+class ThemeMatcher:
+    """
+    Match texts against many theme keywords in one compiled pattern.
+
+    All keywords are combined into a single case-insensitive regex with word
+    boundaries, longest first, and a whole Series is scanned in one
+    vectorized `str.findall` pass. A keyword that contains another keyword
+    (e.g. "login error" and "error") also counts for the shorter one's
+    themes, so the non-overlapping scan never loses a theme.
+    """
+
+    def __init__(self, themes: Dict[str, List[str]]):
+        self.themes = list(themes)
+        keyword_themes: Dict[str, set] = {}
+        for theme_idx, keywords in enumerate(themes.values()):
+            for keyword in keywords:
+                keyword_themes.setdefault(keyword.lower().strip(), set()).add(theme_idx)
+        keyword_themes.pop('', None)
+
+        keywords = sorted(keyword_themes, key=lambda k: (-len(k), k))
+        for keyword in keywords:
+            for other in keywords:
+                if other != keyword and re.search(rf'\b{re.escape(other)}\b', keyword):
+                    keyword_themes[keyword] |= keyword_themes[other]
+        self._keyword_themes = {k: sorted(v) for k, v in keyword_themes.items()}
+        self.pattern: Optional[re.Pattern] = re.compile(
+            r'\b(?:' + '|'.join(re.escape(k) for k in keywords) + r')\b',
+            re.IGNORECASE
+        ) if keywords else None
+
+    def match(self, texts: pd.Series) -> pd.DataFrame:
+        """Boolean frame with one column per theme, aligned with `texts`."""
+        matches = np.zeros((len(texts), len(self.themes)), dtype=bool)
+        if self.pattern is not None and len(texts):
+            found = texts.fillna('').astype(str).str.findall(self.pattern)
+            found = found.reset_index(drop=True).explode().dropna().str.lower()
+            theme_ids = found.map(self._keyword_themes).explode()
+            matches[theme_ids.index.to_numpy(), theme_ids.to_numpy(dtype=np.int64)] = True
+        return pd.DataFrame(matches, index=texts.index, columns=self.themes)
+
+    def label(self, texts: pd.Series) -> pd.DataFrame:
+        """
+        Label texts with every matching theme.
+
+        Returns:
+            pd.DataFrame: `identified_theme`, the first matching theme in config
+                order (or 'Other'), and `identified_themes`, all matching themes
+                joined with '; ' (or 'Other').
+        """
+        matches = self.match(texts).to_numpy(dtype=bool)
+        # Trailing 'Other' column is set exactly when no theme matched
+        values = np.column_stack([matches, ~matches.any(axis=1)])
+        names = np.array(self.themes + [OTHER_THEME], dtype=object)
+
+        # Join each distinct match pattern once instead of once per row
+        patterns, codes = np.unique(values, axis=0, return_inverse=True)
+        joined = np.array([THEME_SEPARATOR.join(names[row]) for row in patterns], dtype=object)
+        return pd.DataFrame({
+            'identified_theme': names[values.argmax(axis=1)],
+            'identified_themes': joined[np.asarray(codes, dtype=np.int64).reshape(-1)],
+        }, index=texts.index)
@@ -0,0 +1,92 @@
+from typing import Dict, Iterator, Optional
+
+import numpy as np
+import pandas as pd
+
+# Corpus sizes selectable by name
+SCALES = {'1k': 1_000, '10k': 10_000, '100k': 100_000, '1m': 1_000_000, '10m': 10_000_000}
+
+# Share of each kind of review, close to what the scraper returns; duplicates
+# are exact copies (same review_id) of earlier rows
+DEFAULT_MIX = {'english': 0.72, 'amharic': 0.10, 'emoji': 0.08, 'duplicate': 0.10}
+
+BANK_NAMES = ['Commercial Bank of Ethiopia', 'Bank of Abyssinia', 'Dashen Bank']
+
+POSITIVE_WORDS = ['good', 'great', 'excellent', 'fast', 'easy to use', 'reliable', 'amazing', 'helpful']
+NEGATIVE_WORDS = ['slow', 'bad', 'terrible', 'buggy', 'useless', 'frustrating', 'unreliable', 'annoying']
+SUBJECTS = ['app', 'transfer', 'login', 'update', 'customer service', 'interface', 'OTP', 'balance check',
+            'mobile banking', 'payment', 'account access', 'network connection']
+CLAUSES = ['', ' since the last update', ' most of the time', ' when I send money', ' every morning',
+           ', please fix it', ', thank you', ' compared to other banks', ' on my phone', ' these days']
+
+AMHARIC_TEXTS = ['በጣም ጥሩ መተግበሪያ ነው', 'አይሰራም', 'በጣም ቀርፋፋ ነው', 'አመሰግናለሁ', 'ጥሩ ነው ግን ይቆራረጣል',
+                 'ገንዘብ መላክ አልቻልኩም', 'ምርጥ ባንክ', 'እባካችሁ አስተካክሉት']
+EMOJI_TEXTS = ['👍', '👍👍', '🙏', '😡', '❤️', '👌🏾', '🔥🔥🔥', '😞', '💯', '🙏🙏🙏']
+
+
+def _english(rng: np.random.Generator, ratings: np.ndarray) -> np.ndarray:
+    """Template reviews whose tone follows the star rating."""
+    n = len(ratings)
+    positive = rng.random(n) < (ratings - 1) / 4
+    words = np.where(positive, np.array(POSITIVE_WORDS, dtype=object)[rng.integers(0, len(POSITIVE_WORDS), n)],
+                     np.array(NEGATIVE_WORDS, dtype=object)[rng.integers(0, len(NEGATIVE_WORDS), n)])
+    subjects = np.array(SUBJECTS, dtype=object)[rng.integers(0, len(SUBJECTS), n)]
+    clauses = np.array(CLAUSES, dtype=object)[rng.integers(0, len(CLAUSES), n)]
+    return 'The ' + subjects + ' is ' + words + clauses
+
+
+def generate_corpus(n_rows: int, seed: int = 42, mix: Optional[Dict[str, float]] = None,
+                    start_index: int = 0) -> pd.DataFrame:
+    """
+    Generate synthetic scraped reviews with the raw table's columns.
+
+    The same `n_rows`, `seed`, `mix` and `start_index` always produce the same
+    frame. Rows are English templates (tone follows the rating), Amharic
+    script, emoji-only or duplicates of earlier rows, in `mix` proportions.
+    """
+    mix = mix or DEFAULT_MIX
+    rng = np.random.default_rng([seed, start_index])
+    kinds = np.array(list(mix), dtype=object)
+    probabilities = np.array(list(mix.values()), dtype=np.float64)
+    kind = kinds[rng.choice(len(kinds), size=n_rows, p=probabilities / probabilities.sum())]
+
+    ratings = rng.integers(1, 6, n_rows)
+    texts = np.empty(n_rows, dtype=object)
+    english = kind != 'amharic'
+    texts[english] = _english(rng, ratings[english])
+    texts[kind == 'amharic'] = np.array(AMHARIC_TEXTS, dtype=object)[
+        rng.integers(0, len(AMHARIC_TEXTS), int((kind == 'amharic').sum()))]
+    texts[kind == 'emoji'] = np.array(EMOJI_TEXTS, dtype=object)[
+        rng.integers(0, len(EMOJI_TEXTS), int((kind == 'emoji').sum()))]
+
+    banks = np.array(BANK_NAMES, dtype=object)[rng.integers(0, len(BANK_NAMES), n_rows)]
+    dates = pd.Timestamp('2024-01-01') + pd.to_timedelta(rng.integers(0, 540 * 86_400, n_rows), unit='s')
+    ids = pd.Series(np.arange(start_index, start_index + n_rows)).astype(str).str.zfill(12).to_numpy(dtype=object)
+    df = pd.DataFrame({
+        'review_id': pd.Series(banks).str.replace(' ', '_').to_numpy(dtype=object) + '_bench' + ids,
+        'review_text': texts,
+        'rating': ratings,
+        'date': dates,
+        'bank_name': banks,
+        'source': 'Google Play',
+    })
+
+    # Duplicates repeat a random earlier row (same id and content), as re-scraped pages do
+    duplicates = np.flatnonzero(kind == 'duplicate')
+    duplicates = duplicates[duplicates > 0]
+    if len(duplicates):
+        # Copy only from rows that are not overwritten themselves, so the duplicate share is exact
+        originals = np.setdiff1d(np.arange(n_rows), duplicates)
+        earlier = np.searchsorted(originals, duplicates)
+        sources = originals[(rng.random(len(duplicates)) * earlier).astype(np.int64)]
+        df.iloc[duplicates] = df.iloc[sources].to_numpy()
+    df['rating'] = df['rating'].astype(np.int64)
+    df['date'] = pd.to_datetime(df['date'])
+    return df
+
+
+def iter_corpus(n_rows: int, chunk_size: int = 100_000, seed: int = 42,
+                mix: Optional[Dict[str, float]] = None) -> Iterator[pd.DataFrame]:
+    """Generate a corpus chunk by chunk, so 10M-row runs never hold it all in memory."""
+    for start in range(0, n_rows, chunk_size):
+        yield generate_corpus(min(chunk_size, n_rows - start), seed, mix, start_index=start)
@@ -0,0 +1,272 @@
+"""
+Offline benchmarks for each pipeline stage and for the pipeline end to end.
+
+A seeded synthetic corpus is fed to each stage in batches; the translator,
+sentiment model and database are replaced by offline stubs, and so is the
+NLTK normalizer when its data is not provisioned. Results
+(throughput, per-batch latency percentiles, peak RSS) are written as JSON and
+can be compared against a stored baseline.
+
+    python -m scripts.benchmarks.run_benchmarks --rows 100k --output bench.json
+    python -m scripts.benchmarks.run_benchmarks --rows 100k --baseline bench.json
+"""
+import argparse
+import json
+import os
+import platform
+import resource
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from typing import Callable, Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from scripts.benchmarks.corpus import SCALES, iter_corpus
+from scripts.common.logging_config import get_logger
+
+# Set up logging
+logger = get_logger(__name__, "benchmarks.log")
+
+STAGES = ['preprocess', 'sentiment', 'keywords', 'themes', 'load', 'end_to_end']
+
+# Metrics compared against a baseline, and whether higher values are better
+COMPARED_METRICS = {'rows_per_sec': True, 'latency_ms.p50': False, 'latency_ms.p95': False, 'peak_rss_mb': False}
+
+
+def reset_peak_rss() -> None:
+    """Reset the kernel's peak-RSS mark so the next reading covers one stage (Linux only)."""
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+    except OSError:
+        pass
+
+
+def peak_rss_mb() -> float:
+    """Peak resident memory since the last reset, or since process start where resetting is unsupported."""
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Kilobytes on Linux, bytes on macOS
+    return peak / (1024 * 1024 if sys.platform == 'darwin' else 1024)
+
+
+def measure(stage: str, batches: Iterable[pd.DataFrame], fn: Callable[[pd.DataFrame], object]) -> Dict:
+    """
+    Time `fn` on each batch.
+
+    Only the calls to `fn` are timed, not producing the batches. Throughput
+    is rows per second of stage time; latencies are per batch.
+    """
+    reset_peak_rss()
+    latencies, rows = [], 0
+    for batch in batches:
+        started = time.perf_counter()
+        fn(batch)
+        latencies.append(time.perf_counter() - started)
+        rows += len(batch)
+
+    seconds = float(sum(latencies))
+    latencies_ms = np.array(latencies or [0.0]) * 1000
+    result = {
+        'rows': rows,
+        'batches': len(latencies),
+        'seconds': round(seconds, 4),
+        'rows_per_sec': round(rows / seconds, 1) if seconds > 0 else 0.0,
+        'latency_ms': {f'p{q}': round(float(np.percentile(latencies_ms, q)), 3) for q in (50, 90, 95, 99)},
+        'peak_rss_mb': round(peak_rss_mb(), 1),
+    }
+    result['latency_ms']['max'] = round(float(latencies_ms.max()), 3)
+    logger.info(f"Benchmark {stage}: {result}")
+    return result
+
+
+def build_stages(db_dir: str, translation_latency: float = 0.0, cost_per_token: float = 0.0,
+                 normalizer: str = 'nltk') -> Dict[str, Callable[[pd.DataFrame], object]]:
+    """Per-batch callables for every stage, wired to the offline stubs."""
+    from scripts.benchmarks.stubs import STUB_MODEL, install_stubs, stub_database
+    from scripts.db.database import ReviewRepository
+    from scripts.preprocessing.preprocess_reviews import preprocess_series
+    from scripts.SentimentThematicAnalysis.analyze_sentiment import analyze_sentiment
+    from scripts.SentimentThematicAnalysis.keyword_extraction import assign_themes, extract_keywords
+    from scripts.SentimentThematicAnalysis.theme_matcher import ThemeMatcher, load_theme_config
+
+    install_stubs(translation_latency, cost_per_token, normalizer)
+    matchers = {}
+
+    def as_reviews(batch: pd.DataFrame) -> pd.DataFrame:
+        return batch.rename(columns={'bank_name': 'bank'})
+
+    def preprocess(batch):
+        return batch.assign(review_text=preprocess_series(batch['review_text']))
+
+    def sentiment(batch):
+        return analyze_sentiment(as_reviews(batch), model_name=STUB_MODEL, use_cache=False)
+
+    def keywords(batch):
+        for bank, bank_batch in batch.groupby('bank_name'):
+            assign_themes(extract_keywords(bank_batch['review_text']), bank)
+
+    def themes(batch):
+        labels = []
+        for bank, bank_batch in batch.groupby('bank_name'):
+            if bank not in matchers:
+                matchers[bank] = ThemeMatcher(load_theme_config(bank))
+            labels.append(matchers[bank].label(bank_batch['review_text']))
+        return batch.join(pd.concat(labels))
+
+    def loader(name: str) -> Callable[[pd.DataFrame], object]:
+        # Each writing stage gets its own database, so none finds the other's reviews already stored
+        repository = ReviewRepository(stub_database(os.path.join(db_dir, name)))
+        bank_ids = {}
+
+        def load(batch):
+            reviews = as_reviews(batch)
+            if 'sentiment_label' not in reviews:
+                reviews = reviews.assign(sentiment_label=np.where(reviews['rating'] >= 3, 'POSITIVE', 'NEGATIVE'),
+                                         sentiment_score=0.9)
+            missing = set(reviews['bank'].unique()) - set(bank_ids)
+            if missing:
+                bank_ids.update(repository.upsert_banks(sorted(missing)))
+            return repository.upsert_reviews(reviews, bank_ids)
+        return load
+
+    load, load_scored = loader('load'), loader('end_to_end')
+
+    def end_to_end(batch):
+        processed = preprocess(batch)
+        scored = sentiment(processed).rename(columns={'bank': 'bank_name'})
+        load_scored(themes(scored))
+
+    return {'preprocess': preprocess, 'sentiment': sentiment, 'keywords': keywords,
+            'themes': themes, 'load': load, 'end_to_end': end_to_end}
+
+
+def run_benchmarks(rows: int, stages: Optional[List[str]] = None, batch_size: int = 1000, seed: int = 42,
+                   translation_latency: float = 0.0, cost_per_token: float = 0.0, normalizer: str = 'auto') -> Dict:
+    """
+    Run the selected stage benchmarks on a `rows`-row synthetic corpus.
+
+    `normalizer` is 'nltk', 'stub' or 'auto' (NLTK if provisioned); the one
+    used is recorded in the results. A stage that raises is reported with
+    its error instead of stopping the remaining benchmarks.
+    """
+    from scripts.benchmarks.stubs import resolve_normalizer
+
+    stages = stages or STAGES
+    normalizer = resolve_normalizer(normalizer)
+    results = {
+        'meta': {
+            'rows': rows, 'batch_size': batch_size, 'seed': seed,
+            'translation_latency': translation_latency, 'cost_per_token': cost_per_token, 'normalizer': normalizer,
+            'python': platform.python_version(), 'platform': platform.platform(),
+            'cpu_count': os.cpu_count(), 'timestamp': datetime.now(timezone.utc).isoformat(),
+        },
+        'stages': {},
+    }
+    with tempfile.TemporaryDirectory(prefix='review_bench_') as db_dir:
+        fns = build_stages(db_dir, translation_latency, cost_per_token, normalizer)
+        for stage in stages:
+            try:
+                results['stages'][stage] = measure(stage, iter_corpus(rows, batch_size, seed), fns[stage])
+            except Exception as e:
+                logger.error(f"Benchmark {stage} failed: {e}")
+                results['stages'][stage] = {'error': f"{type(e).__name__}: {' '.join(str(e).split())[:300]}"}
+    return results
+
+
+def _metric(result: Dict, metric: str):
+    for part in metric.split('.'):
+        result = result.get(part) if isinstance(result, dict) else None
+    return result
+
+
+def compare_results(current: Dict, baseline: Dict, tolerance: float = 0.10) -> List[Dict]:
+    """
+    Diff stage metrics against a baseline run.
+
+    A metric regresses when it is worse than the baseline by more than
+    `tolerance` (relative), e.g. throughput down or p95 latency up by 10%.
+    A stage that fails now but succeeded in the baseline is a regression too.
+    """
+    rows = []
+    for stage, result in current['stages'].items():
+        base = baseline.get('stages', {}).get(stage)
+        if base and 'error' not in base and 'error' in result:
+            rows.append({'stage': stage, 'metric': 'error', 'baseline': 'ok', 'current': 'error',
+                         'change': None, 'regression': True})
+            continue
+        if not base or 'error' in base or 'error' in result:
+            continue
+        for metric, higher_is_better in COMPARED_METRICS.items():
+            old, new = _metric(base, metric), _metric(result, metric)
+            if not old or new is None:
+                continue
+            change = (new - old) / old
+            worse = -change if higher_is_better else change
+            rows.append({'stage': stage, 'metric': metric, 'baseline': old, 'current': new,
+                         'change': round(change, 4), 'regression': worse > tolerance})
+    return rows
+
+
+def parse_rows(value: str) -> int:
+    return SCALES[value.lower()] if value.lower() in SCALES else int(value)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog='python -m scripts.benchmarks.run_benchmarks', description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=parse_rows, default=SCALES['10k'],
+                        help=f"corpus size: a row count or one of {', '.join(SCALES)}")
+    parser.add_argument('--stages', nargs='+', choices=STAGES, default=STAGES)
+    parser.add_argument('--batch-size', type=int, default=1000)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--translation-latency', type=float, default=0.0,
+                        help='seconds the stub translator sleeps per request')
+    parser.add_argument('--cost-per-token', type=float, default=0.0,
+                        help='seconds the stub model sleeps per padded token')
+    parser.add_argument('--normalizer', choices=['auto', 'nltk', 'stub'], default='auto',
+                        help='text normalizer for preprocessing: NLTK, an offline stub, or NLTK if provisioned')
+    parser.add_argument('--output', help='write results JSON here (default: stdout)')
+    parser.add_argument('--baseline', help='results JSON to compare against')
+    parser.add_argument('--tolerance', type=float, default=0.10, help='allowed relative regression')
+    args = parser.parse_args(argv)
+
+    results = run_benchmarks(args.rows, args.stages, args.batch_size, args.seed,
+                             args.translation_latency, args.cost_per_token, args.normalizer)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+    else:
+        print(json.dumps(results, indent=2))
+
+    failed = [stage for stage, result in results['stages'].items() if 'error' in result]
+    for stage in failed:
+        print(f"{stage} failed: {results['stages'][stage]['error']}", file=sys.stderr)
+    if not args.baseline:
+        return 1 if failed else 0
+    with open(args.baseline, 'r', encoding='utf-8') as f:
+        baseline = json.load(f)
+    for key in ('rows', 'batch_size', 'seed', 'translation_latency', 'cost_per_token', 'normalizer'):
+        if baseline['meta'].get(key) != results['meta'][key]:
+            print(f"Warning: baseline {key}={baseline['meta'].get(key)} differs from {results['meta'][key]}",
+                  file=sys.stderr)
+    comparison = compare_results(results, baseline, args.tolerance)
+    for row in comparison:
+        flag = 'REGRESSION' if row['regression'] else 'ok'
+        change = f"({row['change']:+.1%}) " if row['change'] is not None else ''
+        print(f"{row['stage']:12} {row['metric']:16} {row['baseline']:>12} -> {row['current']:>12} "
+              f"{change}{flag}", file=sys.stderr)
+    return 1 if failed or any(row['regression'] for row in comparison) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
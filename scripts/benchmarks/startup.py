@@ -0,0 +1,138 @@
+"""
+Startup-time benchmark for the pipeline entry points.
+
+Each module is imported in a fresh interpreter (best of several runs) to
+measure what a CLI invocation pays before doing any work. An entry point
+fails when it exceeds the time budget or loads a deferred dependency (a
+model framework, NLP library or DB driver) at import time.
+
+    python -m scripts.benchmarks.startup --output startup.json
+    python -m scripts.benchmarks.startup --baseline startup.json
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+from typing import Dict, List, Optional
+
+from scripts.common.logging_config import get_logger
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Set up logging
+logger = get_logger(__name__, "benchmarks.log")
+
+# Importable entry points; analysis modules resolve their paths relative to notebooks/
+ENTRY_POINTS = [
+    'scripts.pipeline',
+    'scripts.prepare',
+    'scripts.db.create_schema',
+    'scripts.db.insert_reviews',
+    'scripts.scraping.scrape_reviews',
+    'scripts.preprocessing.clean_pipeline',
+    'scripts.preprocessing.preprocess_reviews',
+    'scripts.SentimentThematicAnalysis.analyze_sentiment',
+    'scripts.SentimentThematicAnalysis.keyword_extraction',
+    'scripts.SentimentThematicAnalysis.theme_discovery',
+    'scripts.benchmarks.run_benchmarks',
+]
+
+# Dependencies that must only be imported when first used
+DEFERRED_MODULES = ['torch', 'transformers', 'optimum', 'spacy', 'nltk', 'sklearn', 'scipy',
+                    'deep_translator', 'oracledb', 'matplotlib', 'seaborn']
+
+PROBE = """
+import json, sys, time
+started = time.perf_counter()
+import {module}
+seconds = time.perf_counter() - started
+print(json.dumps({{'seconds': seconds, 'modules': len(sys.modules),
+                  'deferred': sorted(name for name in {deferred!r} if name in sys.modules)}}))
+"""
+
+
+def time_import(module: str, repeat: int = 5) -> Dict:
+    """Import `module` in `repeat` fresh interpreters and keep the fastest run."""
+    env = dict(os.environ, PYTHONPATH=ROOT, PYTHONDONTWRITEBYTECODE='1')
+    runs = []
+    for _ in range(repeat):
+        completed = subprocess.run(
+            [sys.executable, '-c', PROBE.format(module=module, deferred=DEFERRED_MODULES)],
+            cwd=os.path.join(ROOT, 'notebooks'), env=env, capture_output=True, text=True)
+        if completed.returncode != 0:
+            return {'error': ' '.join(completed.stderr.split()[-30:])}
+        runs.append(json.loads(completed.stdout.strip().splitlines()[-1]))
+    best = min(runs, key=lambda run: run['seconds'])
+    return {'seconds': round(best['seconds'], 4), 'modules': best['modules'], 'deferred_loaded': best['deferred']}
+
+
+def run_startup_benchmark(modules: Optional[List[str]] = None, repeat: int = 5, budget: float = 1.0) -> Dict:
+    """Time every entry point and flag the ones over `budget` seconds or loading deferred modules."""
+    results = {}
+    for module in modules or ENTRY_POINTS:
+        result = time_import(module, repeat)
+        if 'error' not in result:
+            result['ok'] = result['seconds'] <= budget and not result['deferred_loaded']
+        logger.info(f"Startup {module}: {result}")
+        results[module] = result
+    return {'meta': {'repeat': repeat, 'budget': budget, 'python': sys.version.split()[0]}, 'entry_points': results}
+
+
+def compare_startup(current: Dict, baseline: Dict, tolerance: float = 0.25, floor: float = 0.05) -> List[Dict]:
+    """
+    Diff import times against a baseline run.
+
+    An entry point regresses when it is more than `tolerance` (relative) and
+    `floor` seconds slower, so noise on near-instant imports is ignored.
+    """
+    rows = []
+    for module, result in current['entry_points'].items():
+        base = baseline.get('entry_points', {}).get(module)
+        if not base or 'error' in base or 'error' in result:
+            continue
+        old, new = base['seconds'], result['seconds']
+        change = (new - old) / old if old else 0.0
+        rows.append({'module': module, 'baseline': old, 'current': new, 'change': round(change, 4),
+                     'regression': change > tolerance and new - old > floor})
+    return rows
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog='python -m scripts.benchmarks.startup', description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('modules', nargs='*', help='entry point modules (default: all)')
+    parser.add_argument('--repeat', type=int, default=5, help='fresh interpreters per module')
+    parser.add_argument('--budget', type=float, default=1.0, help='maximum import time in seconds')
+    parser.add_argument('--output', help='write results JSON here')
+    parser.add_argument('--baseline', help='results JSON to compare against')
+    parser.add_argument('--tolerance', type=float, default=0.25, help='allowed relative slowdown')
+    args = parser.parse_args(argv)
+
+    results = run_startup_benchmark(args.modules, args.repeat, args.budget)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+
+    failed = False
+    for module, result in results['entry_points'].items():
+        if 'error' in result:
+            failed = True
+            print(f"{module:52} ERROR {result['error']}")
+            continue
+        failed = failed or not result['ok']
+        deferred = f" loads {', '.join(result['deferred_loaded'])}" if result['deferred_loaded'] else ''
+        print(f"{module:52} {result['seconds']:>7.3f}s {'ok' if result['ok'] else 'FAIL'}{deferred}")
+
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        for row in compare_startup(results, baseline, args.tolerance):
+            failed = failed or row['regression']
+            print(f"{row['module']:52} {row['baseline']:>7.3f}s -> {row['current']:>7.3f}s "
+                  f"({row['change']:+.1%}) {'REGRESSION' if row['regression'] else 'ok'}", file=sys.stderr)
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
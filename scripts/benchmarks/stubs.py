@@ -0,0 +1,128 @@
+"""
+Offline stand-ins for the network and model dependencies, so benchmarks
+measure this repo's code rather than MyMemory, Hugging Face or Oracle.
+"""
+import os
+import re
+import tempfile
+import time
+from typing import Dict, List, Optional
+
+from scripts.common.logging_config import get_logger
+from scripts.db.database import SQLiteDatabase
+from scripts.preprocessing.preprocess_reviews import set_normalizer, set_translation_service
+from scripts.preprocessing.text_normalizer import TextNormalizer
+from scripts.preprocessing.translation import TranslationBackend, TranslationService
+from scripts.SentimentThematicAnalysis.sentiment_engine import MAX_SEQUENCE_LENGTH, set_sentiment_pipeline
+
+# Set up logging
+logger = get_logger(__name__, "benchmarks.log")
+
+STUB_MODEL = 'benchmark-stub'
+
+# Enough of NLTK's English stopword list to shape the stub's output similarly
+STUB_STOPWORDS = frozenset(['a', 'an', 'the', 'is', 'are', 'was', 'it', 'i', 'my', 'me', 'to', 'of', 'and',
+                            'or', 'in', 'on', 'for', 'with', 'this', 'that', 'when', 'since', 'most', 'these',
+                            'every', 'other', 'than', 'please', 'you', 'be', 'not', 'but', 'so', 'very'])
+
+NEGATIVE_TERMS = frozenset(['slow', 'bad', 'terrible', 'buggy', 'useless', 'frustrating', 'unreliable',
+                            'annoying', 'fix', 'not', 'fail', 'error'])
+
+
+class StubTranslationBackend(TranslationBackend):
+    """Deterministic 'translation' with an optional per-request delay standing in for API latency."""
+
+    name = 'stub'
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self.calls = 0
+
+    def translate(self, text: str, source: str) -> str:
+        self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+        return f"translated review {len(text)} characters"
+
+
+class StubNormalizer(TextNormalizer):
+    """Regex tokenizer, a fixed stopword list and identity lemmas; needs no NLTK data."""
+
+    def __init__(self):
+        self._tokenize = re.compile(r"\w+|[^\w\s]").findall
+        self.stop_words = STUB_STOPWORDS
+        self._lemmas = {}
+
+    def lemmatize(self, token: str) -> str:
+        return token
+
+
+def resolve_normalizer(normalizer: str = 'auto') -> str:
+    """
+    'nltk' or 'stub'. 'auto' picks NLTK when its data is provisioned and
+    otherwise falls back to the stub, so the suite always runs offline.
+    """
+    if normalizer != 'auto':
+        return normalizer
+    try:
+        TextNormalizer().normalize('benchmark warm-up')
+        return 'nltk'
+    except (ImportError, LookupError):
+        logger.warning("NLTK data not found; benchmarking the stub normalizer. "
+                       "Run `python -m scripts.prepare nltk` to benchmark the real one.")
+        return 'stub'
+
+
+class StubTokenizer:
+    """Whitespace tokenizer with the transformers call signature used by `score_texts`."""
+
+    def __call__(self, texts: List[str], truncation: bool = True, max_length: int = MAX_SEQUENCE_LENGTH) -> Dict:
+        ids = [list(range(min(len(text.split()) + 2, max_length))) for text in texts]
+        return {'input_ids': ids}
+
+
+class StubSentimentPipeline:
+    """
+    Lexicon classifier shaped like a transformers sentiment pipeline.
+
+    `cost_per_token` seconds are slept per padded token in a batch, so batch
+    planning still affects timings the way it does for a real model.
+    """
+
+    def __init__(self, cost_per_token: float = 0.0):
+        self.tokenizer = StubTokenizer()
+        self.cost_per_token = cost_per_token
+
+    def __call__(self, texts: List[str], batch_size: int = 1, truncation: bool = True,
+                 max_length: int = MAX_SEQUENCE_LENGTH) -> List[List[Dict]]:
+        if self.cost_per_token:
+            longest = max((len(text.split()) for text in texts), default=0)
+            time.sleep(self.cost_per_token * len(texts) * min(longest + 2, max_length))
+        results = []
+        for text in texts:
+            negative = any(word.strip('.,!?') in NEGATIVE_TERMS for word in text.lower().split())
+            label, other = ('NEGATIVE', 'POSITIVE') if negative else ('POSITIVE', 'NEGATIVE')
+            results.append([{'label': label, 'score': 0.9}, {'label': other, 'score': 0.1}])
+        return results
+
+
+def install_stubs(translation_latency: float = 0.0, cost_per_token: float = 0.0,
+                  normalizer: str = 'nltk') -> StubTranslationBackend:
+    """
+    Route translation and the `STUB_MODEL` sentiment model to offline stubs,
+    and text normalization too when `normalizer` is 'stub'.
+
+    Translation caching is disabled so every run does the same work.
+    """
+    if normalizer == 'stub':
+        set_normalizer(StubNormalizer())
+    backend = StubTranslationBackend(translation_latency)
+    set_translation_service(TranslationService(backend, cache=None))
+    set_sentiment_pipeline(StubSentimentPipeline(cost_per_token), model_name=STUB_MODEL)
+    return backend
+
+
+def stub_database(directory: Optional[str] = None) -> SQLiteDatabase:
+    """A fresh SQLite database standing in for Oracle."""
+    directory = directory or tempfile.mkdtemp(prefix='review_bench_')
+    return SQLiteDatabase(os.path.join(directory, 'reviews.sqlite'))
@@ -0,0 +1,204 @@
+"""
+Process-wide metrics, timing spans and an opt-in profiler hook.
+
+Counters and span timings are kept in memory (a few microseconds per
+update) and can be dumped as JSON or Prometheus text. Environment variables:
+
+    REVIEW_METRICS_PATH   dump metrics here at exit; a `.prom` suffix selects
+                          Prometheus text, and `{pid}` is replaced with the
+                          process id so worker processes don't overwrite each other
+    REVIEW_PROFILE        'cpu', 'memory' or 'cpu,memory' to profile every
+                          instrumented entry point with cProfile / tracemalloc
+    REVIEW_PROFILE_DIR    where profiles are written (default logs/profiles)
+"""
+import atexit
+import json
+import math
+import os
+import re
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+from typing import Dict, Optional, Tuple
+
+from scripts.common.logging_config import LOG_DIR, get_logger
+
+# Set up logging
+logger = get_logger(__name__, "metrics.log")
+
+METRICS_PATH = os.getenv("REVIEW_METRICS_PATH")
+PROFILE_MODES = frozenset(mode.strip() for mode in os.getenv("REVIEW_PROFILE", "").split(",") if mode.strip())
+PROFILE_DIR = os.getenv("REVIEW_PROFILE_DIR", os.path.join(LOG_DIR, "profiles"))
+
+# Upper bounds in seconds of the span duration histogram buckets
+SPAN_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0, 60.0, math.inf)
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+def _labels(labels: Dict) -> Labels:
+    return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+
+class Metrics:
+    """Thread-safe counters and span duration histograms, keyed by name and labels."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counters: Dict[Tuple[str, Labels], float] = {}
+        self.spans: Dict[Tuple[str, Labels], Dict] = {}
+
+    def inc(self, name: str, value: float = 1, **labels) -> None:
+        """Add `value` to a counter, e.g. `inc('rows', 500, stage='sentiment')`."""
+        key = (name, _labels(labels))
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def observe(self, name: str, seconds: float, **labels) -> None:
+        """Record one span duration."""
+        key = (name, _labels(labels))
+        with self._lock:
+            stats = self.spans.get(key)
+            if stats is None:
+                stats = self.spans[key] = {'count': 0, 'sum': 0.0, 'min': math.inf, 'max': 0.0,
+                                           'buckets': [0] * len(SPAN_BUCKETS)}
+            stats['count'] += 1
+            stats['sum'] += seconds
+            stats['min'] = min(stats['min'], seconds)
+            stats['max'] = max(stats['max'], seconds)
+            stats['buckets'][next(i for i, bound in enumerate(SPAN_BUCKETS) if seconds <= bound)] += 1
+
+    @contextmanager
+    def span(self, name: str, **labels):
+        """Time a block, e.g. one sentiment batch or one DB commit."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - started, **labels)
+
+    def reset(self) -> None:
+        with self._lock:
+            self.counters.clear()
+            self.spans.clear()
+
+    def snapshot(self) -> Dict:
+        """Current values as plain JSON-serializable data."""
+        with self._lock:
+            counters = [{'name': name, 'labels': dict(labels), 'value': value}
+                        for (name, labels), value in sorted(self.counters.items())]
+            spans = [{'name': name, 'labels': dict(labels), 'count': stats['count'],
+                      'sum_seconds': round(stats['sum'], 6), 'min_seconds': round(stats['min'], 6),
+                      'max_seconds': round(stats['max'], 6),
+                      'mean_seconds': round(stats['sum'] / stats['count'], 6)}
+                     for (name, labels), stats in sorted(self.spans.items())]
+        return {'pid': os.getpid(), 'timestamp': time.time(), 'counters': counters, 'spans': spans}
+
+    def to_prometheus(self) -> str:
+        """Prometheus text exposition: `review_<name>_total` counters and a `review_span_seconds` histogram."""
+        def fmt_labels(labels: Labels) -> str:
+            if not labels:
+                return ''
+            return '{' + ','.join(f'{key}="{value}"' for key, value in labels) + '}'
+
+        lines = []
+        with self._lock:
+            names = sorted({name for name, _ in self.counters})
+            for name in names:
+                metric = f"review_{re.sub(r'[^a-zA-Z0-9_]', '_', name)}_total"
+                lines.append(f"# TYPE {metric} counter")
+                for (counter, labels), value in sorted(self.counters.items()):
+                    if counter == name:
+                        lines.append(f"{metric}{fmt_labels(labels)} {value:g}")
+            if self.spans:
+                lines.append("# TYPE review_span_seconds histogram")
+            for (name, labels), stats in sorted(self.spans.items()):
+                base = (('span', name),) + labels
+                cumulative = 0
+                for bound, count in zip(SPAN_BUCKETS, stats['buckets']):
+                    cumulative += count
+                    le = '+Inf' if math.isinf(bound) else f'{bound:g}'
+                    lines.append(f"review_span_seconds_bucket{fmt_labels(base + (('le', le),))} {cumulative}")
+                lines.append(f"review_span_seconds_sum{fmt_labels(base)} {stats['sum']:.6f}")
+                lines.append(f"review_span_seconds_count{fmt_labels(base)} {stats['count']}")
+        return '\n'.join(lines) + '\n'
+
+    def dump(self, path: str, fmt: Optional[str] = None) -> str:
+        """
+        Write metrics to `path` as 'json' or 'prometheus' (by default chosen
+        from the suffix: `.prom` means Prometheus).
+        """
+        path = path.replace('{pid}', str(os.getpid()))
+        fmt = fmt or ('prometheus' if path.endswith('.prom') else 'json')
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        text = self.to_prometheus() if fmt == 'prometheus' else json.dumps(self.snapshot(), indent=2)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(text)
+        os.replace(tmp_path, path)
+        logger.info(f"Wrote {fmt} metrics to {path}")
+        return path
+
+
+METRICS = Metrics()
+inc = METRICS.inc
+observe = METRICS.observe
+span = METRICS.span
+
+if METRICS_PATH:
+    atexit.register(METRICS.dump, METRICS_PATH)
+
+
+@contextmanager
+def profiled(name: str, modes=None):
+    """
+    Profile a block when enabled (by default via REVIEW_PROFILE).
+
+    'cpu' writes `<name>-<pid>.prof` (open with pstats or snakeviz); 'memory'
+    writes the top allocation sites to `<name>-<pid>.tracemalloc.txt`.
+    """
+    modes = PROFILE_MODES if modes is None else frozenset(modes)
+    if not modes:
+        yield
+        return
+
+    import cProfile
+    import tracemalloc
+
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    stem = os.path.join(PROFILE_DIR, f"{name}-{os.getpid()}")
+    profiler = cProfile.Profile() if 'cpu' in modes else None
+    trace_memory = 'memory' in modes and not tracemalloc.is_tracing()
+    if trace_memory:
+        tracemalloc.start(25)
+    if profiler is not None:
+        profiler.enable()
+    try:
+        yield
+    finally:
+        if profiler is not None:
+            profiler.disable()
+            profiler.dump_stats(f"{stem}.prof")
+            logger.info(f"Wrote CPU profile to {stem}.prof")
+        if trace_memory:
+            snapshot = tracemalloc.take_snapshot()
+            current, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            with open(f"{stem}.tracemalloc.txt", 'w', encoding='utf-8') as f:
+                f.write(f"current={current / 2**20:.1f}MiB peak={peak / 2**20:.1f}MiB\n")
+                for stat in snapshot.statistics('lineno')[:50]:
+                    f.write(f"{stat}\n")
+            logger.info(f"Wrote memory profile to {stem}.tracemalloc.txt")
+
+
+def instrumented(name: str):
+    """Decorate a pipeline entry point: time it as a span and profile it when enabled."""
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            with profiled(name), span('stage', stage=name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
@@ -0,0 +1,36 @@
+import logging
+import os
+import threading
+from typing import Dict
+
+# Every module logs under the repo's logs/ directory, wherever the process was started
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+LOG_DIR = os.getenv("REVIEW_LOG_DIR", os.path.join(ROOT, "logs"))
+LOG_FORMAT = '%(asctime)s - %(levelname)s - %(message)s'
+
+_handlers: Dict[str, logging.Handler] = {}
+_handlers_lock = threading.Lock()
+
+
+def get_logger(name: str, filename: str, level: int = logging.INFO) -> logging.Logger:
+    """
+    Return the module logger `name`, writing to `filename` in `LOG_DIR`.
+
+    Unlike `logging.basicConfig`, this does not depend on import order or the
+    working directory: each module keeps its own log file, modules sharing a
+    file share one handler, and the file is only opened on the first record.
+    Records still propagate, so handlers on the root logger (e.g. in a
+    notebook) see them too.
+    """
+    path = os.path.abspath(os.path.join(LOG_DIR, filename))
+    logger = logging.getLogger(name)
+    with _handlers_lock:
+        if path not in _handlers:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            handler = logging.FileHandler(path, encoding='utf-8', delay=True)
+            handler.setFormatter(logging.Formatter(LOG_FORMAT))
+            _handlers[path] = handler
+        if _handlers[path] not in logger.handlers:
+            logger.addHandler(_handlers[path])
+    logger.setLevel(level)
+    return logger
@@ -0,0 +1,100 @@
+import hashlib
+import os
+import sqlite3
+from datetime import datetime
+from typing import Iterable, List, Optional
+
+from scripts.common.logging_config import ROOT, get_logger
+
+# Set up logging
+logger = get_logger(__name__, "review_index.log")
+
+# Resolved from the repo root, since stages run from different working directories
+DEFAULT_INDEX_PATH = os.path.join(ROOT, 'data', 'review_index.sqlite')
+
+
+def make_review_id(bank_name: str, play_review_id: Optional[str] = None, review_text: Optional[str] = None, at=None) -> str:
+    """
+    Build a deterministic review ID.
+
+    Uses the Play Store review ID when available and falls back to a hash of
+    the review timestamp and content, so the same review always maps to the
+    same ID across runs. The bank prefix keeps IDs readable in the database.
+    """
+    if play_review_id:
+        key = f"gp\x1f{play_review_id}"
+    else:
+        at_str = at.isoformat() if isinstance(at, datetime) else str(at)
+        key = f"content\x1f{at_str}\x1f{review_text or ''}"
+    digest = hashlib.sha1(key.encode('utf-8')).hexdigest()[:20]
+    return f"{bank_name.replace(' ', '_')}_{digest}"
+
+
+class ReviewIndex:
+    """
+    Persistent set of review IDs already handled by a pipeline stage.
+
+    Backed by a SQLite table keyed on (namespace, review_id), so each lookup is
+    a single primary-key probe and the history never has to be reloaded.
+    Stages use separate namespaces (e.g. 'scraped', 'processed').
+    """
+
+    def __init__(self, path: str = DEFAULT_INDEX_PATH, namespace: str = 'scraped'):
+        self.path = path
+        self.namespace = namespace
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.conn = sqlite3.connect(path)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS seen_reviews ("
+            "namespace TEXT NOT NULL, review_id TEXT NOT NULL, "
+            "PRIMARY KEY (namespace, review_id)) WITHOUT ROWID"
+        )
+        self.conn.commit()
+
+    def __contains__(self, review_id: str) -> bool:
+        row = self.conn.execute(
+            "SELECT 1 FROM seen_reviews WHERE namespace = ? AND review_id = ?",
+            (self.namespace, review_id)
+        ).fetchone()
+        return row is not None
+
+    def contains_many(self, review_ids: Iterable[str]) -> List[bool]:
+        """Return a membership mask aligned with `review_ids`."""
+        return [review_id in self for review_id in review_ids]
+
+    def mark_seen(self, review_ids: Iterable[str]) -> None:
+        """Record review IDs as handled."""
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO seen_reviews (namespace, review_id) VALUES (?, ?)",
+                ((self.namespace, review_id) for review_id in review_ids)
+            )
+
+    def add_new(self, review_ids: Iterable[str]) -> List[bool]:
+        """
+        Record review IDs and return a mask that is True for IDs not seen before.
+
+        Duplicates within the same call are reported as seen after their first
+        occurrence.
+        """
+        mask = []
+        with self.conn:
+            for review_id in review_ids:
+                cursor = self.conn.execute(
+                    "INSERT OR IGNORE INTO seen_reviews (namespace, review_id) VALUES (?, ?)",
+                    (self.namespace, review_id)
+                )
+                mask.append(cursor.rowcount == 1)
+        logger.info(
+            f"Review index '{self.namespace}': {sum(mask)} new of {len(mask)} checked")
+        return mask
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
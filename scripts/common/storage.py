@@ -0,0 +1,232 @@
+import os
+import shutil
+import uuid
+from typing import Iterator, List, Optional, Tuple
+
+import pandas as pd
+
+from scripts.common.logging_config import get_logger
+
+# Set up logging
+logger = get_logger(__name__, "storage.log")
+
+# Default on-disk format for every pipeline stage: 'parquet' or 'csv'
+STORAGE_FORMAT = os.getenv('REVIEW_STORAGE_FORMAT', 'parquet')
+
+# Column dtypes shared by all stages; columns not listed keep their inferred dtype
+CATEGORICAL_COLUMNS = ['bank', 'bank_name', 'source',
+                       'sentiment_label', 'identified_theme', 'identified_themes', 'discovered_theme']
+RATING_DTYPE = 'Int8'
+# Free-text columns, always stored as strings (even when a part has only nulls)
+TEXT_COLUMNS = ['review_id', 'review_text', 'processed_text']
+
+Filter = Tuple[str, str, object]
+
+
+def apply_schema(df: pd.DataFrame) -> pd.DataFrame:
+    """Cast known review columns to compact dtypes in place and return the frame."""
+    for col in CATEGORICAL_COLUMNS:
+        if col in df.columns and not isinstance(df[col].dtype, pd.CategoricalDtype):
+            df[col] = df[col].astype('category')
+    if 'rating' in df.columns:
+        df['rating'] = pd.to_numeric(
+            df['rating'], errors='coerce').round().astype(RATING_DTYPE)
+    if 'date' in df.columns and not pd.api.types.is_datetime64_any_dtype(df['date']):
+        df['date'] = pd.to_datetime(df['date'], errors='coerce', format='mixed')
+    return df
+
+
+def canonical_schema(schema):
+    """
+    Map a Parquet schema onto the shared column types.
+
+    Every part of an appended table is cast to this schema, and readers open
+    the dataset with it, so parts agree even when one has more categories
+    (wider dictionary indices) or a column with only nulls.
+    """
+    import pyarrow as pa
+
+    types = {col: pa.dictionary(pa.int32(), pa.string()) for col in CATEGORICAL_COLUMNS}
+    types.update({col: pa.string() for col in TEXT_COLUMNS})
+    # Store calendar dates as date32; time of day is not used downstream
+    types.update(rating=pa.int8(), date=pa.date32())
+    fields = []
+    for field in schema:
+        field_type = types.get(field.name, pa.string() if pa.types.is_null(field.type) else field.type)
+        fields.append(pa.field(field.name, field_type))
+    return pa.schema(fields)
+
+
+def _to_arrow(df: pd.DataFrame):
+    import pyarrow as pa
+
+    # Shallow copy so casting columns never touches the caller's frame
+    table = pa.Table.from_pandas(apply_schema(df.copy(deep=False)), preserve_index=False)
+    return table.cast(canonical_schema(table.schema), safe=False)
+
+
+def _open_dataset(path: str):
+    import pyarrow.dataset as ds
+
+    # The discovered schema comes from the first part only; read every part as the shared one
+    discovered = ds.dataset(path, format='parquet', partitioning='hive')
+    schema = canonical_schema(discovered.schema)
+    # Partition values live in directory names; keep the types hive discovery gave them
+    if discovered.partitioning is not None:
+        for field in discovered.partitioning.schema:
+            schema = schema.set(schema.get_field_index(field.name), field)
+    return ds.dataset(path, format='parquet', partitioning='hive', schema=schema)
+
+
+def _resolve(stem: str, fmt: Optional[str] = None) -> Tuple[str, str]:
+    """Return (format, path) for a table stem, detecting what is already on disk."""
+    stem = os.path.splitext(stem)[0] if stem.endswith(('.csv', '.parquet')) else stem
+    if fmt is None:
+        if os.path.isdir(stem) or os.path.exists(stem + '.parquet'):
+            fmt = 'parquet'
+        elif os.path.exists(stem + '.csv'):
+            fmt = 'csv'
+        else:
+            fmt = STORAGE_FORMAT
+    if fmt == 'csv':
+        return fmt, stem + '.csv'
+    return fmt, stem if not os.path.exists(stem + '.parquet') else stem + '.parquet'
+
+
+def table_exists(stem: str) -> bool:
+    _, path = _resolve(stem)
+    return os.path.exists(path)
+
+
+def write_table(df: pd.DataFrame, stem: str, fmt: Optional[str] = None, partition_cols: Optional[List[str]] = None,
+                append: bool = False, part_name: Optional[str] = None) -> str:
+    """
+    Write a review table.
+
+    Parquet tables are written as a dataset directory at `stem`, optionally
+    hive-partitioned (e.g. by `bank` and `date`), so readers can prune both
+    columns and partitions. Appending adds a new part file instead of
+    rewriting existing data; passing a fixed `part_name` makes the append
+    idempotent, since rewriting the same part replaces it. CSV tables are
+    written to `stem.csv`.
+
+    Returns:
+        str: Path that was written.
+    """
+    fmt = fmt or STORAGE_FORMAT
+    if fmt == 'csv':
+        path = stem + '.csv'
+        exists = append and os.path.exists(path)
+        df.to_csv(path, mode='a' if exists else 'w', header=not exists,
+                  index=False, encoding='utf-8')
+        logger.info(f"{'Appended' if exists else 'Wrote'} {len(df)} rows to {path}")
+        return path
+
+    import pyarrow.dataset as ds
+
+    if not append and os.path.isdir(stem):
+        shutil.rmtree(stem)
+    table = _to_arrow(df)
+    if not table.num_rows:
+        # write_dataset writes no file for an empty table; keep one so the
+        # table still exists, with its schema, and replaces older output
+        import pyarrow.parquet as pq
+
+        os.makedirs(stem, exist_ok=True)
+        pq.write_table(table, os.path.join(stem, f"part-{part_name or uuid.uuid4().hex}-0.parquet"))
+        logger.info(f"{'Appended' if append else 'Wrote'} 0 rows to {stem}")
+        return stem
+    ds.write_dataset(
+        table,
+        stem,
+        format='parquet',
+        partitioning=partition_cols,
+        partitioning_flavor='hive' if partition_cols else None,
+        basename_template=f"part-{part_name or uuid.uuid4().hex}-{{i}}.parquet",
+        existing_data_behavior='overwrite_or_ignore'
+    )
+    logger.info(f"{'Appended' if append else 'Wrote'} {len(df)} rows to {stem}")
+    return stem
+
+
+def _filter_frame(df: pd.DataFrame, filters: List[Filter]) -> pd.DataFrame:
+    ops = {
+        '=': lambda s, v: s == v, '==': lambda s, v: s == v, '!=': lambda s, v: s != v,
+        '<': lambda s, v: s < v, '<=': lambda s, v: s <= v,
+        '>': lambda s, v: s > v, '>=': lambda s, v: s >= v,
+        'in': lambda s, v: s.isin(v), 'not in': lambda s, v: ~s.isin(v),
+    }
+    for col, op, value in filters:
+        df = df[ops[op](df[col], value)]
+    return df
+
+
+def read_table(stem: str, columns: Optional[List[str]] = None, filters: Optional[List[Filter]] = None,
+               fmt: Optional[str] = None) -> pd.DataFrame:
+    """
+    Read a review table written by `write_table` (or a legacy CSV).
+
+    Args:
+        stem (str): Table path without extension; a trailing `.csv` is ignored so
+            existing CSV paths keep working.
+        columns (List[str], optional): Columns to load; ones missing from the
+            table are skipped.
+        filters (List[Tuple], optional): `(column, op, value)` predicates, pushed
+            down to Parquet partitions and row groups.
+    """
+    fmt, path = _resolve(stem, fmt)
+    if fmt == 'csv':
+        usecols = None
+        if columns is not None:
+            header = pd.read_csv(path, nrows=0).columns
+            usecols = [c for c in columns if c in header]
+        df = pd.read_csv(path, usecols=usecols)
+        df = apply_schema(df)
+        return _filter_frame(df, filters).reset_index(drop=True) if filters else df
+
+    import pyarrow.dataset as ds
+
+    dataset = _open_dataset(path)
+    if columns is not None:
+        columns = [c for c in columns if c in dataset.schema.names]
+    expression = None
+    for col, op, value in filters or []:
+        field = ds.field(col)
+        clause = {
+            '=': lambda: field == value, '==': lambda: field == value, '!=': lambda: field != value,
+            '<': lambda: field < value, '<=': lambda: field <= value,
+            '>': lambda: field > value, '>=': lambda: field >= value,
+            'in': lambda: field.isin(value), 'not in': lambda: ~field.isin(value),
+        }[op]()
+        expression = clause if expression is None else expression & clause
+    table = dataset.to_table(columns=columns, filter=expression)
+    return apply_schema(table.to_pandas(date_as_object=False))
+
+
+def iter_table(stem: str, columns: Optional[List[str]] = None, chunk_size: int = 100_000,
+               fmt: Optional[str] = None) -> Iterator[pd.DataFrame]:
+    """Yield a table in frames of at most `chunk_size` rows, so it never has to fit in memory."""
+    fmt, path = _resolve(stem, fmt)
+    if fmt == 'csv':
+        usecols = None
+        if columns is not None:
+            header = pd.read_csv(path, nrows=0).columns
+            usecols = [c for c in columns if c in header]
+        for chunk in pd.read_csv(path, usecols=usecols, chunksize=chunk_size):
+            yield apply_schema(chunk)
+        return
+
+    dataset = _open_dataset(path)
+    if columns is not None:
+        columns = [c for c in columns if c in dataset.schema.names]
+    for batch in dataset.to_batches(columns=columns, batch_size=chunk_size):
+        if batch.num_rows:
+            yield apply_schema(batch.to_pandas(date_as_object=False))
+
+
+def export_csv(stem: str, csv_path: Optional[str] = None) -> str:
+    """Export a stored table to a single CSV file (defaults to `stem.csv`)."""
+    csv_path = csv_path or os.path.splitext(stem)[0] + '.csv'
+    read_table(stem).to_csv(csv_path, index=False, encoding='utf-8')
+    logger.info(f"Exported {stem} to {csv_path}")
+    return csv_path
@@ -0,0 +1,103 @@
+import hashlib
+import os
+import re
+import sqlite3
+import time
+from typing import Dict, Iterable, Tuple
+
+from scripts.common.instrumentation import inc
+from scripts.common.logging_config import get_logger
+
+# Set up logging
+logger = get_logger(__name__, "text_cache.log")
+
+_WHITESPACE_PATTERN = re.compile(r'\s+')
+
+# A cache key: (namespace such as a source language or model version, normalized text)
+CacheKey = Tuple[str, str]
+
+
+def normalize_text(text: str) -> str:
+    """Collapse whitespace so trivially different copies share a cache entry."""
+    return _WHITESPACE_PATTERN.sub(' ', text).strip()
+
+
+def text_hash(text: str) -> str:
+    return hashlib.sha1(text.encode('utf-8')).hexdigest()
+
+
+class TextCache:
+    """
+    SQLite-backed cache of per-text results keyed by (namespace, text hash).
+
+    Entries carry a last-used timestamp; once the table grows past
+    `max_entries`, the least recently used entries are evicted. Hit and miss
+    counts are kept for the lifetime of the instance.
+    """
+
+    def __init__(self, path: str, table: str, max_entries: int = 500_000):
+        self.path = path
+        self.table = table
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Generous timeout: sharded sentiment workers share one cache file
+        self.conn = sqlite3.connect(path, timeout=30)
+        self.conn.execute(
+            f"CREATE TABLE IF NOT EXISTS {table} ("
+            "namespace TEXT NOT NULL, text_hash TEXT NOT NULL, value TEXT NOT NULL, "
+            "last_used REAL NOT NULL, PRIMARY KEY (namespace, text_hash)) WITHOUT ROWID"
+        )
+        self.conn.execute(
+            f"CREATE INDEX IF NOT EXISTS idx_{table}_last_used ON {table} (last_used)")
+        self.conn.commit()
+
+    def get_many(self, keys: Iterable[CacheKey]) -> Dict[CacheKey, str]:
+        """Look up keys, refreshing the LRU timestamp of hits."""
+        hits = {}
+        misses = 0
+        now = time.time()
+        with self.conn:
+            for namespace, text in keys:
+                digest = text_hash(text)
+                row = self.conn.execute(
+                    f"SELECT value FROM {self.table} WHERE namespace = ? AND text_hash = ?",
+                    (namespace, digest)
+                ).fetchone()
+                if row is None:
+                    misses += 1
+                    continue
+                hits[(namespace, text)] = row[0]
+                self.conn.execute(
+                    f"UPDATE {self.table} SET last_used = ? WHERE namespace = ? AND text_hash = ?",
+                    (now, namespace, digest)
+                )
+        self.hits += len(hits)
+        self.misses += misses
+        inc('cache_hits', len(hits), cache=self.table)
+        inc('cache_misses', misses, cache=self.table)
+        return hits
+
+    def put_many(self, entries: Dict[CacheKey, str]) -> None:
+        now = time.time()
+        with self.conn:
+            self.conn.executemany(
+                f"INSERT OR REPLACE INTO {self.table} (namespace, text_hash, value, last_used) VALUES (?, ?, ?, ?)",
+                ((namespace, text_hash(text), value, now)
+                 for (namespace, text), value in entries.items())
+            )
+            count = self.conn.execute(
+                f"SELECT COUNT(*) FROM {self.table}").fetchone()[0]
+            if count > self.max_entries:
+                self.conn.execute(
+                    f"DELETE FROM {self.table} WHERE (namespace, text_hash) IN ("
+                    f"SELECT namespace, text_hash FROM {self.table} ORDER BY last_used LIMIT ?)",
+                    (count - self.max_entries,)
+                )
+                logger.info(
+                    f"Evicted {count - self.max_entries} least recently used entries from {self.table}")
+
+    def close(self) -> None:
+        self.conn.close()
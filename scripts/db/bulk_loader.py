@@ -0,0 +1,375 @@
+import time
+from typing import TYPE_CHECKING, Callable, Dict, Iterable, List, Optional, Sequence, Set
+
+from scripts.common.instrumentation import inc, span
+from scripts.common.logging_config import get_logger
+from scripts.db.rollups import NO_THEME, rollup_deltas
+
+# Set up logging
+logger = get_logger(__name__, "insert_reviews.log")
+
+# pandas is only needed to convert frames, not for schema creation
+if TYPE_CHECKING:
+    import pandas as pd
+
+# Review columns in bind order
+REVIEW_COLUMNS = ['review_id', 'review_text', 'sentiment_label',
+                  'sentiment_score', 'rating', 'review_date', 'bank_id']
+
+# Review IDs looked up per existence query; below SQLite's bind limit and Oracle's IN-list limit
+ID_LOOKUP_SIZE = 500
+
+# Local stand-in for the Oracle schema in schema.sql
+SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS banks (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name TEXT UNIQUE
+);
+CREATE TABLE IF NOT EXISTS reviews (
+    review_id TEXT PRIMARY KEY,
+    review_text TEXT,
+    sentiment_label TEXT,
+    sentiment_score REAL,
+    rating INTEGER,
+    review_date TEXT,
+    bank_id INTEGER REFERENCES banks(id)
+);
+CREATE TABLE IF NOT EXISTS review_rollups (
+    bank_id INTEGER NOT NULL REFERENCES banks(id),
+    review_day TEXT NOT NULL,
+    rating INTEGER NOT NULL,
+    sentiment_label TEXT NOT NULL,
+    theme TEXT NOT NULL,
+    review_count INTEGER NOT NULL,
+    score_sum REAL NOT NULL,
+    score_sq_sum REAL NOT NULL,
+    PRIMARY KEY (bank_id, review_day, rating, sentiment_label, theme)
+);
+CREATE INDEX IF NOT EXISTS review_rollups_day ON review_rollups (review_day);
+"""
+
+
+class Dialect:
+    """SQL text and bind handling that differ between database backends."""
+
+    name = ''
+    merge_bank_sql = ''
+    select_bank_sql = ''
+    merge_reviews_sql = ''
+    merge_rollups_sql = ''
+
+    def placeholder(self, position: int) -> str:
+        """Bind placeholder for the 1-based `position`."""
+        raise NotImplementedError
+
+    def limit_clause(self, position: int) -> str:
+        """Row limit bound at `position`."""
+        raise NotImplementedError
+
+    def set_input_sizes(self, cursor) -> None:
+        """Declare bind types once so every batch reuses the parsed statement."""
+
+    def set_rollup_input_sizes(self, cursor) -> None:
+        """Bind types of the rollup merge, in `ROLLUP_COLUMNS` order."""
+
+    def lock_reviews(self, conn, cursor) -> None:
+        """
+        Block other writers to `reviews` until the current transaction ends.
+
+        Taken before checking which rows are new, so a concurrent loader
+        cannot insert the same IDs between the check and the merge.
+        """
+        raise NotImplementedError
+
+    def convert_date(self, value):
+        return value
+
+    def day_key(self, value):
+        """Rollup day of a bound review date."""
+        return value
+
+    def select_review_ids_sql(self, count: int) -> str:
+        """Stored review IDs among `count` bound IDs."""
+        placeholders = ', '.join(self.placeholder(i) for i in range(1, count + 1))
+        return f"SELECT review_id FROM reviews WHERE review_id IN ({placeholders})"
+
+
+class OracleDialect(Dialect):
+    name = 'oracle'
+    merge_bank_sql = (
+        "MERGE INTO banks b USING (SELECT :1 AS name FROM dual) d ON (b.name = d.name) "
+        "WHEN NOT MATCHED THEN INSERT (name) VALUES (d.name)")
+    select_bank_sql = "SELECT id FROM banks WHERE name = :1"
+    merge_reviews_sql = """
+        MERGE INTO reviews r
+        USING (SELECT :1 AS review_id, :2 AS review_text, :3 AS sentiment_label, :4 AS sentiment_score,
+                      :5 AS rating, :6 AS review_date, :7 AS bank_id FROM dual) d
+        ON (r.review_id = d.review_id)
+        WHEN NOT MATCHED THEN
+        INSERT (review_id, review_text, sentiment_label, sentiment_score, rating, review_date, bank_id)
+        VALUES (d.review_id, d.review_text, d.sentiment_label, d.sentiment_score, d.rating, d.review_date, d.bank_id)
+        """
+    merge_rollups_sql = """
+        MERGE INTO review_rollups t
+        USING (SELECT :1 AS bank_id, :2 AS review_day, :3 AS rating, :4 AS sentiment_label, :5 AS theme,
+                      :6 AS review_count, :7 AS score_sum, :8 AS score_sq_sum FROM dual) d
+        ON (t.bank_id = d.bank_id AND t.review_day = d.review_day AND t.rating = d.rating
+            AND t.sentiment_label = d.sentiment_label AND t.theme = d.theme)
+        WHEN MATCHED THEN UPDATE SET
+            t.review_count = t.review_count + d.review_count,
+            t.score_sum = t.score_sum + d.score_sum,
+            t.score_sq_sum = t.score_sq_sum + d.score_sq_sum
+        WHEN NOT MATCHED THEN
+        INSERT (bank_id, review_day, rating, sentiment_label, theme, review_count, score_sum, score_sq_sum)
+        VALUES (d.bank_id, d.review_day, d.rating, d.sentiment_label, d.theme, d.review_count, d.score_sum,
+                d.score_sq_sum)
+        """
+
+    def placeholder(self, position: int) -> str:
+        return f":{position}"
+
+    def limit_clause(self, position: int) -> str:
+        return f"FETCH FIRST :{position} ROWS ONLY"
+
+    def set_input_sizes(self, cursor) -> None:
+        import oracledb
+
+        cursor.setinputsizes(100, 4000, 20, oracledb.DB_TYPE_NUMBER, oracledb.DB_TYPE_NUMBER,
+                             oracledb.DB_TYPE_DATE, oracledb.DB_TYPE_NUMBER)
+
+    def set_rollup_input_sizes(self, cursor) -> None:
+        import oracledb
+
+        cursor.setinputsizes(oracledb.DB_TYPE_NUMBER, oracledb.DB_TYPE_DATE, oracledb.DB_TYPE_NUMBER, 20, 100,
+                             oracledb.DB_TYPE_NUMBER, oracledb.DB_TYPE_NUMBER, oracledb.DB_TYPE_NUMBER)
+
+    def lock_reviews(self, conn, cursor) -> None:
+        # Readers are not blocked; other loaders wait here until this batch commits
+        cursor.execute("LOCK TABLE reviews IN SHARE ROW EXCLUSIVE MODE")
+
+    def convert_date(self, value):
+        return value.to_pydatetime()
+
+    def day_key(self, value):
+        return value.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+class SQLiteDialect(Dialect):
+    name = 'sqlite'
+    merge_bank_sql = "INSERT INTO banks (name) VALUES (?) ON CONFLICT(name) DO NOTHING"
+    select_bank_sql = "SELECT id FROM banks WHERE name = ?"
+    merge_reviews_sql = (
+        "INSERT INTO reviews (review_id, review_text, sentiment_label, sentiment_score, rating, review_date, bank_id) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?) ON CONFLICT(review_id) DO NOTHING")
+    merge_rollups_sql = (
+        "INSERT INTO review_rollups (bank_id, review_day, rating, sentiment_label, theme, "
+        "review_count, score_sum, score_sq_sum) VALUES (?, ?, ?, ?, ?, ?, ?, ?) "
+        "ON CONFLICT(bank_id, review_day, rating, sentiment_label, theme) DO UPDATE SET "
+        "review_count = review_count + excluded.review_count, "
+        "score_sum = score_sum + excluded.score_sum, "
+        "score_sq_sum = score_sq_sum + excluded.score_sq_sum")
+
+    def placeholder(self, position: int) -> str:
+        return "?"
+
+    def limit_clause(self, position: int) -> str:
+        return "LIMIT ?"
+
+    def lock_reviews(self, conn, cursor) -> None:
+        # Take the database write lock now instead of at the first insert
+        if not conn.in_transaction:
+            cursor.execute("BEGIN IMMEDIATE")
+
+    def convert_date(self, value):
+        return value.date().isoformat()
+
+
+DIALECTS = {'oracle': OracleDialect, 'sqlite': SQLiteDialect}
+
+
+def create_sqlite_schema(conn) -> None:
+    conn.executescript(SQLITE_SCHEMA)
+    conn.commit()
+
+
+def review_rows(df: 'pd.DataFrame', bank_ids: Dict[str, int], dialect: Dialect) -> List[tuple]:
+    """Convert a merged review frame into bind tuples, column-wise rather than row by row."""
+    import pandas as pd
+
+    dates = pd.to_datetime(df['date'], errors='coerce')
+    ratings = pd.to_numeric(df['rating'], errors='coerce')
+    scores = pd.to_numeric(df['sentiment_score'], errors='coerce')
+    columns = [
+        df['review_id'].astype(str).tolist(),
+        df['review_text'].astype(object).where(df['review_text'].notna(), None).tolist(),
+        df['sentiment_label'].astype(object).where(df['sentiment_label'].notna(), None).tolist(),
+        [None if pd.isna(v) else float(v) for v in scores],
+        [None if pd.isna(v) else int(v) for v in ratings],
+        [None if pd.isna(v) else dialect.convert_date(v) for v in dates],
+        df['bank'].map(bank_ids).astype(object).tolist(),
+    ]
+    return list(zip(*columns))
+
+
+def review_themes(df: 'pd.DataFrame') -> List[Optional[str]]:
+    """Primary theme of each row of a merged review frame, for the rollups."""
+    if 'identified_theme' not in df.columns:
+        return [NO_THEME] * len(df)
+    return df['identified_theme'].astype(object).where(df['identified_theme'].notna(), None).tolist()
+
+
+class BulkLoader:
+    """
+    Load reviews with array binding instead of one statement per row.
+
+    Rows are sent in batches of `batch_size` with `cursor.executemany`, using
+    one statement text whose bind types are declared once, and each batch is
+    committed before the next is sent. `on_commit` is called with the review
+    IDs of every committed batch, so callers can record progress that
+    survives an interrupted load.
+
+    With `rollups` on, the reviews a batch actually inserts (not those
+    already stored) are added to `review_rollups` in the same commit. The
+    batch holds a write lock on `reviews` from the existence check to the
+    commit, so concurrent loaders never count the same review twice.
+    """
+
+    def __init__(self, conn, dialect: str = 'oracle', batch_size: int = 10_000, rollups: bool = True):
+        self.conn = conn
+        self.dialect = DIALECTS[dialect]()
+        self.batch_size = batch_size
+        self.rollups = rollups
+
+    def upsert_banks(self, names: Iterable[str]) -> Dict[str, int]:
+        """Insert missing banks and return their ids by name."""
+        cursor = self.conn.cursor()
+        bank_ids = {}
+        for name in names:
+            cursor.execute(self.dialect.merge_bank_sql, [name])
+            cursor.execute(self.dialect.select_bank_sql, [name])
+            bank_ids[name] = cursor.fetchone()[0]
+        self.conn.commit()
+        cursor.close()
+        return bank_ids
+
+    def stored_review_ids(self, review_ids: Sequence[str]) -> Set[str]:
+        """Which of `review_ids` are already in `reviews`, by primary-key lookups."""
+        cursor = self.conn.cursor()
+        stored = set()
+        for start in range(0, len(review_ids), ID_LOOKUP_SIZE):
+            chunk = list(review_ids[start:start + ID_LOOKUP_SIZE])
+            # Pad the last chunk so every lookup reuses one statement text
+            chunk += chunk[:1] * (ID_LOOKUP_SIZE - len(chunk))
+            cursor.execute(self.dialect.select_review_ids_sql(ID_LOOKUP_SIZE), chunk)
+            stored.update(row[0] for row in cursor.fetchall())
+        cursor.close()
+        return stored
+
+    def new_rows(self, rows: Sequence[tuple]) -> List[int]:
+        """Positions of the rows a merge would insert: not stored yet and first of their ID in `rows`."""
+        seen = self.stored_review_ids([row[0] for row in rows])
+        positions = []
+        for position, row in enumerate(rows):
+            if row[0] not in seen:
+                seen.add(row[0])
+                positions.append(position)
+        return positions
+
+    def add_rollups(self, rows: Sequence[tuple], themes: Sequence[Optional[str]]) -> int:
+        """
+        Add review bind tuples to the rollups without committing; returns the rollup rows touched.
+
+        The merge runs on its own cursor, since its bind types differ from the review merge's.
+        """
+        deltas, skipped = rollup_deltas(rows, themes, self.dialect.day_key)
+        if skipped:
+            logger.warning(f"{skipped} reviews without a date or score left out of the rollups")
+        if deltas:
+            cursor = self.conn.cursor()
+            self.dialect.set_rollup_input_sizes(cursor)
+            cursor.executemany(self.dialect.merge_rollups_sql, deltas)
+            cursor.close()
+        inc('rows', len(rows) - skipped, stage='rollup')
+        return len(deltas)
+
+    def load_rows(self, rows: Sequence[tuple], on_commit: Optional[Callable[[List[str]], None]] = None,
+                  themes: Optional[Sequence[Optional[str]]] = None) -> Dict:
+        """
+        Merge review bind tuples (in `REVIEW_COLUMNS` order) in committed batches.
+
+        `themes` gives each row's primary theme for the rollups (default:
+        `NO_THEME` for every row).
+
+        Returns:
+            Dict: Rows sent, batches, elapsed seconds and rows/sec.
+        """
+        started = time.perf_counter()
+        themes = themes if themes is not None else [NO_THEME] * len(rows)
+        cursor = self.conn.cursor()
+        self.dialect.set_input_sizes(cursor)
+        batches = 0
+        for start in range(0, len(rows), self.batch_size):
+            batch = rows[start:start + self.batch_size]
+            with span('db.batch', dialect=self.dialect.name):
+                # Decided before the merge, which would make every row look stored
+                inserted = []
+                if self.rollups:
+                    self.dialect.lock_reviews(self.conn, cursor)
+                    inserted = self.new_rows(batch)
+                cursor.executemany(self.dialect.merge_reviews_sql, batch)
+                if inserted:
+                    batch_themes = themes[start:start + self.batch_size]
+                    self.add_rollups([batch[i] for i in inserted], [batch_themes[i] for i in inserted])
+                self.conn.commit()
+            inc('rows', len(batch), stage='load')
+            batches += 1
+            if on_commit is not None:
+                on_commit([row[0] for row in batch])
+            logger.info(f"Committed batch {batches} ({start + len(batch)}/{len(rows)} rows)")
+        cursor.close()
+
+        elapsed = time.perf_counter() - started
+        stats = {
+            'rows': len(rows),
+            'batches': batches,
+            'seconds': round(elapsed, 3),
+            'rows_per_sec': len(rows) / elapsed if elapsed > 0 else 0.0,
+        }
+        logger.info(
+            f"Loaded {stats['rows']} reviews in {stats['batches']} batches, "
+            f"{stats['seconds']}s ({stats['rows_per_sec']:.1f} rows/sec) via {self.dialect.name}")
+        return stats
+
+    def load_reviews(self, df: 'pd.DataFrame', bank_ids: Dict[str, int],
+                     on_commit: Optional[Callable[[List[str]], None]] = None) -> Dict:
+        """Merge a frame with review, sentiment, rating, date and `bank` columns (and optionally `identified_theme`)."""
+        return self.load_rows(review_rows(df, bank_ids, self.dialect), on_commit, review_themes(df))
+
+    def rebuild_rollups(self, frames: Iterable['pd.DataFrame'], bank_ids: Dict[str, int]) -> Dict:
+        """
+        Recompute `review_rollups` from merged review frames, in one transaction.
+
+        Only rows whose review is stored are counted, once each. This is a
+        one-off full pass, e.g. for reviews loaded before rollups existed;
+        regular loads keep the rollups current.
+        """
+        started = time.perf_counter()
+        cursor = self.conn.cursor()
+        cursor.execute("DELETE FROM review_rollups")
+        counted, seen = 0, set()
+        for df in frames:
+            rows = review_rows(df, bank_ids, self.dialect)
+            themes = review_themes(df)
+            stored = self.stored_review_ids([row[0] for row in rows])
+            keep = []
+            for i, row in enumerate(rows):
+                if row[0] in stored and row[0] not in seen:
+                    seen.add(row[0])
+                    keep.append(i)
+            self.add_rollups([rows[i] for i in keep], [themes[i] for i in keep])
+            counted += len(keep)
+        self.conn.commit()
+        cursor.close()
+        stats = {'rows': counted, 'seconds': round(time.perf_counter() - started, 3)}
+        logger.info(f"Rebuilt rollups from {counted} stored reviews in {stats['seconds']}s")
+        return stats
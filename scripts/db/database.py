@@ -0,0 +1,237 @@
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Callable, Dict, Iterable, List, Optional
+
+from scripts.common.logging_config import get_logger
+from scripts.db.bulk_loader import DIALECTS, BulkLoader, create_sqlite_schema
+from scripts.db.rollups import DIMENSIONS, summarize
+
+# Set up logging
+logger = get_logger(__name__, "insert_reviews.log")
+
+# Only queries return frames, so schema-only jobs never import pandas
+if TYPE_CHECKING:
+    import pandas as pd
+
+# 'oracle' for the shared database, 'sqlite' for local runs and tests
+DB_BACKEND = os.getenv("REVIEW_DB_BACKEND", "oracle")
+SQLITE_PATH = os.getenv("REVIEW_DB_PATH", "data/reviews.sqlite")
+
+
+class Database:
+    """A connection source for one backend; `connection()` hands out reusable connections."""
+
+    dialect_name = ''
+
+    @contextmanager
+    def connection(self):
+        raise NotImplementedError
+
+    def close(self) -> None:
+        pass
+
+
+class OracleDatabase(Database):
+    """
+    Oracle session pool.
+
+    Connections are acquired from and returned to the pool, so loaders and
+    dashboards skip connection setup, and each pooled session keeps a cache
+    of `stmtcachesize` parsed statements.
+    """
+
+    dialect_name = 'oracle'
+
+    def __init__(self, user: Optional[str] = None, password: Optional[str] = None, dsn: Optional[str] = None,
+                 min_sessions: int = 1, max_sessions: int = 4, stmtcachesize: int = 50):
+        import oracledb
+
+        from scripts.db.oracle_config import ORACLE_DSN, ORACLE_PASSWORD, ORACLE_USER
+
+        self.pool = oracledb.create_pool(
+            user=user or ORACLE_USER, password=password or ORACLE_PASSWORD, dsn=dsn or ORACLE_DSN,
+            min=min_sessions, max=max_sessions, increment=1, stmtcachesize=stmtcachesize)
+        logger.info(f"Created Oracle session pool ({min_sessions}-{max_sessions} sessions)")
+
+    @contextmanager
+    def connection(self):
+        conn = self.pool.acquire()
+        try:
+            yield conn
+        finally:
+            self.pool.release(conn)
+
+    def close(self) -> None:
+        self.pool.close()
+
+
+class SQLiteDatabase(Database):
+    """
+    SQLite stand-in with the same interface.
+
+    One connection is opened per thread and reused; sqlite3 caches up to
+    `cached_statements` prepared statements per connection. The schema is
+    created on first connect.
+    """
+
+    dialect_name = 'sqlite'
+
+    def __init__(self, path: str = SQLITE_PATH, cached_statements: int = 128):
+        self.path = path
+        self.cached_statements = cached_statements
+        self._local = threading.local()
+        self._connections: List[sqlite3.Connection] = []
+        self._lock = threading.Lock()
+        if path != ':memory:' and os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    @contextmanager
+    def connection(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, cached_statements=self.cached_statements,
+                                   check_same_thread=False)
+            create_sqlite_schema(conn)
+            self._local.conn = conn
+            with self._lock:
+                self._connections.append(conn)
+        try:
+            yield conn
+        except Exception:
+            conn.rollback()
+            raise
+
+    def close(self) -> None:
+        with self._lock:
+            for conn in self._connections:
+                conn.close()
+            self._connections.clear()
+        self._local = threading.local()
+
+
+BACKENDS = {'oracle': OracleDatabase, 'sqlite': SQLiteDatabase}
+
+_databases: Dict[str, Database] = {}
+_databases_lock = threading.Lock()
+
+
+def get_database(backend: Optional[str] = None) -> Database:
+    """Return the shared database for a backend, creating its pool on first use."""
+    backend = backend or DB_BACKEND
+    with _databases_lock:
+        if backend not in _databases:
+            _databases[backend] = BACKENDS[backend]()
+        return _databases[backend]
+
+
+class ReviewRepository:
+    """Bank and review reads and writes that work the same on every backend."""
+
+    def __init__(self, db: Optional[Database] = None, batch_size: int = 10_000):
+        self.db = db or get_database()
+        self.batch_size = batch_size
+        self.dialect = DIALECTS[self.db.dialect_name]()
+
+    def _query(self, sql: str, params: Iterable = ()) -> 'pd.DataFrame':
+        import pandas as pd
+
+        with self.db.connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(sql, list(params))
+            columns = [d[0].lower() for d in cursor.description]
+            rows = cursor.fetchall()
+            cursor.close()
+        return pd.DataFrame(rows, columns=columns)
+
+    def upsert_banks(self, names: Iterable[str]) -> Dict[str, int]:
+        """Insert missing banks and return their ids by name."""
+        with self.db.connection() as conn:
+            return BulkLoader(conn, self.db.dialect_name, self.batch_size).upsert_banks(names)
+
+    def upsert_reviews(self, df: 'pd.DataFrame', bank_ids: Dict[str, int],
+                       on_commit: Optional[Callable[[List[str]], None]] = None) -> Dict:
+        """Insert reviews not already stored, in committed batches; returns load stats."""
+        with self.db.connection() as conn:
+            return BulkLoader(conn, self.db.dialect_name, self.batch_size).load_reviews(df, bank_ids, on_commit)
+
+    def rebuild_rollups(self, frames: Iterable['pd.DataFrame'], bank_ids: Dict[str, int]) -> Dict:
+        """Recompute the rollups from merged review frames, counting stored reviews only."""
+        with self.db.connection() as conn:
+            return BulkLoader(conn, self.db.dialect_name, self.batch_size).rebuild_rollups(frames, bank_ids)
+
+    def query_banks(self) -> 'pd.DataFrame':
+        return self._query("SELECT id, name FROM banks ORDER BY id")
+
+    def query_review_counts(self) -> 'pd.DataFrame':
+        """Number of stored reviews per bank."""
+        return self._query(
+            "SELECT b.name AS bank, COUNT(r.review_id) AS review_count "
+            "FROM banks b LEFT JOIN reviews r ON r.bank_id = b.id GROUP BY b.name ORDER BY b.name")
+
+    def query_sentiment_summary(self) -> 'pd.DataFrame':
+        """Review count and mean sentiment score per bank and sentiment label."""
+        return self._query(
+            "SELECT b.name AS bank, r.sentiment_label, COUNT(*) AS review_count, "
+            "AVG(r.sentiment_score) AS mean_score "
+            "FROM reviews r JOIN banks b ON r.bank_id = b.id "
+            "GROUP BY b.name, r.sentiment_label ORDER BY b.name, r.sentiment_label")
+
+    def query_rollups(self, start=None, end=None, by: Iterable[str] = ('bank', 'review_day'),
+                      bank: Optional[str] = None, sentiment_label: Optional[str] = None,
+                      theme: Optional[str] = None) -> 'pd.DataFrame':
+        """
+        Review count and sentiment score mean and standard deviation from the rollups.
+
+        Rows cover days `start` to `end` inclusive (either open-ended when
+        None), grouped by any of 'bank', 'review_day', 'rating',
+        'sentiment_label' and 'theme' (none for overall totals), optionally
+        for one bank, label and/or theme. Only `review_rollups` is read, so the
+        cost depends on the number of days and groups, not of reviews.
+        """
+        import pandas as pd
+
+        by = list(by)
+        unknown = [dimension for dimension in by if dimension not in DIMENSIONS]
+        if unknown:
+            raise ValueError(f"Unknown rollup dimensions {unknown}; expected some of {list(DIMENSIONS)}")
+
+        clauses, params = [], []
+        for operator, day in (('>=', start), ('<=', end)):
+            if day is not None:
+                params.append(self.dialect.day_key(self.dialect.convert_date(pd.Timestamp(day))))
+                clauses.append(f"r.review_day {operator} {self.dialect.placeholder(len(params))}")
+        for dimension, value in (('bank', bank), ('sentiment_label', sentiment_label), ('theme', theme)):
+            if value is not None:
+                params.append(value)
+                clauses.append(f"{DIMENSIONS[dimension]} = {self.dialect.placeholder(len(params))}")
+        where = f"WHERE {' AND '.join(clauses)} " if clauses else ""
+        columns = ', '.join(DIMENSIONS[dimension] for dimension in by)
+        selected = ''.join(f"{DIMENSIONS[dimension]} AS {dimension}, " for dimension in by)
+        grouped = f"GROUP BY {columns} ORDER BY {columns}" if by else ""
+        df = self._query(
+            f"SELECT {selected}SUM(r.review_count) AS review_count, SUM(r.score_sum) AS score_sum, "
+            "SUM(r.score_sq_sum) AS score_sq_sum "
+            f"FROM review_rollups r JOIN banks b ON r.bank_id = b.id {where}{grouped}",
+            params)
+        if 'review_day' in df.columns:
+            df['review_day'] = pd.to_datetime(df['review_day'])
+        return summarize(df)
+
+    def query_reviews(self, bank: Optional[str] = None, sentiment_label: Optional[str] = None,
+                      limit: int = 100) -> 'pd.DataFrame':
+        """Most recent reviews, optionally for one bank and/or sentiment label."""
+        clauses, params = [], []
+        for column, value in (('b.name', bank), ('r.sentiment_label', sentiment_label)):
+            if value is not None:
+                params.append(value)
+                clauses.append(f"{column} = {self.dialect.placeholder(len(params))}")
+        params.append(limit)
+        where = f"WHERE {' AND '.join(clauses)} " if clauses else ""
+        return self._query(
+            "SELECT r.review_id, b.name AS bank, r.review_text, r.sentiment_label, r.sentiment_score, "
+            "r.rating, r.review_date FROM reviews r JOIN banks b ON r.bank_id = b.id "
+            f"{where}ORDER BY r.review_date DESC, r.review_id "
+            f"{self.dialect.limit_clause(len(params))}",
+            params)
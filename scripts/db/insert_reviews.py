@@ -1,102 +1,145 @@
-import os
+import numpy as np
 import pandas as pd
-import oracledb
-from dotenv import load_dotenv
+from pandas.util import hash_pandas_object
 
-# Load environment variables
-load_dotenv()
+from scripts.common.instrumentation import instrumented
+from scripts.common.storage import iter_table, read_table
+from scripts.db.database import ReviewRepository, get_database
 
-ORACLE_USER = os.getenv("ORACLE_USER")
-ORACLE_PASSWORD = os.getenv("ORACLE_PASSWORD")
-ORACLE_DSN = os.getenv("ORACLE_DSN")
-
-# Path to the processed CSVs
+# Paths to the analyzed tables (Parquet datasets or legacy CSVs)
 THEMATIC_PATHS = {
-    "CBE": "data/thematically_analyzed/commercial_bank_of_ethiopia_reviews_thematic_analysis.csv",
-    "BOA": "data/thematically_analyzed/bank_of_abyssinia_reviews_thematic_analysis.csv",
-    "Dashen": "data/thematically_analyzed/dashen_bank_reviews_thematic_analysis.csv"
+    "CBE": "data/thematically_analyzed/commercial_bank_of_ethiopia_reviews_thematic_analysis",
+    "BOA": "data/thematically_analyzed/bank_of_abyssinia_reviews_thematic_analysis",
+    "Dashen": "data/thematically_analyzed/dashen_bank_reviews_thematic_analysis"
 }
 
 SENTIMENT_PATHS = {
-    "CBE": "data/analyzed/sentiment_commercial_bank_of_ethiopia_reviews.csv",
-    "BOA": "data/analyzed/sentiment_bank_of_abyssinia_reviews.csv",
-    "Dashen": "data/analyzed/sentiment_dashen_bank_reviews.csv"
+    "CBE": "data/analyzed/sentiment_commercial_bank_of_ethiopia_reviews",
+    "BOA": "data/analyzed/sentiment_bank_of_abyssinia_reviews",
+    "Dashen": "data/analyzed/sentiment_dashen_bank_reviews"
 }
 
+BANK_NAMES = {
+    "CBE": "Commercial Bank of Ethiopia",
+    "BOA": "Bank of Abyssinia",
+    "Dashen": "Dashen Bank"
+}
 
-def merge_data():
+# Only these columns are read from each side of the merge
+THEME_COLUMNS = ['review_id', 'identified_theme']
+SENTIMENT_COLUMNS = ['review_id', 'review_text', 'sentiment_label', 'sentiment_score', 'rating', 'date']
+
+
+def key_hashes(review_ids: pd.Series) -> np.ndarray:
+    """64-bit integer join keys for review IDs; cheaper to index than the strings."""
+    return hash_pandas_object(review_ids.astype(str), index=False).to_numpy()
+
+
+def build_theme_index(bank_code):
+    """
+    Load the thematic side of the join, keyed by review_id.
+
+    Returns:
+        Tuple[pd.DataFrame, pd.Series]: Themes indexed by key hash with one row
+            per review, and the extra row count of each duplicated key.
+    """
+    theme_df = read_table(THEMATIC_PATHS[bank_code], columns=THEME_COLUMNS)
+    theme_df.index = pd.Index(key_hashes(theme_df['review_id']), name='key')
+    duplicated = theme_df.index.duplicated()
+    extra_rows = pd.Series(theme_df.index[duplicated]).value_counts()
+    return theme_df[~duplicated].drop(columns=['review_id']), extra_rows
+
+
+def iter_merged(bank_code, chunk_size=100_000, report=None):
+    """
+    Hash-join one bank's sentiment rows to its themes on review_id, chunk by chunk.
+
+    The thematic side (review_id and theme only) is indexed in memory; the
+    sentiment side is streamed in `chunk_size` rows and probed against it,
+    so each sentiment row yields at most one merged row. Duplicate
+    review_ids on either side are dropped and counted in `report`, along
+    with matched and unmatched rows. `fan_out` is the rows per sentiment row
+    a plain join would have produced; above 1 means duplicates were removed.
+    """
+    theme_index, extra_rows = build_theme_index(bank_code)
+    theme_duplicates = int(extra_rows.sum())
+    report = report if report is not None else {}
+    report.update({'theme_rows': len(theme_index) + theme_duplicates, 'theme_duplicates': theme_duplicates,
+                   'sentiment_rows': 0, 'sentiment_duplicates': 0, 'matched': 0, 'unmatched': 0})
+    join_rows = 0
+    seen = set()
+    for chunk in iter_table(SENTIMENT_PATHS[bank_code], columns=SENTIMENT_COLUMNS, chunk_size=chunk_size):
+        report['sentiment_rows'] += len(chunk)
+        keys = key_hashes(chunk['review_id'])
+        first = ~pd.Series(keys).duplicated().to_numpy()
+        first &= np.fromiter((key not in seen for key in keys), dtype=bool, count=len(keys))
+        seen.update(keys[first].tolist())
+        report['sentiment_duplicates'] += int((~first).sum())
+
+        positions = theme_index.index.get_indexer(keys)
+        join_rows += int((positions >= 0).sum()) + int(extra_rows.reindex(keys).fillna(0).sum())
+        matched = first & (positions >= 0)
+        report['matched'] += int(matched.sum())
+        report['unmatched'] += int((first & (positions < 0)).sum())
+        if not matched.any():
+            continue
+        merged = chunk[matched].reset_index(drop=True)
+        for column in theme_index.columns:
+            merged[column] = theme_index[column].to_numpy()[positions[matched]]
+        merged['bank'] = bank_code
+        yield merged
+
+    report['fan_out'] = join_rows / report['sentiment_rows'] if report['sentiment_rows'] else 0.0
+    if report['theme_duplicates'] or report['sentiment_duplicates']:
+        print(f"⚠️ Duplicate review_ids dropped for {bank_code}: {report}")
+    else:
+        print(f"✅ Merge cardinality for {bank_code}: {report}")
+
+
+def merge_data(chunk_size=100_000):
     merged_data = []
     for bank_code in THEMATIC_PATHS:
-        theme_df = pd.read_csv(THEMATIC_PATHS[bank_code])
-        senti_df = pd.read_csv(SENTIMENT_PATHS[bank_code])
-
-        # Merge on review_text
-        df = pd.merge(
-            theme_df, senti_df[['review_text', 'sentiment_label',
-                                'sentiment_score', 'rating', 'date']],
-            on='review_text',
-            how='inner'
-        )
-        df['bank'] = bank_code
-        merged_data.append(df)
-
+        merged_data.extend(iter_merged(bank_code, chunk_size))
+    if not merged_data:
+        return pd.DataFrame(columns=SENTIMENT_COLUMNS + THEME_COLUMNS[1:] + ['bank'])
     return pd.concat(merged_data, ignore_index=True)
 
 
-def insert_data():
-    df = merge_data()
-
-    print("✅ Data merged:", df.shape)
-    conn = oracledb.connect(
-        user=ORACLE_USER, password=ORACLE_PASSWORD, dsn=ORACLE_DSN)
-    cursor = conn.cursor()
+@instrumented('load')
+def insert_data(batch_size=10_000, backend=None, chunk_size=100_000):
+    repository = ReviewRepository(get_database(backend), batch_size=batch_size)
 
     # Insert banks if not already there
-    bank_names = {
-        "CBE": "Commercial Bank of Ethiopia",
-        "BOA": "Bank of Abyssinia",
-        "Dashen": "Dashen Bank"
-    }
-
-    bank_id_map = {}
-
-    for code, name in bank_names.items():
-        cursor.execute(
-            "MERGE INTO banks b USING (SELECT :1 AS name FROM dual) d ON (b.name = d.name) WHEN NOT MATCHED THEN INSERT (name) VALUES (:1)",
-            [name]
-        )
-        conn.commit()
-        cursor.execute("SELECT id FROM banks WHERE name = :1", [name])
-        bank_id = cursor.fetchone()[0]
-        bank_id_map[code] = bank_id
-
-    # Insert reviews (assuming a reviews table exists with appropriate columns)
-    for index, row in df.iterrows():
-        cursor.execute(
-            """
-            MERGE INTO reviews r
-            USING (SELECT :1 AS review_id, :2 AS review_text, :3 AS sentiment_label, :4 AS sentiment_score,
-                          :5 AS rating, :6 AS date, :7 AS bank_id FROM dual) d
-            ON (r.review_id = d.review_id)
-            WHEN NOT MATCHED THEN
-            INSERT (review_id, review_text, sentiment_label, sentiment_score, rating, date, bank_id)
-            VALUES (:1, :2, :3, :4, :5, :6, :7)
-            """,
-            [
-                row['review_id'],
-                row['review_text'],
-                row['sentiment_label'],
-                row['sentiment_score'],
-                row['rating'],
-                row['date'],
-                bank_id_map[row['bank']]
-            ]
-        )
-
-    conn.commit()
-    cursor.close()
-    conn.close()
-    print("✅ All reviews inserted.")
+    bank_ids = repository.upsert_banks(BANK_NAMES.values())
+    bank_id_map = {code: bank_ids[name] for code, name in BANK_NAMES.items()}
+
+    # Merge and load chunk by chunk, so the full merged table is never held in memory.
+    # Reviews already in the database are skipped by the MERGE itself, so a rerun
+    # (or a load into freshly recreated tables) needs no client-side bookkeeping.
+    rows, seconds = 0, 0.0
+    for bank_code in THEMATIC_PATHS:
+        for df in iter_merged(bank_code, chunk_size):
+            stats = repository.upsert_reviews(df, bank_id_map)
+            rows += stats['rows']
+            seconds += stats['seconds']
+        print(f"✅ {bank_code} loaded")
+
+    print(f"✅ All reviews merged: {rows} rows at {rows / seconds if seconds else 0.0:.1f} rows/sec.")
+
+
+def rebuild_rollups(backend=None, chunk_size=100_000):
+    """
+    Recompute the sentiment/theme rollups from the analyzed tables.
+
+    Loads keep the rollups current on their own; this full pass is only for
+    databases holding reviews loaded before the rollups table existed.
+    """
+    repository = ReviewRepository(get_database(backend))
+    bank_ids = repository.upsert_banks(BANK_NAMES.values())
+    bank_id_map = {code: bank_ids[name] for code, name in BANK_NAMES.items()}
+    frames = (df for bank_code in THEMATIC_PATHS for df in iter_merged(bank_code, chunk_size))
+    stats = repository.rebuild_rollups(frames, bank_id_map)
+    print(f"✅ Rollups rebuilt from {stats['rows']} stored reviews in {stats['seconds']}s.")
 
 
 if __name__ == "__main__":
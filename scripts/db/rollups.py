@@ -0,0 +1,72 @@
+"""
+Incrementally maintained sentiment/theme rollups for dashboards.
+
+`review_rollups` holds one row per (bank, day, rating, sentiment label,
+theme) with the review count and the sum and sum of squares of sentiment
+scores. The loader adds the reviews each batch actually inserts, in the same
+transaction as the reviews themselves, so the rollups stay exact without
+rescanning history, and count, mean and standard deviation for any date
+range follow from the sums alone.
+"""
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional, Sequence, Tuple
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+# Rollup columns in bind order: the key, then the additive measures
+ROLLUP_COLUMNS = ['bank_id', 'review_day', 'rating', 'sentiment_label', 'theme',
+                  'review_count', 'score_sum', 'score_sq_sum']
+
+# Query dimensions and the rollup column each groups by
+DIMENSIONS = {
+    'bank': 'b.name',
+    'review_day': 'r.review_day',
+    'rating': 'r.rating',
+    'sentiment_label': 'r.sentiment_label',
+    'theme': 'r.theme',
+}
+
+# Key columns are NOT NULL (NULLs never match in a primary key or MERGE), so
+# missing values are stored as these
+NO_RATING = 0
+NO_LABEL = 'UNKNOWN'
+# Same as ThemeMatcher's label for reviews matching no theme
+NO_THEME = 'Other'
+
+
+def rollup_deltas(rows: Sequence[tuple], themes: Sequence[Optional[str]],
+                  day_key: Callable = lambda value: value) -> Tuple[List[tuple], int]:
+    """
+    Sum review bind tuples (in `REVIEW_COLUMNS` order) into rollup increments.
+
+    Args:
+        themes: Primary theme of each row, aligned with `rows`.
+        day_key: Turns a bound review date into its day, per dialect.
+
+    Returns:
+        Tuple[List[tuple], int]: Increments in `ROLLUP_COLUMNS` order, and the
+            number of rows left out because they have no date or score.
+    """
+    totals: Dict[tuple, List[float]] = {}
+    skipped = 0
+    for (_, _, label, score, rating, date, bank_id), theme in zip(rows, themes):
+        if date is None or score is None:
+            skipped += 1
+            continue
+        key = (bank_id, day_key(date), NO_RATING if rating is None else rating,
+               label or NO_LABEL, theme or NO_THEME)
+        measures = totals.get(key)
+        if measures is None:
+            measures = totals[key] = [0, 0.0, 0.0]
+        measures[0] += 1
+        measures[1] += score
+        measures[2] += score * score
+    return [key + tuple(measures) for key, measures in totals.items()], skipped
+
+
+def summarize(df: 'pd.DataFrame') -> 'pd.DataFrame':
+    """Add `mean_score` and (population) `score_std` computed from the summed measures."""
+    counts = df['review_count'].astype('float64')
+    df['mean_score'] = df['score_sum'] / counts
+    df['score_std'] = (df['score_sq_sum'] / counts - df['mean_score'] ** 2).clip(lower=0) ** 0.5
+    return df
@@ -12,4 +12,19 @@ CREATE TABLE reviews (
     review_date DATE,
     bank_id NUMBER,
     CONSTRAINT fk_bank FOREIGN KEY (bank_id) REFERENCES banks(id)
-)
\ No newline at end of file
+);
+
+CREATE TABLE review_rollups (
+    bank_id NUMBER NOT NULL,
+    review_day DATE NOT NULL,
+    rating NUMBER NOT NULL,
+    sentiment_label VARCHAR2(20) NOT NULL,
+    theme VARCHAR2(100) NOT NULL,
+    review_count NUMBER NOT NULL,
+    score_sum NUMBER NOT NULL,
+    score_sq_sum NUMBER NOT NULL,
+    CONSTRAINT pk_review_rollups PRIMARY KEY (bank_id, review_day, rating, sentiment_label, theme),
+    CONSTRAINT fk_rollup_bank FOREIGN KEY (bank_id) REFERENCES banks(id)
+);
+
+CREATE INDEX review_rollups_day ON review_rollups (review_day)
@@ -0,0 +1,289 @@
+"""
+End-to-end pipeline orchestrator.
+
+Stages form a DAG with declared inputs, outputs and parameters. A stage is
+skipped when the fingerprint of its inputs, code and parameters matches the
+last successful run and its outputs still exist; independent stages (e.g.
+sentiment and thematic) run concurrently, each in its own process.
+
+    python -m scripts.pipeline run                  # run whatever is out of date
+    python -m scripts.pipeline run sentiment --force
+    python -m scripts.pipeline status
+    python -m scripts.pipeline prepare              # one-time downloads and model warm-up
+"""
+import argparse
+import hashlib
+import json
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Dict, Iterable, List, Optional
+
+from scripts.common.logging_config import get_logger
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+STATE_PATH = os.path.join(ROOT, 'data', '.pipeline_state.json')
+
+# Set up logging
+logger = get_logger(__name__, "pipeline.log")
+
+
+class Stage:
+    """
+    One pipeline step.
+
+    `target` is a "module:function" entry point called with `params` in a
+    subprocess whose working directory is `cwd` (relative to the repo root),
+    matching the relative paths each stage already uses. `inputs`, `outputs`
+    and `code` are repo-relative files or directories. A stage whose inputs
+    live outside the repo (e.g. the Play Store) sets `max_age`, the seconds
+    after its last run at which it becomes stale anyway.
+    """
+
+    def __init__(self, name: str, target: str, inputs: List[str], outputs: List[str], code: List[str],
+                 deps: List[str] = (), params: Optional[Dict] = None, cwd: str = 'notebooks',
+                 max_age: Optional[float] = None):
+        self.name = name
+        self.target = target
+        self.inputs = list(inputs)
+        self.outputs = list(outputs)
+        self.code = list(code)
+        self.deps = list(deps)
+        self.params = params or {}
+        self.cwd = cwd
+        self.max_age = max_age
+
+
+STAGES = [
+    Stage('scrape', 'scripts.scraping.scrape_reviews:scrape',
+          inputs=[], outputs=['data/raw'], code=['scripts/scraping', 'scripts/common'],
+          params={'incremental': True}, max_age=24 * 3600),
+    Stage('preprocess', 'scripts.preprocessing.clean_pipeline:preprocess',
+          inputs=['data/raw'], outputs=['data/processed'], code=['scripts/preprocessing', 'scripts/common'],
+          deps=['scrape']),
+    Stage('sentiment', 'scripts.SentimentThematicAnalysis.analyze_sentiment:sentiment',
+          inputs=['data/processed'], outputs=['data/analyzed'],
+          code=['scripts/SentimentThematicAnalysis', 'scripts/common'], deps=['preprocess']),
+    Stage('thematic', 'scripts.SentimentThematicAnalysis.keyword_extraction:thematic',
+          inputs=['data/processed'], outputs=['data/thematically_analyzed'],
+          code=['scripts/SentimentThematicAnalysis', 'scripts/common'], deps=['preprocess']),
+    Stage('create_tables', 'scripts.db.create_schema:create_tables',
+          inputs=['scripts/db/schema.sql'], outputs=[],
+          code=['scripts/db/create_schema.py', 'scripts/db/schema.sql'], cwd='.'),
+    Stage('load', 'scripts.db.insert_reviews:insert_data',
+          inputs=['data/analyzed', 'data/thematically_analyzed'], outputs=[], code=['scripts/db', 'scripts/common'],
+          deps=['sentiment', 'thematic', 'create_tables'], cwd='.'),
+]
+
+
+def _files(path: str) -> Iterable[str]:
+    full = os.path.join(ROOT, path)
+    if os.path.isfile(full):
+        yield path
+        return
+    for dirpath, dirnames, filenames in os.walk(full):
+        dirnames[:] = sorted(d for d in dirnames if d != '__pycache__' and not d.startswith('.'))
+        for filename in sorted(filenames):
+            if not filename.startswith('.') and not filename.endswith('.pyc'):
+                yield os.path.relpath(os.path.join(dirpath, filename), ROOT)
+
+
+class Fingerprinter:
+    """
+    Content hashes of stage inputs.
+
+    File digests are remembered by (size, mtime), so unchanged files are not
+    re-read on every run; only new or modified files are hashed.
+    """
+
+    def __init__(self, known: Optional[Dict[str, Dict]] = None):
+        self.known = known or {}
+
+    def file_digest(self, path: str) -> str:
+        stat = os.stat(os.path.join(ROOT, path))
+        entry = self.known.get(path)
+        if entry and entry['size'] == stat.st_size and entry['mtime_ns'] == stat.st_mtime_ns:
+            return entry['sha256']
+        digest = hashlib.sha256()
+        with open(os.path.join(ROOT, path), 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                digest.update(block)
+        self.known[path] = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'sha256': digest.hexdigest()}
+        return self.known[path]['sha256']
+
+    def stage(self, stage: Stage, stages: Optional[Dict[str, Dict]] = None) -> str:
+        """
+        Digest of a stage's target, params, input and code files, and its
+        dependencies' last runs (from `stages`, the stored state).
+
+        Every new run of a dependency therefore makes the stage stale, e.g.
+        `load` reruns after `create_tables` drops and recreates the tables.
+        """
+        digest = hashlib.sha256(json.dumps(
+            {'target': stage.target, 'params': stage.params}, sort_keys=True).encode('utf-8'))
+        for path in stage.inputs + stage.code:
+            for file_path in _files(path):
+                digest.update(f"{file_path}\0{self.file_digest(file_path)}\0".encode('utf-8'))
+        for dep in stage.deps:
+            run = (stages or {}).get(dep, {})
+            digest.update(f"{dep}\0{run.get('fingerprint')}\0{run.get('finished_at')}\0".encode('utf-8'))
+        return digest.hexdigest()
+
+
+def load_state(state_path: str = STATE_PATH) -> Dict:
+    if not os.path.exists(state_path):
+        return {'stages': {}, 'files': {}}
+    with open(state_path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def save_state(state: Dict, state_path: str = STATE_PATH) -> None:
+    """Atomically write stage fingerprints."""
+    os.makedirs(os.path.dirname(state_path), exist_ok=True)
+    tmp_path = state_path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(state, f, indent=2)
+    os.replace(tmp_path, state_path)
+
+
+def is_up_to_date(stage: Stage, fingerprint: str, state: Dict) -> bool:
+    last_run = state['stages'].get(stage.name, {})
+    if stage.max_age is not None and time.time() - last_run.get('finished_at', 0) > stage.max_age:
+        return False
+    outputs_exist = all(os.path.exists(os.path.join(ROOT, path)) for path in stage.outputs)
+    return outputs_exist and last_run.get('fingerprint') == fingerprint
+
+
+def run_stage(stage: Stage) -> float:
+    """Run a stage's entry point in a subprocess; raises if it fails. Returns seconds taken."""
+    module, function = stage.target.split(':')
+    code = f"import json, sys; from {module} import {function}; {function}(**json.loads(sys.argv[1]))"
+    cwd = os.path.join(ROOT, stage.cwd)
+    os.makedirs(cwd, exist_ok=True)
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [ROOT, os.environ.get('PYTHONPATH')])))
+    started = time.perf_counter()
+    subprocess.run([sys.executable, '-c', code, json.dumps(stage.params)], cwd=cwd, env=env, check=True)
+    return time.perf_counter() - started
+
+
+def run_pipeline(selected: Optional[List[str]] = None, force: bool = False, jobs: int = 2,
+                 dry_run: bool = False, stages: List[Stage] = STAGES, state_path: str = STATE_PATH) -> Dict[str, str]:
+    """
+    Run out-of-date stages in dependency order.
+
+    Args:
+        selected (List[str], optional): Stages to consider; others are treated as
+            done. Defaults to all stages.
+        force (bool): Run the selected stages even if they are up to date.
+        jobs (int): Stages allowed to run at the same time.
+        dry_run (bool): Only report what would run.
+
+    Returns:
+        Dict[str, str]: Outcome per stage: 'ran', 'skipped', 'would run',
+            'failed' or 'blocked' (a dependency failed).
+    """
+    by_name = {stage.name: stage for stage in stages}
+    selected = set(selected or by_name)
+    unknown = selected - set(by_name)
+    if unknown:
+        raise ValueError(f"Unknown stages: {sorted(unknown)}; expected some of {list(by_name)}")
+
+    state = load_state(state_path)
+    fingerprinter = Fingerprinter(state.get('files'))
+    results: Dict[str, str] = {name: 'skipped' for name in by_name if name not in selected}
+    pending = [stage for stage in stages if stage.name in selected]
+    running = {}
+
+    with ThreadPoolExecutor(max_workers=max(1, jobs)) as executor:
+        while pending or running:
+            for stage in list(pending):
+                if any(results.get(dep) in ('failed', 'blocked') for dep in stage.deps):
+                    results[stage.name] = 'blocked'
+                    pending.remove(stage)
+                    continue
+                if not all(results.get(dep) in ('ran', 'skipped', 'would run') for dep in stage.deps):
+                    continue
+                pending.remove(stage)
+                # Fingerprint once dependencies are done, so it reflects their fresh outputs
+                fingerprint = fingerprinter.stage(stage, state['stages'])
+                if dry_run and any(results[dep] == 'would run' for dep in stage.deps):
+                    results[stage.name] = 'would run'
+                elif not force and is_up_to_date(stage, fingerprint, state):
+                    results[stage.name] = 'skipped'
+                    logger.info(f"Skipping {stage.name}: up to date")
+                elif dry_run:
+                    results[stage.name] = 'would run'
+                else:
+                    logger.info(f"Starting {stage.name}")
+                    running[executor.submit(run_stage, stage)] = (stage, fingerprint)
+            if not running:
+                continue
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                stage, fingerprint = running.pop(future)
+                try:
+                    seconds = future.result()
+                except Exception as e:
+                    results[stage.name] = 'failed'
+                    logger.error(f"Stage {stage.name} failed: {e}")
+                    continue
+                results[stage.name] = 'ran'
+                # Recompute so changes the stage made to its own inputs are not seen as stale next time
+                state['stages'][stage.name] = {'fingerprint': fingerprinter.stage(stage, state['stages']),
+                                               'seconds': round(seconds, 2), 'finished_at': time.time()}
+                state['files'] = fingerprinter.known
+                save_state(state, state_path)
+                logger.info(f"Finished {stage.name} in {seconds:.1f}s")
+
+    if not dry_run:
+        state['files'] = fingerprinter.known
+        save_state(state, state_path)
+    return {stage.name: results[stage.name] for stage in stages}
+
+
+def pipeline_status(stages: List[Stage] = STAGES, state_path: str = STATE_PATH) -> Dict[str, str]:
+    """Whether each stage is up to date given the current inputs, without running anything."""
+    state = load_state(state_path)
+    fingerprinter = Fingerprinter(state.get('files'))
+    status = {}
+    for stage in stages:
+        stale = (any(status.get(dep) == 'stale' for dep in stage.deps)
+                 or not is_up_to_date(stage, fingerprinter.stage(stage, state['stages']), state))
+        status[stage.name] = 'stale' if stale else 'up to date'
+    return status
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog='python -m scripts.pipeline', description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest='command', required=True)
+    run = commands.add_parser('run', help='run out-of-date stages')
+    run.add_argument('stages', nargs='*', help='stages to consider (default: all)')
+    run.add_argument('--force', action='store_true', help='run the selected stages even if up to date')
+    run.add_argument('--jobs', type=int, default=2, help='stages to run concurrently')
+    run.add_argument('--dry-run', action='store_true', help='only show what would run')
+    commands.add_parser('status', help='show which stages are stale')
+    # Imported here for its arguments only; it defers every heavy import itself
+    from scripts import prepare
+    prepare.add_arguments(commands.add_parser('prepare', help='download NLP data and models and warm them up'))
+    args = parser.parse_args(argv)
+
+    if args.command == 'prepare':
+        return prepare.run(args)
+
+    if args.command == 'status':
+        for name, status in pipeline_status().items():
+            print(f"{name:15} {status}")
+        return 0
+
+    results = run_pipeline(args.stages, force=args.force, jobs=args.jobs, dry_run=args.dry_run)
+    for name, outcome in results.items():
+        print(f"{name:15} {outcome}")
+    return 1 if any(outcome in ('failed', 'blocked') for outcome in results.values()) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
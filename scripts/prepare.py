@@ -0,0 +1,123 @@
+"""
+One-time provisioning and warm-up.
+
+Importing a pipeline module never downloads anything or loads a model; this
+command does all of that up front, so later runs start offline and fast:
+
+    python -m scripts.prepare                      # everything
+    python -m scripts.prepare nltk spacy           # only some steps
+    python -m scripts.pipeline prepare sentiment   # same, via the pipeline CLI
+
+Each step is timed and reported; a failing step does not stop the others.
+"""
+import argparse
+import os
+import sys
+import time
+from typing import Callable, Dict, List, Optional
+
+from scripts.common.logging_config import get_logger
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Steps run where the analysis stages run, so relative model paths resolve the same way
+WORK_DIR = os.path.join(ROOT, 'notebooks')
+
+# Set up logging
+logger = get_logger(__name__, "prepare.log")
+
+WARM_UP_TEXTS = ['The app is fast and easy to use', 'Transfers keep failing since the last update']
+
+
+def prepare_nltk() -> None:
+    """Download the tokenizer, stopword and WordNet data and load it once."""
+    from scripts.preprocessing.text_normalizer import TextNormalizer, download_nltk_resources
+
+    download_nltk_resources()
+    TextNormalizer().normalize_many(WARM_UP_TEXTS)
+
+
+def prepare_spacy() -> None:
+    """Install the spaCy model if missing and load it once."""
+    from importlib.util import find_spec
+
+    from scripts.SentimentThematicAnalysis.lemmatizer import SPACY_MODEL, download_spacy_model, load_nlp
+
+    if find_spec(SPACY_MODEL) is None:
+        download_spacy_model(SPACY_MODEL)
+    list(load_nlp().pipe(WARM_UP_TEXTS))
+
+
+def prepare_sentiment(model_name: Optional[str] = None, backend: Optional[str] = None) -> None:
+    """
+    Fetch the sentiment model into the Hugging Face cache and run one batch.
+
+    For the 'onnx' backend the model is exported first if no export exists.
+    """
+    from scripts.SentimentThematicAnalysis.sentiment_backends import DEFAULT_BACKEND, export_onnx, onnx_model_dir
+    from scripts.SentimentThematicAnalysis.sentiment_engine import DEFAULT_MODEL, get_sentiment_pipeline
+
+    model_name = model_name or DEFAULT_MODEL
+    backend = backend or DEFAULT_BACKEND
+    if backend == 'onnx' and not os.path.isdir(onnx_model_dir(model_name)):
+        export_onnx(model_name)
+    get_sentiment_pipeline(model_name, backend=backend)(WARM_UP_TEXTS, batch_size=len(WARM_UP_TEXTS))
+
+
+STEPS: Dict[str, Callable[[], None]] = {
+    'nltk': prepare_nltk,
+    'spacy': prepare_spacy,
+    'sentiment': prepare_sentiment,
+}
+
+
+def prepare(steps: Optional[List[str]] = None) -> Dict[str, Dict]:
+    """
+    Run the selected provisioning steps (default: all) in order.
+
+    Returns:
+        Dict[str, Dict]: Per step, {'status': 'ok' | 'error', 'seconds': ...}
+        plus 'error' with the message when the step failed.
+    """
+    results = {}
+    cwd = os.getcwd()
+    os.chdir(WORK_DIR)
+    try:
+        for name in steps or list(STEPS):
+            started = time.perf_counter()
+            try:
+                STEPS[name]()
+                results[name] = {'status': 'ok'}
+                logger.info(f"Prepared {name} in {time.perf_counter() - started:.1f}s")
+            except Exception as e:
+                results[name] = {'status': 'error', 'error': f"{type(e).__name__}: {' '.join(str(e).split())[:300]}"}
+                logger.error(f"Preparing {name} failed: {e}")
+            results[name]['seconds'] = round(time.perf_counter() - started, 2)
+    finally:
+        os.chdir(cwd)
+    return results
+
+
+def add_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument('steps', nargs='*', help=f"steps to run: {', '.join(STEPS)} (default: all)")
+
+
+def run(args: argparse.Namespace) -> int:
+    unknown = sorted(set(args.steps) - set(STEPS))
+    if unknown:
+        print(f"Unknown steps {unknown}; expected some of {list(STEPS)}", file=sys.stderr)
+        return 2
+    results = prepare(args.steps)
+    for name, result in results.items():
+        print(f"{name:10} {result['status']:6} {result['seconds']:>7.2f}s  {result.get('error', '')}".rstrip())
+    return 1 if any(result['status'] == 'error' for result in results.values()) else 0
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog='python -m scripts.prepare', description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    add_arguments(parser)
+    return run(parser.parse_args(argv))
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,154 @@
+import json
+import os
+import time
+from typing import Callable, Dict, List, Optional, Set
+
+import numpy as np
+import pandas as pd
+
+from scripts.common.instrumentation import inc, instrumented, span
+from scripts.common.logging_config import get_logger
+from scripts.common.storage import iter_table, table_exists, write_table
+from scripts.preprocessing.handle_missing_data import missing_data_mask
+from scripts.preprocessing.normalize_dates import parse_dates
+from scripts.preprocessing.remove_duplicates import duplicate_mask
+from scripts.preprocessing.validate_ratings import valid_rating_mask
+
+# Set up logging
+logger = get_logger(__name__, "preprocess_reviews.log")
+
+# Cleaning stages, applied in this order
+STAGES = ['remove_duplicates', 'handle_missing_data',
+          'normalize_dates', 'validate_ratings']
+
+# Columns of a raw review table, as written by the scraper
+RAW_COLUMNS = ['review_id', 'review_text', 'rating', 'date', 'bank_name', 'source']
+
+# Raw tables written by the scraper, one per bank
+RAW_STEMS = ['commercial_bank_of_ethiopia_reviews',
+             'bank_of_abyssinia_reviews', 'dashen_bank_reviews']
+
+
+class CleaningPipeline:
+    """
+    Fused cleaning pass equivalent to running remove_duplicates,
+    handle_missing_data, normalize_dates and validate_ratings in sequence.
+
+    Each stage only narrows a shared keep-mask (or parses dates in place), so
+    a chunk is copied once at the end instead of once per stage. Duplicate
+    keys are carried across chunks, which lets files larger than memory be
+    cleaned chunk by chunk with the same result as a single pass.
+    """
+
+    def __init__(self, bank_name: str):
+        self.bank_name = bank_name
+        self.seen_keys: Set[int] = set()
+        self.stats: Dict[str, Dict] = {
+            stage: {'stage': stage, 'rows_in': 0, 'rows_out': 0, 'seconds': 0.0}
+            for stage in STAGES
+        }
+
+    def _record(self, stage: str, rows_in: int, rows_out: int, started: float) -> None:
+        stats = self.stats[stage]
+        stats['rows_in'] += rows_in
+        stats['rows_out'] += rows_out
+        stats['seconds'] += time.perf_counter() - started
+
+    def clean_chunk(self, df: pd.DataFrame) -> pd.DataFrame:
+        keep = np.ones(len(df), dtype=bool)
+
+        started, rows_in = time.perf_counter(), int(keep.sum())
+        keep &= ~duplicate_mask(df, self.seen_keys).to_numpy()
+        self._record('remove_duplicates', rows_in, int(keep.sum()), started)
+
+        started, rows_in = time.perf_counter(), int(keep.sum())
+        keep &= ~missing_data_mask(df).to_numpy()
+        self._record('handle_missing_data', rows_in, int(keep.sum()), started)
+
+        started, rows_in = time.perf_counter(), int(keep.sum())
+        df['date'] = parse_dates(df['date'])
+        self._record('normalize_dates', rows_in, rows_in, started)
+
+        started, rows_in = time.perf_counter(), int(keep.sum())
+        keep &= valid_rating_mask(df).to_numpy(dtype=bool, na_value=False)
+        self._record('validate_ratings', rows_in, int(keep.sum()), started)
+
+        return df[keep]
+
+    def summary(self) -> List[Dict]:
+        """Per-stage rows in, rows out and elapsed seconds, in stage order."""
+        return [dict(self.stats[stage], seconds=round(self.stats[stage]['seconds'], 4)) for stage in STAGES]
+
+
+def run_cleaning_pipeline(input_stem: str, output_stem: str, bank_name: str, chunk_size: int = 100_000,
+                          fmt: Optional[str] = None,
+                          transform: Optional[Callable[[pd.DataFrame], pd.DataFrame]] = None) -> List[Dict]:
+    """
+    Clean a raw review table chunk by chunk and write the result.
+
+    Args:
+        input_stem (str): Raw table (Parquet dataset or CSV).
+        output_stem (str): Destination table; overwritten.
+        bank_name (str): Name of the bank, for logging.
+        chunk_size (int): Maximum rows held in memory at once.
+        fmt (str, optional): Output storage format.
+        transform (Callable, optional): Applied to each cleaned chunk before it
+            is written, e.g. text preprocessing.
+
+    Returns:
+        List[Dict]: Structured per-stage summary from `CleaningPipeline.summary`.
+    """
+    pipeline = CleaningPipeline(bank_name)
+    wrote_any = False
+    for chunk in iter_table(input_stem, chunk_size=chunk_size):
+        with span('clean.chunk'):
+            cleaned = pipeline.clean_chunk(chunk)
+        inc('rows', len(chunk), stage='clean')
+        if transform is not None and not cleaned.empty:
+            with span('preprocess.chunk'):
+                cleaned = transform(cleaned)
+            inc('rows', len(cleaned), stage='preprocess')
+        write_table(cleaned, output_stem, fmt=fmt, append=wrote_any)
+        wrote_any = True
+    if not wrote_any:
+        # Still replace the previous run's output, or downstream stages read it as current
+        empty = pd.DataFrame({col: pd.Series(dtype='object') for col in RAW_COLUMNS})
+        empty['date'] = pd.to_datetime(empty['date'])
+        write_table(empty, output_stem, fmt=fmt)
+
+    summary = pipeline.summary()
+    for stats in summary:
+        logger.info(
+            f"{stats['stage']} for {bank_name}: {stats['rows_in']} -> {stats['rows_out']} rows in {stats['seconds']:.3f}s")
+    logger.info(f"Cleaning summary for {bank_name}: {json.dumps(summary)}")
+    return summary
+
+
+@instrumented('preprocess')
+def preprocess(raw_dir: str = './../data/raw', processed_dir: str = './../data/processed',
+               chunk_size: int = 100_000, n_jobs: int = 1) -> Dict[str, List[Dict]]:
+    """
+    Clean and preprocess every bank's raw reviews into `<bank>_reviews_clean`.
+
+    Each chunk goes through the fused cleaning pass and then
+    `preprocess_series` (language detection, translation, normalization).
+
+    Returns:
+        Dict[str, List[Dict]]: Cleaning summary per raw table.
+    """
+    from scripts.preprocessing.preprocess_reviews import preprocess_series
+
+    def preprocess_text_column(df: pd.DataFrame) -> pd.DataFrame:
+        return df.assign(review_text=preprocess_series(df['review_text'].astype(str), n_jobs=n_jobs))
+
+    os.makedirs(processed_dir, exist_ok=True)
+    summaries = {}
+    for stem in RAW_STEMS:
+        input_stem = os.path.join(raw_dir, stem)
+        if not table_exists(input_stem):
+            logger.warning(f"Raw reviews not found: {input_stem}")
+            continue
+        summaries[stem] = run_cleaning_pipeline(
+            input_stem, os.path.join(processed_dir, f"{stem}_clean"), stem,
+            chunk_size=chunk_size, transform=preprocess_text_column)
+    return summaries
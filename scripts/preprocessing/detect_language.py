@@ -0,0 +1,84 @@
+import re
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+from langdetect import detect
+
+from scripts.common.logging_config import get_logger
+
+# Set up logging
+logger = get_logger(__name__, "preprocess_reviews.log")
+
+# Amharic (Ethiopic) Unicode range: U+1200 to U+137F
+AMHARIC_PATTERN = re.compile(r'[\u1200-\u137F]')
+# Any character outside the plain English alphabet, digits and basic punctuation
+NON_ENGLISH_PATTERN = re.compile(r'[^A-Za-z0-9 .,!?\'"-]')
+# Emojis and other symbols stripped before judging whether text is meaningful
+NOISE_PATTERN = re.compile(r'[^\w\s.,!?\'"-]')
+# Minimum length of the symbol-stripped text for it to count as meaningful
+MIN_MEANINGFUL_LENGTH = 3
+
+# Labels returned by classify_language
+EMPTY = 'empty'
+NOISE = 'noise'
+AMHARIC = 'amharic'
+ENGLISH = 'english'
+NON_ENGLISH = 'non_english'
+
+# Labels whose text should be translated to English
+TRANSLATABLE = (AMHARIC, NON_ENGLISH)
+
+
+@lru_cache(maxsize=200_000)
+def detect_language(text: str) -> str:
+    """Run langdetect once per distinct text; returns '' when detection fails."""
+    try:
+        return detect(text)
+    except Exception:
+        return ''
+
+
+def classify_text(text: str) -> str:
+    """Classify a single review; same labels as `classify_language`."""
+    return classify_language(pd.Series([text])).iloc[0]
+
+
+def classify_language(texts: pd.Series) -> pd.Series:
+    """
+    Label each review by script/language in a single vectorized pass.
+
+    Cheap regex checks settle most rows: blank text is 'empty', emoji or short
+    noise is 'noise', Ethiopic script is 'amharic' and text made only of plain
+    English characters is 'english'. Only the remaining rows go through
+    langdetect, once per distinct text.
+
+    Args:
+        texts (pd.Series): Review texts.
+
+    Returns:
+        pd.Series: One of 'empty', 'noise', 'amharic', 'english' or
+            'non_english' per row, aligned with `texts`.
+    """
+    is_str = texts.map(lambda x: isinstance(x, str))
+    text = texts.where(is_str, '').astype(str)
+
+    empty = text.str.strip().eq('').to_numpy()
+    meaningful = (text.str.replace(NOISE_PATTERN, '', regex=True).str.strip().str.len()
+                  > MIN_MEANINGFUL_LENGTH).to_numpy()
+    amharic = text.str.contains(AMHARIC_PATTERN).to_numpy()
+    plain_english = ~text.str.contains(NON_ENGLISH_PATTERN).to_numpy()
+
+    labels = np.full(len(text), ENGLISH, dtype=object)
+    ambiguous = meaningful & ~amharic & ~plain_english & ~empty
+    if ambiguous.any():
+        detected = text[ambiguous].map(detect_language).to_numpy()
+        labels[np.flatnonzero(ambiguous)[detected != 'en']] = NON_ENGLISH
+    labels[amharic & meaningful] = AMHARIC
+    labels[~meaningful] = NOISE
+    labels[empty] = EMPTY
+
+    info = detect_language.cache_info()
+    logger.info(
+        f"Classified {len(texts)} texts ({int(ambiguous.sum())} needed langdetect; cache hits={info.hits}, misses={info.misses})")
+    return pd.Series(labels, index=texts.index)
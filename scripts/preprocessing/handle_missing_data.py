@@ -1,16 +1,21 @@
 import pandas as pd
-import logging
+
+from scripts.common.logging_config import get_logger
 
 # Set up logging
-logging.basicConfig(
-    filename="../../logs/preprocess_reviews.log",
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s'
-)
+logger = get_logger(__name__, "preprocess_reviews.log")
+
+REQUIRED_COLUMNS = ['review_text', 'rating']
+
+
+def missing_data_mask(df: pd.DataFrame) -> pd.Series:
+    """True for rows missing any required column."""
+    return df[REQUIRED_COLUMNS].isna().any(axis=1)
+
 
 def handle_missing_data(df: pd.DataFrame, bank_name: str) -> pd.DataFrame:
     
     initial_len = len(df)
-    df = df.dropna(subset=['review_text', 'rating'])
-    logging.info(f"Dropped {initial_len - len(df)} rows with missing review_text or rating for {bank_name}. Remaining: {len(df)}")
+    df = df[~missing_data_mask(df)]
+    logger.info(f"Dropped {initial_len - len(df)} rows with missing review_text or rating for {bank_name}. Remaining: {len(df)}")
     return df
\ No newline at end of file
@@ -1,20 +1,18 @@
 import pandas as pd
-import os
-import logging
-from typing import Optional
+from typing import List, Optional
 
-# logging
-logging.basicConfig(
-    filename="../../logs/preprocess_reviews.log",
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s'
-)
+from scripts.common.logging_config import get_logger
+from scripts.common.storage import read_table
 
-def load_reviews(input_path: str, bank_name: str) -> Optional[pd.DataFrame]:
+# Set up logging
+logger = get_logger(__name__, "preprocess_reviews.log")
+
+def load_reviews(input_path: str, bank_name: str, columns: Optional[List[str]] = None) -> Optional[pd.DataFrame]:
+    """Load raw reviews from a Parquet dataset or CSV; a `.csv` suffix on `input_path` is optional."""
     try:
-        df = pd.read_csv(input_path)
-        logging.info(f"Loaded {len(df)} reviews for {bank_name} from {input_path}")
+        df = read_table(input_path, columns=columns)
+        logger.info(f"Loaded {len(df)} reviews for {bank_name} from {input_path}")
         return df
     except Exception as e:
-        logging.error(f"Error loading CSV for {bank_name}: {str(e)}")
+        logger.error(f"Error loading reviews for {bank_name}: {str(e)}")
         return None
\ No newline at end of file
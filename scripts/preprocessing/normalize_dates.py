@@ -1,16 +1,20 @@
 import pandas as pd
-import logging
+
+from scripts.common.logging_config import get_logger
 
 # Set up logging
-logging.basicConfig(
-    filename="../../logs/preprocess_reviews.log",
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s'
-)
+logger = get_logger(__name__, "preprocess_reviews.log")
+
+def parse_dates(dates: pd.Series) -> pd.Series:
+    """Parse dates to datetime64 truncated to the day; invalid dates become NaT."""
+    return pd.to_datetime(dates, errors='coerce', format='mixed').dt.normalize()
+
 
 def normalize_dates(df: pd.DataFrame, bank_name: str) -> pd.DataFrame:
     """
-    Normalize date column to YYYY-MM-DD format.
+    Normalize date column to calendar days (YYYY-MM-DD when written out).
+
+    Dates stay native datetime64 values rather than strings.
     
     Args:
         df (pd.DataFrame): Input DataFrame.
@@ -20,11 +24,11 @@ def normalize_dates(df: pd.DataFrame, bank_name: str) -> pd.DataFrame:
         pd.DataFrame: DataFrame with normalized dates.
     """
     try:
-        df['date'] = pd.to_datetime(df['date'], errors='coerce').dt.strftime('%Y-%m-%d')
-        logging.info(f"Normalized dates for {bank_name}")
+        df['date'] = parse_dates(df['date'])
+        logger.info(f"Normalized dates for {bank_name}")
         missing_dates = df['date'].isnull().sum()
         if missing_dates > 0:
-            logging.warning(f"{missing_dates} reviews for {bank_name} have invalid dates")
+            logger.warning(f"{missing_dates} reviews for {bank_name} have invalid dates")
     except Exception as e:
-        logging.error(f"Error normalizing dates for {bank_name}: {str(e)}")
+        logger.error(f"Error normalizing dates for {bank_name}: {str(e)}")
     return df
\ No newline at end of file
@@ -1,114 +1,126 @@
-import logging
 import pandas as pd
-import nltk
-from nltk.corpus import stopwords
-from nltk.tokenize import word_tokenize
-from nltk.stem import WordNetLemmatizer
-from langdetect import detect
-from deep_translator import MyMemoryTranslator
-import re
-
-# Download required NLTK resources
-nltk.download('punkt')
-nltk.download('stopwords')
-nltk.download('wordnet')
+from typing import Optional
+
+from scripts.common.logging_config import get_logger
+from scripts.preprocessing.detect_language import (
+    AMHARIC, AMHARIC_PATTERN, MIN_MEANINGFUL_LENGTH, NOISE_PATTERN, NON_ENGLISH_PATTERN,
+    TRANSLATABLE, classify_language, classify_text, detect_language)
+from scripts.preprocessing.text_normalizer import TextNormalizer, normalize_series
+from scripts.preprocessing.translation import (
+    MyMemoryBackend, TranslationCache, TranslationService)
 
 # Set up logging
-logging.basicConfig(
-    filename="../../logs/preprocess_reviews.log",
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s'
-)
+logger = get_logger(__name__, "preprocess_reviews.log")
+
+# NLTK resources are provisioned with text_normalizer.download_nltk_resources();
+# the normalizer itself is created on first use
+_normalizer = None
+
+
+def get_normalizer() -> TextNormalizer:
+    global _normalizer
+    if _normalizer is None:
+        _normalizer = TextNormalizer()
+    return _normalizer
+
+
+def set_normalizer(normalizer: TextNormalizer) -> None:
+    """Swap in another normalizer, e.g. one that needs no NLTK data for benchmarks."""
+    global _normalizer
+    _normalizer = normalizer
+
+
+# Translation service, created on first use; replace via set_translation_service
+_translation_service = None
+
+
+def get_translation_service() -> TranslationService:
+    """Return the shared translation service (MyMemory backend with a persistent cache)."""
+    global _translation_service
+    if _translation_service is None:
+        _translation_service = TranslationService(
+            MyMemoryBackend(target='en-US'), TranslationCache())
+    return _translation_service
 
-# Initialize Translator with a specific English target
-translator = MyMemoryTranslator(target='en-US')
+
+def set_translation_service(service: TranslationService) -> None:
+    """Swap in another service, e.g. one with an offline backend for tests."""
+    global _translation_service
+    _translation_service = service
 
 
 def is_amharic_text(text: str) -> bool:
     """Check if the text contains Amharic characters."""
     if not isinstance(text, str) or not text.strip():
         return False
-    # Amharic Unicode range: U+1200 to U+137F
-    amharic_pattern = re.compile(r'[\u1200-\u137F]')
-    return bool(amharic_pattern.search(text))
+    return bool(AMHARIC_PATTERN.search(text))
 
 
 def is_english_text(text: str) -> bool:
     """Check if the text is primarily English using langdetect."""
-    try:
-        return detect(text) == 'en'
-    except:
-        return False
+    return detect_language(text) == 'en'
 
 
 def has_non_english_chars(text: str) -> bool:
     """Check for non-English characters (e.g., non-Latin, excluding Amharic for specific handling)."""
     if not isinstance(text, str) or not text.strip():
         return True
-    english_chars = set(
-        'abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789 .,!?\'"-')
-    # Exclude Amharic range for separate handling
-    return any(ord(char) > 127 and not (0x1200 <= ord(char) <= 0x137F) or char not in english_chars for char in text)
+    return bool(NON_ENGLISH_PATTERN.search(text))
 
 
 def is_meaningful_text(text: str) -> bool:
     """Check if text contains meaningful content (excludes pure emojis or short noise)."""
-    # Remove emojis and check length
-    text_no_emojis = re.sub(r'[^\w\s.,!?\'"-]', '', text)
-    # Arbitrary threshold to avoid short noise
-    return len(text_no_emojis.strip()) > 3
+    # Remove emojis and check length against the short-noise threshold
+    text_no_emojis = NOISE_PATTERN.sub('', text)
+    return len(text_no_emojis.strip()) > MIN_MEANINGFUL_LENGTH
 
 
-def translate_to_english(text: str) -> str:
-    """Translate non-English or Amharic text to English with improved accuracy."""
+def translate_to_english(text: str, label: Optional[str] = None) -> str:
+    """
+    Translate non-English or Amharic text to English with improved accuracy.
+
+    `label` is the `classify_language` label for the text; when given, the
+    language checks are not repeated.
+    """
     try:
-        if not is_meaningful_text(text):
-            return text  # Skip translation for emojis or short noise
-
-        if is_amharic_text(text):
-            logging.info(f"Translating Amharic text: {text[:50]}...")
-            translated = translator.translate(text, source='am-ET')
-        elif has_non_english_chars(text) and not is_english_text(text):
-            logging.info(f"Translating non-English text: {text[:50]}...")
-            translated = translator.translate(text)
-        else:
-            return text
-
-        if translated and len(translated.strip()) > 0:
-            logging.info(f"Translated text: {translated[:50]}...")
-            return translated
-        else:
-            logging.warning(
-                f"Translation failed or returned empty for: {text[:50]}...")
-            return text
+        if label is None:
+            label = classify_text(text)
+        if label not in TRANSLATABLE:
+            return text  # Skip translation for English, emojis or short noise
+
+        logger.info(
+            f"Translating {'Amharic' if label == AMHARIC else 'non-English'} text: {text[:50]}...")
+        return get_translation_service().translate(text, label)
     except Exception as e:
-        logging.error(f"Translation error for text {text[:50]}...: {e}")
+        logger.error(f"Translation error for text {text[:50]}...: {e}")
         return text  # Fallback to original text
 
 
-def preprocess_text(text: str) -> str:
+def preprocess_text(text: str, label: Optional[str] = None, translate: bool = True) -> str:
     """Preprocess text: translate if needed, then tokenize and clean."""
     if not isinstance(text, str) or not text.strip():
         return ''
 
     # Translate if Amharic or non-English (excluding English-like text)
-    if (is_amharic_text(text) or (has_non_english_chars(text) and not is_english_text(text))) and is_meaningful_text(text):
-        logging.info(f"Translating text: {text[:50]}...")
-        text = translate_to_english(text)
-        logging.info(f"Translated text: {text[:50]}...")
-
-    try:
-        tokens = word_tokenize(text.lower())
-        lemmatizer = WordNetLemmatizer()
-        stop_words = set(stopwords.words('english'))
-        tokens = [
-            lemmatizer.lemmatize(word)
-            for word in tokens
-            if word.isalnum() and word not in stop_words
-        ]
-        return ' '.join(tokens) if tokens else ''
-    except Exception as e:
-        logging.error(f"Tokenization failed: {e}")
-        return ''
-
-
+    if translate:
+        if label is None:
+            label = classify_text(text)
+        if label in TRANSLATABLE:
+            text = translate_to_english(text, label)
+
+    return get_normalizer().normalize(text)
+
+
+def preprocess_series(texts: pd.Series, n_jobs: int = 1, chunk_size: int = 2000) -> pd.Series:
+    """
+    Preprocess a whole column.
+
+    Languages are classified in one batch and all translatable rows are sent
+    to the translation service together, so repeated texts are translated once.
+    Tokenization and lemmatization can then be spread over `n_jobs` processes.
+    """
+    labels = classify_language(texts)
+    translated = get_translation_service().translate_many(
+        texts.tolist(), labels.tolist())
+    return normalize_series(pd.Series(translated, index=texts.index), normalizer=get_normalizer(),
+                            n_jobs=n_jobs, chunk_size=chunk_size)
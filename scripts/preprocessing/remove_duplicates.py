@@ -1,16 +1,39 @@
 import pandas as pd
-import logging
+from typing import List, Optional, Set
+
+from scripts.common.logging_config import get_logger
 
 # Set up logging
-logging.basicConfig(
-    filename="./../logs/preprocess_reviews.log",
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s'
-)
+logger = get_logger(__name__, "preprocess_reviews.log")
+
+def duplicate_key_columns(df: pd.DataFrame) -> List[str]:
+    return ['review_id'] if 'review_id' in df.columns else ['review_text', 'date']
+
+
+def duplicate_mask(df: pd.DataFrame, seen_keys: Optional[Set[int]] = None) -> pd.Series:
+    """
+    True for rows that repeat an earlier row.
+
+    Rows are compared by a 64-bit hash of their key columns. Passing the same
+    `seen_keys` set across calls extends the check across chunks of a larger
+    file; the set is updated with this frame's keys.
+    """
+    keys = pd.util.hash_pandas_object(df[duplicate_key_columns(df)], index=False)
+    mask = keys.duplicated(keep='first')
+    if seen_keys is not None:
+        mask |= keys.isin(seen_keys)
+        seen_keys.update(keys.to_numpy().tolist())
+    return mask
+
 
 def remove_duplicates(df: pd.DataFrame, bank_name: str) -> pd.DataFrame:
-    
+    """
+    Drop duplicate reviews.
+
+    Rows are keyed on the stable `review_id` when the raw data has one, falling
+    back to `review_text` + `date` for older files.
+    """
     initial_len = len(df)
-    df = df.drop_duplicates(subset=['review_text', 'date'], keep='first')
-    logging.info(f"Removed {initial_len - len(df)} duplicates for {bank_name}. Remaining: {len(df)}")
-    return df
\ No newline at end of file
+    df = df.drop_duplicates(subset=duplicate_key_columns(df), keep='first')
+    logger.info(f"Removed {initial_len - len(df)} duplicates for {bank_name}. Remaining: {len(df)}")
+    return df
@@ -0,0 +1,109 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional
+
+import pandas as pd
+
+from scripts.common.logging_config import get_logger
+
+# Set up logging
+logger = get_logger(__name__, "preprocess_reviews.log")
+
+# NLTK resources needed by TextNormalizer; 'punkt_tab' is required by NLTK >= 3.9
+NLTK_RESOURCES = ['punkt', 'punkt_tab', 'stopwords', 'wordnet']
+
+
+def download_nltk_resources() -> None:
+    """One-time provisioning step; imports never download anything."""
+    import nltk
+
+    for resource in NLTK_RESOURCES:
+        nltk.download(resource, quiet=True)
+    logger.info(f"Downloaded NLTK resources: {NLTK_RESOURCES}")
+
+
+class TextNormalizer:
+    """
+    Tokenize, drop stopwords and lemmatize English text.
+
+    The lemmatizer and stopword set are loaded once per instance, and lemmas
+    are memoized per token since review vocabularies repeat heavily.
+    """
+
+    def __init__(self, language: str = 'english'):
+        from nltk.corpus import stopwords
+        from nltk.stem import WordNetLemmatizer
+        from nltk.tokenize import word_tokenize
+
+        self._tokenize = word_tokenize
+        self._lemmatizer = WordNetLemmatizer()
+        self.stop_words = frozenset(stopwords.words(language))
+        self._lemmas = {}
+
+    def lemmatize(self, token: str) -> str:
+        lemma = self._lemmas.get(token)
+        if lemma is None:
+            lemma = self._lemmatizer.lemmatize(token)
+            self._lemmas[token] = lemma
+        return lemma
+
+    def normalize(self, text: str) -> str:
+        """Return the space-joined lemmas of the non-stopword alphanumeric tokens."""
+        if not isinstance(text, str) or not text.strip():
+            return ''
+        try:
+            tokens = [
+                self.lemmatize(word)
+                for word in self._tokenize(text.lower())
+                if word.isalnum() and word not in self.stop_words
+            ]
+            return ' '.join(tokens)
+        except Exception as e:
+            logger.error(f"Tokenization failed: {e}")
+            return ''
+
+    def normalize_many(self, texts: List[str]) -> List[str]:
+        return [self.normalize(text) for text in texts]
+
+
+# Per-process normalizer, created by the pool initializer in worker processes
+_worker_normalizer: Optional[TextNormalizer] = None
+
+
+def _init_worker() -> None:
+    global _worker_normalizer
+    _worker_normalizer = TextNormalizer()
+
+
+def _normalize_chunk(texts: List[str]) -> List[str]:
+    return _worker_normalizer.normalize_many(texts)
+
+
+def normalize_series(texts: pd.Series, normalizer: Optional[TextNormalizer] = None, n_jobs: int = 1,
+                     chunk_size: int = 2000) -> pd.Series:
+    """
+    Normalize a Series of texts, optionally across worker processes.
+
+    Args:
+        texts (pd.Series): Texts to normalize.
+        normalizer (TextNormalizer, optional): Instance used when `n_jobs` is 1.
+        n_jobs (int): Worker processes; -1 uses all cores. Each worker builds its
+            own TextNormalizer once.
+        chunk_size (int): Texts sent to a worker per task.
+
+    Returns:
+        pd.Series: Normalized texts aligned with `texts`.
+    """
+    values = texts.tolist()
+    if n_jobs == -1:
+        n_jobs = os.cpu_count() or 1
+    if n_jobs <= 1 or len(values) <= chunk_size:
+        normalizer = normalizer or TextNormalizer()
+        return pd.Series(normalizer.normalize_many(values), index=texts.index)
+
+    chunks = [values[i:i + chunk_size] for i in range(0, len(values), chunk_size)]
+    with ProcessPoolExecutor(max_workers=n_jobs, initializer=_init_worker) as executor:
+        results = [text for chunk in executor.map(_normalize_chunk, chunks) for text in chunk]
+    logger.info(
+        f"Normalized {len(values)} texts in {len(chunks)} chunks on {n_jobs} processes")
+    return pd.Series(results, index=texts.index)
@@ -0,0 +1,153 @@
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional, Tuple
+
+from scripts.common.instrumentation import inc, span
+from scripts.common.logging_config import ROOT, get_logger
+from scripts.common.text_cache import TextCache, normalize_text
+from scripts.preprocessing.detect_language import AMHARIC, NON_ENGLISH
+
+# Set up logging
+logger = get_logger(__name__, "preprocess_reviews.log")
+
+DEFAULT_CACHE_PATH = os.path.join(ROOT, 'data', 'cache', 'translations.sqlite')
+
+# Source language codes passed to the backend for each detection label
+SOURCE_LANGUAGES = {
+    AMHARIC: 'am-ET',
+    NON_ENGLISH: 'auto',
+}
+
+
+class TranslationBackend:
+    """Interface for translation providers; subclasses translate one text to English."""
+
+    name = 'base'
+
+    def translate(self, text: str, source: str) -> str:
+        raise NotImplementedError
+
+
+class MyMemoryBackend(TranslationBackend):
+    """MyMemory via deep_translator, with one translator per source language."""
+
+    name = 'mymemory'
+
+    def __init__(self, target: str = 'en-US'):
+        self.target = target
+        self._translators = {}
+        self._lock = threading.Lock()
+
+    def _get_translator(self, source: str):
+        with self._lock:
+            if source not in self._translators:
+                from deep_translator import MyMemoryTranslator
+                self._translators[source] = MyMemoryTranslator(
+                    source=source, target=self.target)
+            return self._translators[source]
+
+    def translate(self, text: str, source: str) -> str:
+        return self._get_translator(source).translate(text)
+
+
+class IdentityBackend(TranslationBackend):
+    """Offline stand-in that returns text unchanged; useful for tests and dry runs."""
+
+    name = 'identity'
+
+    def translate(self, text: str, source: str) -> str:
+        return text
+
+
+class TranslationCache(TextCache):
+    """Translation cache keyed by (source language, normalized text), with LRU eviction."""
+
+    def __init__(self, path: str = DEFAULT_CACHE_PATH, max_entries: int = 500_000):
+        super().__init__(path, table='translations', max_entries=max_entries)
+
+
+class TranslationService:
+    """
+    Batched translation with caching, in-batch deduplication and bounded concurrency.
+
+    Args:
+        backend (TranslationBackend): Provider that performs uncached translations.
+        cache (TranslationCache, optional): Persistent cache; disabled when None.
+        max_workers (int): Maximum concurrent backend requests.
+        max_retries (int): Attempts per text before falling back to the original.
+        backoff (float): Initial retry delay in seconds, doubled on each retry.
+    """
+
+    def __init__(self, backend: TranslationBackend, cache: Optional[TranslationCache] = None,
+                 max_workers: int = 4, max_retries: int = 3, backoff: float = 1.0):
+        self.backend = backend
+        self.cache = cache
+        self.max_workers = max_workers
+        self.max_retries = max_retries
+        self.backoff = backoff
+
+    def _translate_one(self, key: Tuple[str, str]) -> Optional[str]:
+        source, text = key
+        delay = self.backoff
+        for attempt in range(1, self.max_retries + 1):
+            inc('api_calls', api=self.backend.name)
+            if attempt > 1:
+                inc('retries', api=self.backend.name)
+            try:
+                with span('translate.request', backend=self.backend.name):
+                    translated = self.backend.translate(text, source)
+                if translated and translated.strip():
+                    return translated
+                logger.warning(
+                    f"Translation failed or returned empty for: {text[:50]}...")
+                return None
+            except Exception as e:
+                inc('api_errors', api=self.backend.name)
+                logger.warning(
+                    f"Translation error for text {text[:50]}... (attempt {attempt}/{self.max_retries}): {e}")
+                if attempt < self.max_retries:
+                    time.sleep(delay)
+                    delay *= 2
+        return None
+
+    def translate_many(self, texts: List[str], labels: List[str]) -> List[str]:
+        """
+        Translate texts to English according to their detection labels.
+
+        Texts whose label has no source language are returned unchanged, as are
+        texts whose translation ultimately fails.
+        """
+        keys = [
+            (SOURCE_LANGUAGES[label], normalize_text(text))
+            if label in SOURCE_LANGUAGES and isinstance(text, str) else None
+            for text, label in zip(texts, labels)
+        ]
+        unique_keys = list(dict.fromkeys(key for key in keys if key is not None))
+        if not unique_keys:
+            return list(texts)
+
+        translations = self.cache.get_many(unique_keys) if self.cache else {}
+        misses = [key for key in unique_keys if key not in translations]
+        logger.info(
+            f"Translating {len(keys) - keys.count(None)} texts: {len(unique_keys)} unique, "
+            f"{len(unique_keys) - len(misses)} cached, {len(misses)} sent to {self.backend.name}")
+
+        inc('rows', len(keys) - keys.count(None), stage='translate')
+        if misses:
+            with span('translate.batch', backend=self.backend.name), \
+                    ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                results = list(executor.map(self._translate_one, misses))
+            fresh = {key: result for key, result in zip(misses, results) if result}
+            if self.cache and fresh:
+                self.cache.put_many(fresh)
+            translations.update(fresh)
+
+        return [
+            translations.get(key, text) if key is not None else text
+            for text, key in zip(texts, keys)
+        ]
+
+    def translate(self, text: str, label: str) -> str:
+        return self.translate_many([text], [label])[0]
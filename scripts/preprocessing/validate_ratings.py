@@ -1,15 +1,20 @@
 import pandas as pd
-import logging
+
+from scripts.common.logging_config import get_logger
 
 # Set up logging
-logging.basicConfig(
-    filename="../../logs/preprocess_reviews.log",
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s'
-)
+logger = get_logger(__name__, "preprocess_reviews.log")
+
+VALID_RATINGS = [1, 2, 3, 4, 5]
+
+
+def valid_rating_mask(df: pd.DataFrame) -> pd.Series:
+    """True for rows whose rating is an integer star value."""
+    return df['rating'].isin(VALID_RATINGS)
+
 
 def validate_ratings(df: pd.DataFrame, bank_name: str) -> pd.DataFrame:
     initial_len = len(df)
-    df = df[df['rating'].isin([1, 2, 3, 4, 5])]
-    logging.info(f"Filtered {initial_len - len(df)} invalid ratings for {bank_name}. Remaining: {len(df)}")
+    df = df[valid_rating_mask(df)]
+    logger.info(f"Filtered {initial_len - len(df)} invalid ratings for {bank_name}. Remaining: {len(df)}")
     return df
\ No newline at end of file
@@ -2,14 +2,11 @@ import pandas as pd
 import matplotlib.pyplot as plt
 import seaborn as sns
 import os
-import logging
 
-# logging
-logging.basicConfig(
-    filename="../../logs/preprocess_reviews.log",
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s'
-)
+from scripts.common.logging_config import get_logger
+
+# Set up logging
+logger = get_logger(__name__, "preprocess_reviews.log")
 
 
 def visualize_data_quality(df: pd.DataFrame, bank_name: str, output_dir: str) -> None:
@@ -39,5 +36,5 @@ def visualize_data_quality(df: pd.DataFrame, bank_name: str, output_dir: str) ->
         output_dir, f'{safe_bank_name}_rating_distribution.png'))
     plt.show()
     plt.close()
-    logging.info(
+    logger.info(
         f"Saved data quality visualizations for {bank_name} to {output_dir}")
@@ -0,0 +1,70 @@
+import threading
+import time
+from typing import Dict
+
+from scripts.common.logging_config import get_logger
+
+# Set up logging
+logger = get_logger(__name__, "scrape_reviews.log")
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket whose refill rate adapts to request outcomes.
+
+    The rate is cut by ``backoff_factor`` on every error and grown by
+    ``recovery_factor`` on every success, bounded by ``min_rate`` and
+    ``max_rate`` (requests per second).
+    """
+
+    def __init__(self, rate: float = 1.0, capacity: float = 2.0, min_rate: float = 0.05,
+                 max_rate: float = 5.0, backoff_factor: float = 0.5, recovery_factor: float = 1.1):
+        self.rate = rate
+        self.capacity = capacity
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.backoff_factor = backoff_factor
+        self.recovery_factor = recovery_factor
+        self._tokens = capacity
+        self._last_refill = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens +
+                           (now - self._last_refill) * self.rate)
+        self._last_refill = now
+
+    def acquire(self) -> None:
+        """Block until a token is available, then consume it."""
+        while True:
+            with self._lock:
+                self._refill()
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+    def on_success(self) -> None:
+        with self._lock:
+            self.rate = min(self.max_rate, self.rate * self.recovery_factor)
+
+    def on_error(self) -> None:
+        with self._lock:
+            self.rate = max(self.min_rate, self.rate * self.backoff_factor)
+            # Drain the bucket so the next request waits out the backoff
+            self._tokens = 0
+        logger.warning(f"Rate limiter backing off to {self.rate:.2f} req/s")
+
+
+_limiters: Dict[str, TokenBucket] = {}
+_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(host: str, **kwargs) -> TokenBucket:
+    """Return the shared limiter for a host, creating it on first use."""
+    with _limiters_lock:
+        if host not in _limiters:
+            _limiters[host] = TokenBucket(**kwargs)
+        return _limiters[host]
@@ -1,23 +1,24 @@
-import logging
 import google_play_scraper as gp
 from google_play_scraper import Sort
 import pandas as pd
-from datetime import datetime
-import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from tqdm import tqdm
-from typing import List, Dict
+from typing import Callable, List, Dict, Optional
 import os
 import sys
 
 project_root = os.path.abspath(os.path.join(os.getcwd(), '..'))
 sys.path.insert(0, project_root)
 
+from scripts.common.instrumentation import inc, instrumented, span
+from scripts.common.logging_config import get_logger
+from scripts.scraping.rate_limiter import TokenBucket, get_rate_limiter
+from scripts.common.storage import read_table, write_table
+from scripts.common.review_ids import ReviewIndex, make_review_id
+from scripts.scraping.scrape_state import is_seen, load_state, make_watermark, save_state, watermark_time
+
 # Set up logging
-logging.basicConfig(
-    filename="./../logs/scrape_reviews.log",
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s'
-)
+logger = get_logger(__name__, "scrape_reviews.log")
 
 # Define app IDs
 app_ids = {
@@ -28,118 +29,238 @@ app_ids = {
 
 # Define output directory
 RAW_DATA_DIR = './../data/raw'
-os.makedirs(RAW_DATA_DIR, exist_ok=True)
+
+# All review requests go to the same Play Store host and share one limiter
+PLAY_STORE_HOST = 'play.google.com'
 
 
-def scrape_bank_reviews(app_id: str, bank_name: str, target_clean_count: int = 400, min_raw_count: int = 600, max_reviews: int = 2000, lang: str = 'en', country: str = 'et') -> List[Dict]:
-    logging.info(
+def scrape_bank_reviews(app_id: str, bank_name: str, target_clean_count: int = 400, min_raw_count: int = 600, max_reviews: int = 2000, lang: str = 'en', country: str = 'et',
+                        fetch: Optional[Callable] = None, rate_limiter: Optional[TokenBucket] = None, max_retries: int = 3, watermark: Optional[Dict] = None,
+                        report: Optional[Dict] = None) -> List[Dict]:
+    """
+    Follow the continuation chain for one app, pacing requests through a rate limiter.
+
+    Args:
+        fetch (Callable, optional): Drop-in replacement for `google_play_scraper.reviews`,
+            e.g. a local stub. Defaults to the real scraper.
+        rate_limiter (TokenBucket, optional): Limiter shared by all apps on the same host.
+        max_retries (int): Consecutive failed pages tolerated before giving up on the app.
+        watermark (Dict, optional): Newest review stored by a previous run. Paging stops
+            as soon as it is reached, so only unseen reviews are returned. Until then
+            `max_reviews` does not apply, so a backlog larger than it is still fetched
+            in full.
+        report (Dict, optional): Filled with `complete`, True when every review newer
+            than the watermark was fetched (the watermark was reached, the chain ran
+            out, or there was no usable watermark). Only then may the watermark advance.
+    """
+    fetch = fetch or gp.reviews
+    rate_limiter = rate_limiter or get_rate_limiter(PLAY_STORE_HOST)
+    logger.info(
         f"Starting to scrape up to {max_reviews} reviews for {bank_name} to achieve at least {min_raw_count} raw reviews for {target_clean_count} clean reviews")
     reviews = []
     continuation_token = None
     total_scraped = 0
+    retries = 0
+    until_watermark = watermark_time(watermark) is not None
+    reached_watermark = False
+    exhausted = False
 
-    while total_scraped < max_reviews:
+    while until_watermark or total_scraped < max_reviews:
+        rate_limiter.acquire()
+        inc('api_calls', api='play_store')
         try:
-            result, new_token = gp.reviews(
-                app_id,
-                lang=lang,
-                country=country,
-                sort=Sort.NEWEST,
-                count=100,
-                continuation_token=continuation_token
-            )
-
-            if not result:
-                logging.info(
-                    f"No more reviews available for {bank_name} at {total_scraped} reviews. Maximum reached.")
+            with span('scrape.page', bank=bank_name):
+                result, new_token = fetch(
+                    app_id,
+                    lang=lang,
+                    country=country,
+                    sort=Sort.NEWEST,
+                    count=100,
+                    continuation_token=continuation_token
+                )
+        except Exception as e:
+            rate_limiter.on_error()
+            inc('api_errors', api='play_store')
+            retries += 1
+            logger.warning(
+                f"Error fetching reviews for {app_id} (attempt {retries}/{max_retries}): {str(e)}")
+            if retries >= max_retries:
                 break
+            inc('retries', api='play_store')
+            continue
+
+        rate_limiter.on_success()
+        retries = 0
+
+        if not result:
+            logger.info(
+                f"No more reviews available for {bank_name} at {total_scraped} reviews. Maximum reached.")
+            exhausted = True
+            break
 
-            for idx, review in enumerate(tqdm(result, desc=f"Processing {bank_name} reviews")):
-                review_data = {
-                    'review_id': f"{bank_name.replace(' ', '_')}_{total_scraped + idx}",
-                    'review_text': review.get('content', ''),
-                    'rating': review.get('score', None),
-                    'date': review.get('at', None),
-                    'bank_name': bank_name,
-                    'source': 'Google Play'
-                }
-                reviews.append(review_data)
-
-            total_scraped += len(result)
-            logging.info(f"Scraped {total_scraped} reviews for {bank_name}")
-
-            if not new_token:
-                logging.info(
-                    f"Continuation token exhausted for {bank_name} at {total_scraped} reviews. Maximum reached.")
+        for review in tqdm(result, desc=f"Processing {bank_name} reviews"):
+            if is_seen(review.get('content', ''), review.get('at', None), watermark):
+                reached_watermark = True
                 break
-            continuation_token = new_token
-            time.sleep(5)  # Increased delay to avoid rate limits
+            review_data = {
+                'review_id': make_review_id(bank_name, review.get('reviewId'), review.get('content', ''), review.get('at', None)),
+                'review_text': review.get('content', ''),
+                'rating': review.get('score', None),
+                'date': review.get('at', None),
+                'bank_name': bank_name,
+                'source': 'Google Play'
+            }
+            reviews.append(review_data)
 
-        except Exception as e:
-            logging.warning(f"Error fetching reviews for {app_id}: {str(e)}")
+        total_scraped += len(result)
+        inc('rows', len(result), stage='scrape')
+        logger.info(f"Scraped {total_scraped} reviews for {bank_name}")
+
+        if reached_watermark:
+            logger.info(
+                f"Reached previously seen reviews for {bank_name}; {len(reviews)} new reviews since last run.")
+            break
+
+        if not new_token:
+            logger.info(
+                f"Continuation token exhausted for {bank_name} at {total_scraped} reviews. Maximum reached.")
+            exhausted = True
             break
+        continuation_token = new_token
 
-    if total_scraped < min_raw_count:
-        logging.warning(
+    if total_scraped < min_raw_count and not reached_watermark:
+        logger.warning(
             f"Only {total_scraped} reviews scraped for {bank_name}, below minimum {min_raw_count}. Consider increasing max_reviews or checking API limits.")
 
-    logging.info(
+    if report is not None:
+        report['complete'] = reached_watermark or exhausted or not until_watermark
+    logger.info(
         f"Completed scraping {len(reviews)} reviews for {bank_name}. Estimated maximum reviews available.")
     return reviews
 
-def save_to_csv(reviews: List[Dict], bank_name: str, output_dir: str) -> None:
+
+def scrape_all_banks(apps: Dict[str, Dict], max_workers: int = 8, fetch: Optional[Callable] = None, watermarks: Optional[Dict[str, Dict]] = None,
+                     reports: Optional[Dict[str, Dict]] = None, **kwargs) -> Dict[str, List[Dict]]:
+    """
+    Scrape many apps concurrently on a bounded thread pool.
+
+    Each app walks its own continuation chain; the shared per-host limiter keeps
+    the combined request rate in check. `watermarks` maps `apps` keys to the
+    newest review stored for that app; `reports`, if given, is filled with
+    each app's `scrape_bank_reviews` report under the same keys.
+
+    Returns:
+        Dict[str, List[Dict]]: Scraped reviews keyed by the `apps` key.
+    """
+    results = {}
+    reports = reports if reports is not None else {}
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {
+            executor.submit(scrape_bank_reviews, app_id=info['app_id'], bank_name=info['name'], fetch=fetch,
+                            watermark=(watermarks or {}).get(bank), report=reports.setdefault(bank, {}),
+                            **kwargs): bank
+            for bank, info in apps.items()
+        }
+        for future in as_completed(futures):
+            bank = futures[future]
+            try:
+                results[bank] = future.result()
+            except Exception as e:
+                logger.error(
+                    f"Scraping failed for {apps[bank]['name']}: {str(e)}")
+                results[bank] = []
+    return results
+
+
+def save_reviews(reviews: List[Dict], bank_name: str, output_dir: str, append: bool = False, fmt: Optional[str] = None) -> None:
+    """Save raw reviews to `<bank>_reviews` in the configured storage format (Parquet by default)."""
     try:
         safe_bank_name = bank_name.replace(' ', '_').lower()
-        output_path = os.path.join(output_dir, f"{safe_bank_name}_reviews.csv")
+        output_stem = os.path.join(output_dir, f"{safe_bank_name}_reviews")
         df = pd.DataFrame(reviews)
-        df.to_csv(output_path, index=False, encoding='utf-8')
-        logging.info(f"Saved {len(df)} reviews to {output_path}")
+        output_path = write_table(df, output_stem, fmt=fmt, append=append)
+        logger.info(f"Saved {len(df)} reviews to {output_path}")
     except Exception as e:
-        logging.error(f"Error saving reviews for {bank_name} to CSV: {str(e)}")
+        logger.error(f"Error saving reviews for {bank_name}: {str(e)}")
+
 
+def save_to_csv(reviews: List[Dict], bank_name: str, output_dir: str, append: bool = False) -> None:
+    save_reviews(reviews, bank_name, output_dir, append=append, fmt='csv')
 
-def scrape():
+
+@instrumented('scrape')
+def scrape(max_workers: int = 8, incremental: bool = False):
+    """
+    Scrape all configured apps.
+
+    In incremental mode, each app only pages back to the watermark saved by the
+    previous run and new rows are appended to the existing raw store.
+    """
     target_clean_reviews_per_bank = 400
     max_reviews_per_bank = 1000
 
+    os.makedirs(RAW_DATA_DIR, exist_ok=True)
+    # A full run still merges into the saved state, so apps it did not complete keep their watermarks
+    state = load_state(RAW_DATA_DIR)
+    index = ReviewIndex(namespace='scraped')
+    reports = {}
+    all_reviews = scrape_all_banks(
+        app_ids,
+        max_workers=max_workers,
+        watermarks={bank: state.get(info['app_id']) for bank, info in app_ids.items()} if incremental else None,
+        reports=reports,
+        target_clean_count=target_clean_reviews_per_bank,
+        max_reviews=max_reviews_per_bank
+    )
+
     for bank, info in app_ids.items():
-        # Scrape reviews for the current bank
-        reviews = scrape_bank_reviews(
-            app_id=info['app_id'],
-            bank_name=info['name'],
-            target_clean_count=target_clean_reviews_per_bank,
-            max_reviews=max_reviews_per_bank
-        )
-
-        # Save to bank-specific CSV
+        reviews = all_reviews.get(bank)
+
+        if reviews:
+            # Reviews are sorted newest first, so the first dated row is the new watermark.
+            # If paging failed before the old watermark, keep it so the gap is fetched next time.
+            newest = next((review for review in reviews if review['date'] is not None), None)
+            if newest is not None and reports.get(bank, {}).get('complete'):
+                state[info['app_id']] = make_watermark(newest['review_text'], newest['date'])
+            elif newest is not None:
+                logger.warning(f"Paging for {info['name']} stopped before the previous watermark; keeping it")
+
+            review_ids = [review['review_id'] for review in reviews]
+            if incremental:
+                # Drop anything an earlier run already appended to the raw store
+                is_new = index.add_new(review_ids)
+                reviews = [review for review, new in zip(reviews, is_new) if new]
+            else:
+                index.mark_seen(review_ids)
+
+        # Save to bank-specific table
         if reviews:
-            save_to_csv(reviews, info['name'], RAW_DATA_DIR)
+            save_reviews(reviews, info['name'], RAW_DATA_DIR, append=incremental)
 
         # Log summary for the bank
         safe_bank_name = info['name'].replace(' ', '_').lower()
-        output_path = os.path.join(
-            RAW_DATA_DIR, f"{safe_bank_name}_reviews.csv")
+        output_stem = os.path.join(RAW_DATA_DIR, f"{safe_bank_name}_reviews")
         try:
-            df = pd.read_csv(output_path)
-            logging.info(f"Collected {len(df)} reviews for {info['name']}")
+            df = read_table(output_stem, columns=['review_id'])
+            logger.info(f"Collected {len(df)} reviews for {info['name']}")
         except Exception as e:
-            logging.error(f"Error reading CSV for {info['name']}: {str(e)}")
-
-        time.sleep(2)  # Avoid rate limits between banks
+            logger.error(f"Error reading reviews for {info['name']}: {str(e)}")
 
     # Log total reviews across all banks
     total_reviews = 0
     for bank in app_ids.values():
         safe_bank_name = bank['name'].replace(' ', '_').lower()
-        output_path = os.path.join(
-            RAW_DATA_DIR, f"{safe_bank_name}_reviews.csv")
+        output_stem = os.path.join(RAW_DATA_DIR, f"{safe_bank_name}_reviews")
         try:
-            df = pd.read_csv(output_path)
+            df = read_table(output_stem, columns=['review_id'])
             total_reviews += len(df)
         except Exception as e:
-            logging.error(f"Error reading CSV for {bank['name']}: {str(e)}")
-    logging.info(f"Total reviews collected across all banks: {total_reviews}")
+            logger.error(f"Error reading reviews for {bank['name']}: {str(e)}")
+    logger.info(f"Total reviews collected across all banks: {total_reviews}")
+
+    save_state(state, RAW_DATA_DIR)
+    index.close()
 
 
 if __name__ == "__main__":
-    scrape()
+    scrape(incremental='--incremental' in sys.argv)
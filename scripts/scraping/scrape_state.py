@@ -0,0 +1,81 @@
+import hashlib
+import json
+import os
+from datetime import datetime
+from typing import Dict, Optional
+
+from scripts.common.logging_config import get_logger
+
+# Set up logging
+logger = get_logger(__name__, "scrape_reviews.log")
+
+STATE_FILE_NAME = '.scrape_state.json'
+
+
+def review_hash(text: Optional[str], at) -> str:
+    """Hash a review's content and timestamp so same-second reviews can be told apart."""
+    at_str = at.isoformat() if isinstance(at, datetime) else str(at)
+    return hashlib.sha1(f"{at_str}\x1f{text or ''}".encode('utf-8')).hexdigest()
+
+
+def load_state(state_dir: str) -> Dict[str, Dict]:
+    """Load per-app watermarks; returns an empty state when none has been saved yet."""
+    state_path = os.path.join(state_dir, STATE_FILE_NAME)
+    if not os.path.exists(state_path):
+        return {}
+    try:
+        with open(state_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except Exception as e:
+        logger.error(f"Error reading scrape state {state_path}: {str(e)}")
+        return {}
+
+
+def save_state(state: Dict[str, Dict], state_dir: str) -> None:
+    """Atomically write per-app watermarks."""
+    state_path = os.path.join(state_dir, STATE_FILE_NAME)
+    tmp_path = state_path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(state, f, indent=2)
+    os.replace(tmp_path, state_path)
+    logger.info(f"Saved scrape state to {state_path}")
+
+
+def make_watermark(review_text: Optional[str], at) -> Dict:
+    """Build a watermark from the newest review of a run."""
+    return {
+        'latest_at': at.isoformat() if isinstance(at, datetime) else str(at),
+        'latest_hash': review_hash(review_text, at),
+    }
+
+
+def watermark_time(watermark: Optional[Dict]) -> Optional[datetime]:
+    """
+    Timestamp of a watermark, or None when there is no usable one.
+
+    A watermark without a usable timestamp (e.g. 'None' saved by older runs)
+    is treated as absent.
+    """
+    if not watermark:
+        return None
+    try:
+        return datetime.fromisoformat(watermark['latest_at'])
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+def is_seen(review_text: Optional[str], at, watermark: Optional[Dict]) -> bool:
+    """
+    Check whether a review is at or behind the watermark.
+
+    Reviews are paged newest first, so anything older than the watermark
+    timestamp, or the watermark review itself, has already been stored.
+    """
+    latest_at = watermark_time(watermark)
+    if latest_at is None or at is None:
+        return False
+    if not isinstance(at, datetime):
+        at = datetime.fromisoformat(str(at))
+    if at < latest_at:
+        return True
+    return at == latest_at and review_hash(review_text, at) == watermark['latest_hash']
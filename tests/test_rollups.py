@@ -0,0 +1,107 @@
+import threading
+from datetime import date
+
+import pandas as pd
+import pytest
+
+from scripts.db.bulk_loader import BulkLoader
+from scripts.db.database import ReviewRepository, SQLiteDatabase
+from scripts.db.rollups import NO_LABEL, NO_RATING, NO_THEME, rollup_deltas
+
+
+def test_rollup_deltas_sums_per_key_and_fills_missing_key_parts():
+    rows = [
+        ('a', 'text', 'POSITIVE', 0.5, 5, '2025-01-01', 1),
+        ('b', 'text', 'POSITIVE', 0.25, 5, '2025-01-01', 1),
+        ('c', 'text', None, 1.0, None, '2025-01-02', 1),
+        ('d', 'text', 'NEGATIVE', None, 1, '2025-01-02', 1),
+        ('e', 'text', 'NEGATIVE', 0.5, 1, None, 1),
+    ]
+    deltas, skipped = rollup_deltas(rows, ['Login', 'Login', None, 'Login', 'Login'])
+
+    assert skipped == 2
+    assert sorted(deltas) == [
+        (1, '2025-01-01', 5, 'POSITIVE', 'Login', 2, 0.75, 0.3125),
+        (1, '2025-01-02', NO_RATING, NO_LABEL, NO_THEME, 1, 1.0, 1.0),
+    ]
+
+
+def test_rollup_deltas_applies_day_key():
+    rows = [('a', 'text', 'POSITIVE', 0.5, 5, '2025-01-01T10:00', 1),
+            ('b', 'text', 'POSITIVE', 0.5, 5, '2025-01-01T18:00', 1)]
+    deltas, _ = rollup_deltas(rows, ['Login', 'Login'], day_key=lambda value: value[:10])
+    assert deltas == [(1, '2025-01-01', 5, 'POSITIVE', 'Login', 2, 1.0, 0.5)]
+
+
+@pytest.fixture
+def repository(tmp_path):
+    db = SQLiteDatabase(str(tmp_path / 'reviews.sqlite'))
+    yield ReviewRepository(db, batch_size=3)
+    db.close()
+
+
+def reviews(ids, scores, day='2025-01-01'):
+    return pd.DataFrame({
+        'review_id': ids,
+        'review_text': 'text',
+        'sentiment_label': 'POSITIVE',
+        'sentiment_score': scores,
+        'rating': 5,
+        'date': pd.Timestamp(day),
+        'bank': 'Dashen Bank',
+        'identified_theme': 'Login',
+    })
+
+
+def test_reloads_do_not_double_count(repository):
+    bank_ids = repository.upsert_banks(['Dashen Bank'])
+    repository.upsert_reviews(reviews(['a', 'b', 'c', 'd'], [0.2, 0.4, 0.6, 0.8]), bank_ids)
+    # Overlapping reload, with a duplicate id inside one batch
+    repository.upsert_reviews(reviews(['c', 'd', 'e', 'e'], [0.6, 0.8, 1.0, 1.0]), bank_ids)
+    repository.upsert_reviews(reviews(['a', 'b', 'c', 'd', 'e'], [0.2, 0.4, 0.6, 0.8, 1.0]), bank_ids)
+
+    totals = repository.query_rollups(by=[])
+    assert totals['review_count'][0] == 5
+    assert totals['mean_score'][0] == pytest.approx(0.6)
+    assert totals['score_std'][0] == pytest.approx(pd.Series([0.2, 0.4, 0.6, 0.8, 1.0]).std(ddof=0))
+
+
+def test_interleaved_loaders_do_not_double_count(tmp_path, monkeypatch):
+    path = str(tmp_path / 'reviews.sqlite')
+    first, second = ReviewRepository(SQLiteDatabase(path)), ReviewRepository(SQLiteDatabase(path))
+    bank_ids = first.upsert_banks(['Dashen Bank'])
+    new_rows = BulkLoader.new_rows
+    started = threading.Event()
+    other = threading.Thread(
+        target=lambda: second.upsert_reviews(reviews(['b', 'c', 'd'], [0.4, 0.6, 0.8]), bank_ids))
+
+    def check_then_interleave(self, rows):
+        positions = new_rows(self, rows)
+        if not started.is_set():
+            # The second loader overlaps this batch between its existence check and its merge
+            started.set()
+            other.start()
+            other.join(timeout=0.5)
+        return positions
+
+    monkeypatch.setattr(BulkLoader, 'new_rows', check_then_interleave)
+    first.upsert_reviews(reviews(['a', 'b', 'c'], [0.2, 0.4, 0.6]), bank_ids)
+    other.join()
+
+    totals = first.query_rollups(by=[])
+    assert totals['review_count'][0] == 4
+    assert totals['mean_score'][0] == pytest.approx(0.5)
+    first.db.close()
+    second.db.close()
+
+
+def test_query_rollups_filters_date_range(repository):
+    bank_ids = repository.upsert_banks(['Dashen Bank'])
+    repository.upsert_reviews(reviews(['a', 'b'], [0.5, 0.5], day='2025-01-01'), bank_ids)
+    repository.upsert_reviews(reviews(['c'], [0.5], day='2025-02-01'), bank_ids)
+
+    by_day = repository.query_rollups('2025-01-15', None)
+    assert by_day['review_day'].dt.date.tolist() == [date(2025, 2, 1)]
+    assert by_day['review_count'].tolist() == [1]
+    with pytest.raises(ValueError):
+        repository.query_rollups(by=['month'])
@@ -0,0 +1,41 @@
+import pandas as pd
+import pytest
+
+pytest.importorskip('pyarrow')
+
+from scripts.common.storage import iter_table, read_table, write_table
+
+
+def reviews(ids, banks, texts):
+    return pd.DataFrame({'review_id': ids, 'review_text': texts, 'rating': 5,
+                         'date': pd.Timestamp('2025-01-01'), 'bank_name': banks})
+
+
+def test_appends_with_more_categories_read_back(tmp_path):
+    stem = str(tmp_path / 'reviews')
+    # Part names fix the file order, so the narrow part is the one discovery sees first
+    write_table(reviews(['a', 'b'], ['x', 'y'], 'text'), stem, part_name='0')
+    write_table(reviews([f'id{i}' for i in range(300)], [f'bank {i}' for i in range(300)], 'text'),
+                stem, append=True, part_name='1')
+
+    df = read_table(stem)
+    assert len(df) == 302
+    assert set(df['bank_name']) == {'x', 'y'} | {f'bank {i}' for i in range(300)}
+    assert sum(len(chunk) for chunk in iter_table(stem, chunk_size=100)) == 302
+
+
+def test_appends_with_all_null_column_read_back(tmp_path):
+    stem = str(tmp_path / 'reviews')
+    write_table(reviews(['a', 'b'], ['x', 'y'], [None, None]), stem, part_name='0')
+    write_table(reviews(['c'], ['x'], 'text'), stem, append=True, part_name='1')
+
+    df = read_table(stem).sort_values('review_id')
+    assert df['review_text'].tolist()[2] == 'text'
+    assert df['review_text'].isna().sum() == 2
+
+
+def test_partitioned_table_reads_back(tmp_path):
+    stem = str(tmp_path / 'reviews')
+    write_table(reviews(['a', 'b'], ['x', 'y'], 'text'), stem, partition_cols=['bank_name'])
+    df = read_table(stem, filters=[('bank_name', '=', 'y')])
+    assert df['review_id'].tolist() == ['b']
@@ -0,0 +1,50 @@
+import os
+
+import pandas as pd
+import pytest
+
+pytest.importorskip('pyarrow')
+
+from scripts.SentimentThematicAnalysis import streaming_sentiment
+from scripts.SentimentThematicAnalysis.analyze_sentiment import BANKS, input_stem, output_stem
+from scripts.common.storage import read_table, write_table
+
+
+def fake_analyze_sentiment(chunk, **kwargs):
+    result = chunk.assign(sentiment_label='POSITIVE', sentiment_score=0.9)
+    result.attrs['throughput'] = 0.0
+    return result
+
+
+@pytest.fixture
+def dirs(tmp_path, monkeypatch):
+    monkeypatch.setattr(streaming_sentiment, 'analyze_sentiment', fake_analyze_sentiment)
+    return str(tmp_path / 'processed'), str(tmp_path / 'analyzed')
+
+
+def write_input(input_dir, n_rows):
+    os.makedirs(input_dir, exist_ok=True)
+    write_table(pd.DataFrame({
+        'review_id': [f'r{i}' for i in range(n_rows)],
+        'review_text': 'text',
+        'rating': pd.Series([5] * n_rows, dtype='Int8'),
+        'date': pd.Series([pd.Timestamp('2025-01-01')] * n_rows, dtype='datetime64[ns]'),
+    }), input_stem(input_dir, BANKS[0]))
+
+
+@pytest.mark.parametrize('fmt', ['parquet', 'csv'])
+def test_rerun_with_shorter_input_replaces_output(dirs, fmt):
+    input_dir, output_dir = dirs
+    write_input(input_dir, 5)
+    streaming_sentiment.stream_sentiment(input_dir, output_dir, chunk_size=2, fmt=fmt)
+    assert len(read_table(output_stem(output_dir, BANKS[0]), fmt=fmt)) == 5
+
+    write_input(input_dir, 1)
+    streaming_sentiment.stream_sentiment(input_dir, output_dir, chunk_size=2, fmt=fmt)
+    assert read_table(output_stem(output_dir, BANKS[0]), fmt=fmt)['review_id'].tolist() == ['r0']
+
+    write_input(input_dir, 0)
+    streaming_sentiment.stream_sentiment(input_dir, output_dir, chunk_size=2, fmt=fmt)
+    empty = read_table(output_stem(output_dir, BANKS[0]), fmt=fmt)
+    assert empty.empty
+    assert {'review_id', 'sentiment_label', 'sentiment_score'} <= set(empty.columns)
@@ -0,0 +1,29 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+pytest.importorskip('sklearn')
+
+from scripts.SentimentThematicAnalysis.theme_discovery import NO_CLUSTER, ThemeDiscovery
+
+
+@pytest.fixture
+def texts():
+    rng = np.random.default_rng(0)
+    words = ['login', 'password', 'transfer', 'money', 'slow', 'crash',
+             'update', 'fee', 'otp', 'balance', 'support', 'call']
+    return pd.Series([' '.join(rng.choice(words, 5)) for _ in range(200)])
+
+
+def test_predict_agrees_with_fit_labels(texts):
+    model = ThemeDiscovery(n_clusters=5, n_components=8).fit(texts)
+    assert (model.predict(texts) == model.kmeans.labels_).all()
+
+
+def test_texts_without_known_terms_get_no_cluster(texts):
+    model = ThemeDiscovery(n_clusters=5, n_components=8).fit(pd.concat([texts, pd.Series(['', None])]))
+    labels = model.label(pd.Series(['', 'the and', None, texts[0]]))
+
+    assert labels['discovered_theme_id'].tolist()[:3] == [NO_CLUSTER] * 3
+    assert labels['discovered_theme'].tolist()[:3] == [None] * 3
+    assert labels['discovered_theme'].iloc[3] in model.cluster_names